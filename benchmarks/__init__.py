@@ -0,0 +1,12 @@
+# benchmarks/__init__.py
+
+"""
+Throughput benchmarks for the MA1 grading pipeline.
+
+Nothing here uses real student work: synthetic_submissions.py builds fake
+MA1 workbooks (correct / partial / blank) and a fake LMS ZIP, and
+pipeline_benchmark.py times the pipeline phases over them:
+
+    python -m benchmarks.pipeline_benchmark --sizes 10 100 1000 --out bench.json
+    python -m benchmarks.pipeline_benchmark --compare before.json after.json
+"""
@@ -0,0 +1,309 @@
+# benchmarks/pipeline_benchmark.py
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+DEFAULT_SIZES = (10, 100, 1000)
+REPORT_VERSION = 1
+
+# "headless": phase 1 renders each student's scatter chart and embeds it at J4
+# (matplotlib, any OS); "none": charts are skipped
+CHART_MODES = ("headless", "none")
+
+# Timed in this order, one class size per fresh process (peak RSS stays per size)
+PHASES = (
+    "import_zip_to_student_groups",
+    "create_grading_sheets_from_folder",
+    "phase1_grade_all_students",
+    "build_instructor_master_workbook",
+)
+
+
+def _peak_rss_mb() -> dict:
+    """
+    Peak resident memory of this process and of its finished children
+    (grading workers), in MB. None where the OS doesn't report it.
+    """
+    try:
+        import resource
+    except ImportError:
+        resource = None
+
+    if resource is not None:
+        # ru_maxrss: kilobytes on Linux, bytes on macOS
+        scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+        return {
+            "self": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1),
+            "children": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale, 1),
+        }
+
+    try:
+        import psutil
+    except ImportError:
+        return {"self": None, "children": None}
+
+    # Windows: peak working set of this process only
+    info = psutil.Process().memory_info()
+    return {"self": round(getattr(info, "peak_wset", info.rss) / (1024 * 1024), 1), "children": None}
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=10,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def _timed(phases: dict, name: str, n_students: int, fn, *args, verbose: bool = False, **kwargs):
+    sink = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+
+    started = time.perf_counter()
+    with sink:
+        result = fn(*args, **kwargs)
+    elapsed = time.perf_counter() - started
+
+    phases[name] = {
+        "seconds": round(elapsed, 3),
+        "students_per_second": round(n_students / elapsed, 2) if elapsed > 0 else None,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+    return result
+
+
+def run_size(n_students: int, workdir: str, workers: int = 1, seed: int = 0, writer: str = "patch", verbose: bool = False,
+             engine: str = "sheet", master: str = "links", charts: str = "headless") -> dict:
+    """
+    Benchmarks ONE class size inside an isolated workspace under workdir.
+
+    The workspace lives in workdir/home (HOME / USERPROFILE are pointed there),
+    so the real Documents/MA1_Autograder is never touched. FX rates come from
+    a fixed synthetic snapshot (no network). charts "headless" times the
+    chart render + J4 embed inside phase 1.
+
+    Returns:
+        dict with students, qualities, phases (name → seconds, students_per_second,
+        peak_rss_mb), total_seconds, graded, failed, charts_embedded, peak_rss_mb
+    """
+    home = os.path.join(workdir, "home")
+    os.makedirs(home, exist_ok=True)
+    os.environ["HOME"] = home
+    os.environ["USERPROFILE"] = home
+
+    # Imported after HOME is redirected, so nothing can resolve the real workspace first
+    from benchmarks.synthetic_submissions import build_fake_lms_zip, synthetic_rates_snapshot
+    from writers.ensure_workspace_assets import ensure_workspace_assets
+    from writers.generate_course_folders import generate_course_folders
+    from writers.import_zip_to_student_groups import import_zip_to_student_groups
+    from writers.create_grading_sheet import create_grading_sheets_from_folder
+    from writers.build_instructor_master_workbook import build_instructor_master_workbook
+    from orchestrator import phase1_grade_all_students
+    from orchestrator.results_store import grade_summary_results
+
+    rates_snapshot = synthetic_rates_snapshot()
+
+    zip_path = os.path.join(workdir, f"synthetic_{n_students}.zip")
+    generate_started = time.perf_counter()
+    class_info = build_fake_lms_zip(zip_path, n_students, seed=seed, rates_snapshot=rates_snapshot)
+    generate_seconds = round(time.perf_counter() - generate_started, 3)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        ensure_workspace_assets()
+        course_label, graded_path, submissions_path = generate_course_folders(f"BENCH-{n_students}")
+
+    phases = {}
+    _timed(phases, "import_zip_to_student_groups", n_students, import_zip_to_student_groups,
+           zip_path, course_label, verbose=verbose)
+    _timed(phases, "create_grading_sheets_from_folder", n_students, create_grading_sheets_from_folder,
+           course_label, verbose=verbose)
+    summary = _timed(phases, "phase1_grade_all_students", n_students, phase1_grade_all_students,
+                     submissions_path, graded_path, workers=workers, rates_snapshot=rates_snapshot,
+                     writer=writer, engine=engine, embed_charts="headless" if charts == "headless" else None,
+                     verbose=verbose)
+    _timed(phases, "build_instructor_master_workbook", n_students, build_instructor_master_workbook,
+           graded_path, mode=master, results=grade_summary_results(summary),
+           verbose=verbose)
+
+    total = sum(p["seconds"] for p in phases.values())
+
+    return {
+        "students": n_students,
+        "qualities": class_info["qualities"],
+        "generate_seconds": generate_seconds,
+        "phases": phases,
+        "total_seconds": round(total, 3),
+        "students_per_second": round(n_students / total, 2) if total > 0 else None,
+        "graded": summary["graded"],
+        "failed": summary["failed"],
+        "charts_embedded": summary["charts_embedded"],
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _run_size_subprocess(n_students: int, workdir: str, workers: int, seed: int, writer: str, verbose: bool,
+                         engine: str = "sheet", master: str = "links", charts: str = "headless") -> dict:
+    """One fresh interpreter per size, so ru_maxrss is that size's peak and not the biggest so far."""
+    result_path = os.path.join(workdir, "result.json")
+    cmd = [
+        sys.executable, "-m", "benchmarks.pipeline_benchmark",
+        "--single", str(n_students),
+        "--workdir", workdir,
+        "--workers", str(workers),
+        "--seed", str(seed),
+        "--writer", writer,
+        "--engine", engine,
+        "--master", master,
+        "--charts", charts,
+        "--out", result_path,
+    ]
+    if verbose:
+        cmd.append("--verbose")
+
+    subprocess.run(cmd, cwd=PROJECT_ROOT, check=True)
+
+    with open(result_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def run_benchmark(sizes=DEFAULT_SIZES, workers: int = 1, seed: int = 0, writer: str = "patch",
+                  workdir: str | None = None, verbose: bool = False, engine: str = "sheet", master: str = "links",
+                  charts: str = "headless") -> dict:
+    """
+    Runs every class size (each in its own process and workspace) and builds the report.
+
+    Returns:
+        dict report: version, created_at, commit, python, platform, cpu_count,
+        workers, writer, engine, master, charts, seed, runs (one run_size() result per size)
+    """
+    report = {
+        "version": REPORT_VERSION,
+        "created_at": datetime.now(timezone.utc).replace(microsecond=0).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "workers": workers,
+        "writer": writer,
+        "engine": engine,
+        "master": master,
+        "charts": charts,
+        "seed": seed,
+        "runs": [],
+    }
+
+    with tempfile.TemporaryDirectory(prefix="ma1_bench_", dir=workdir) as root:
+        for n_students in sizes:
+            print(f"⏱️ {n_students} students...")
+            run = _run_size_subprocess(
+                n_students, os.path.join(root, str(n_students)), workers, seed, writer, verbose, engine, master,
+                charts,
+            )
+            report["runs"].append(run)
+            print(_format_run(run))
+
+    return report
+
+
+def _format_run(run: dict) -> str:
+    lines = [f"📘 {run['students']} students — {run['total_seconds']}s total, "
+             f"{run['graded']} graded / {run['failed']} failed, "
+             f"{run.get('charts_embedded', 0)} chart(s) embedded, peak RSS {run['peak_rss_mb']}"]
+    for name, phase in run["phases"].items():
+        lines.append(f"   {name:<36} {phase['seconds']:>9.3f}s  {phase['students_per_second'] or 0:>9.1f} students/s")
+    return "\n".join(lines)
+
+
+def compare_reports(before: dict, after: dict) -> list:
+    """
+    Phase-by-phase comparison of two reports (matched on class size).
+
+    Returns:
+        list of dicts: students, phase, before_seconds, after_seconds, speedup
+    """
+    before_runs = {run["students"]: run for run in before["runs"]}
+    rows = []
+
+    for run in after["runs"]:
+        old = before_runs.get(run["students"])
+        if old is None:
+            continue
+
+        for phase in list(PHASES) + ["total"]:
+            old_s = old["total_seconds"] if phase == "total" else old["phases"].get(phase, {}).get("seconds")
+            new_s = run["total_seconds"] if phase == "total" else run["phases"].get(phase, {}).get("seconds")
+            if old_s is None or new_s is None:
+                continue
+            rows.append({
+                "students": run["students"],
+                "phase": phase,
+                "before_seconds": old_s,
+                "after_seconds": new_s,
+                "speedup": round(old_s / new_s, 2) if new_s else None,
+            })
+
+    return rows
+
+
+def _load_report(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="MA1 pipeline throughput benchmark (synthetic submissions).")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="class sizes to time")
+    parser.add_argument("--workers", type=int, default=1, help="phase 1 grading processes (0 = one per CPU)")
+    parser.add_argument("--writer", default="patch", choices=("patch", "openpyxl"), help="grading sheet writer")
+    parser.add_argument("--engine", default="sheet", choices=("sheet", "batch"), help="phase 1 grading engine")
+    parser.add_argument("--master", default="links", choices=("links", "values", "cached_links"),
+                        help="instructor master mode")
+    parser.add_argument("--charts", default="headless", choices=CHART_MODES,
+                        help="render + embed the scatter charts in phase 1 (headless) or skip them")
+    parser.add_argument("--seed", type=int, default=0, help="synthetic class seed")
+    parser.add_argument("--workdir", help="where the throwaway workspaces go (default: system temp)")
+    parser.add_argument("--out", help="write the JSON report here")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="compare two saved reports")
+    parser.add_argument("--verbose", action="store_true", help="show the pipeline's own output")
+    parser.add_argument("--single", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        rows = compare_reports(_load_report(args.compare[0]), _load_report(args.compare[1]))
+        for row in rows:
+            print(f"{row['students']:>6}  {row['phase']:<36} {row['before_seconds']:>9.3f}s → "
+                  f"{row['after_seconds']:>9.3f}s  ×{row['speedup']}")
+        return rows
+
+    if args.single is not None:
+        # Internal: one size in this (fresh) process, result → --out
+        result = run_size(args.single, args.workdir, args.workers, args.seed, args.writer, args.verbose,
+                          args.engine, args.master, args.charts)
+    else:
+        result = run_benchmark(args.sizes, args.workers, args.seed, args.writer, args.workdir, args.verbose,
+                               args.engine, args.master, args.charts)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        if args.single is None:
+            print(f"✅ Report saved: {args.out}")
+
+    return result
+
+
+if __name__ == "__main__":
+    main()
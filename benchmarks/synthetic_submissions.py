@@ -0,0 +1,276 @@
+# benchmarks/synthetic_submissions.py
+
+import os
+import random
+import zipfile
+from datetime import datetime, timezone
+
+from openpyxl import Workbook
+from openpyxl.chart import Reference, ScatterChart, Series
+
+from graders.currency_conversion.currency_lookup import country_currency_dict
+
+# Every letter at position 0/1 of these names has an approved country (no "X")
+FIRST_NAMES = [
+    "Ann", "Bo", "Carlos", "Dana", "Elena", "Farid", "Grace", "Hana", "Ivan", "Jon",
+    "Kira", "Luis", "Maya", "Nia", "Omar", "Priya", "Rosa", "Sam", "Tariq", "Uma",
+    "Vera", "Wes", "Yara", "Zane", "Alma", "Beto", "Cleo", "Dev", "Emil", "Fern",
+    "Gus", "Hugo", "Ines", "Jade", "Kai", "Lena", "Milo", "Nora", "Otto", "Pia",
+]
+LAST_NAMES = [
+    "Lee", "Chen", "Ortiz", "Brown", "Garcia", "Nguyen", "Patel", "Kim", "Silva", "Moreno",
+    "Haddad", "Rossi", "Tanaka", "Iverson", "Jensen", "Kowalski", "Mendez", "Novak", "Olsen", "Perez",
+    "Quinn", "Reyes", "Santos", "Turner", "Ueda", "Vargas", "Walsh", "Young", "Zamora", "Abbott",
+    "Baker", "Cruz", "Diaz", "Evans", "Fischer", "Gomez", "Hale", "Ibarra", "Jones", "Khan",
+]
+
+# Share of each answer quality in a generated class (rest of the mix is "partial")
+DEFAULT_MIX = {"correct": 0.4, "partial": 0.45, "blank": 0.15}
+
+SUBMISSION_FILENAME = "MA1_submission.xlsx"
+
+
+def _countries_by_initial() -> dict:
+    by_letter = {}
+    for country in country_currency_dict:
+        by_letter.setdefault(country[0].lower(), []).append(country)
+    return by_letter
+
+
+def _synthetic_rate(code: str) -> float:
+    # Deterministic, roughly realistic spread (0.5 … 10.2)
+    return round(0.5 + (sum(ord(c) * (i + 3) for i, c in enumerate(code)) % 97) / 10, 4)
+
+
+def synthetic_rates_snapshot() -> dict:
+    """
+    A fixed FX snapshot (rates_snapshot.py format) covering every approved
+    currency, so benchmark runs never touch the network and are repeatable.
+    """
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    return {
+        "base": "USD",
+        "rates": {code: _synthetic_rate(code) for code in sorted(set(country_currency_dict.values()))},
+        "fetched_at": now.isoformat(),
+        "fetched_at_epoch": now.timestamp(),
+        "source": "file",
+        "error": None,
+    }
+
+
+def class_roster(n_students: int, seed: int = 0) -> list:
+    """
+    Unique (first, last) names for a synthetic class.
+
+    Returns:
+        list of (first_name, last_name), n_students long
+    """
+    combos = [(f, l) for f in FIRST_NAMES for l in LAST_NAMES]
+    random.Random(seed).shuffle(combos)
+
+    roster = combos[:n_students]
+    # Bigger classes than the name pool: repeat with a numeric-free suffix
+    suffix = 0
+    while len(roster) < n_students:
+        suffix += 1
+        roster += [(f, f"{l}{'o' * suffix}") for f, l in combos[: n_students - len(roster)]]
+    return roster
+
+
+def _answer_groups(first: str, last: str, rates: dict, rng: random.Random) -> dict:
+    """
+    Every graded answer of a fully correct submission, grouped the way the
+    rubric awards points. Each group is {tab: {cell: (value, number_format)}}.
+    """
+    by_letter = _countries_by_initial()
+    letters = [first[0], first[1] if len(first) > 1 else "m", last[0], last[1] if len(last) > 1 else "m"]
+    countries = [rng.choice(by_letter[letter.lower()]) for letter in letters]
+    codes = [country_currency_dict[c] for c in countries]
+    today = datetime.now()
+
+    groups = {}
+
+    # ---- Income Analysis ----
+    groups["ia_name"] = {"Income Analysis": {"B1": (f"{first} {last}", None)}}
+    groups["ia_slope"] = {"Income Analysis": {
+        "B30": ("=SLOPE(B19:B26,A19:A26)", "0"),
+        "B31": ("=INTERCEPT(B19:B26,A19:A26)", "#,##0"),
+    }}
+    groups["ia_predictions"] = {"Income Analysis": {
+        f"E{row}": (f"=$B$30*D{row}+$B$31", "$#,##0") for row in range(19, 36)
+    }}
+
+    # ---- Unit Conversions ----
+    uc_rows = {
+        26: {"F": ("=L14/I14", "mcg/mg"), "I": ("=L17/I17", "mL/tsp"), "O": "=C26*F26*I26", "P": "mcg/tsp"},
+        27: {"F": ("=L16/I16", "gal/L"), "I": ("=L22/I22", "hr/day"), "O": "=C27*F27*I27", "P": "gal/day"},
+        28: {"F": ("=I9/L9", "kg/lb"), "I": ("=I20/L20", "in/cm"), "L": ("=I20/L20", "in/cm"),
+             "O": "=C28*F28*I28*L28", "P": "kg/cm^2"},
+        29: {"F": ("=L21/I21", "ft/mi"), "I": ("=I23/L23", "yr/day"), "L": ("=I22/L22", "day/hr"),
+             "O": "=C29*F29*I29*L29", "P": "ft/hr"},
+    }
+    unit_col = {"F": "G", "I": "J", "L": "M"}
+    for row, answers in uc_rows.items():
+        cells = {f"C{row}": (rng.randint(2, 40), None)}
+        for col, answer in answers.items():
+            if col in unit_col:
+                formula, unit = answer
+                cells[f"{col}{row}"] = (formula, None)
+                cells[f"{unit_col[col]}{row}"] = (unit, None)
+            else:
+                cells[f"{col}{row}"] = (answer, None)
+        groups[f"uc_row{row}"] = {"Unit Conversions": cells}
+    groups["uc_temp"] = {"Unit Conversions": {
+        "A40": (rng.randint(40, 100), None),
+        "C40": ("=(5/9)*(A40-32)", None),
+        "C41": (rng.randint(5, 35), None),
+        "A41": ("=(9/5)*C41+32", None),
+    }}
+
+    # ---- Currency Conversion ----
+    cols = ["C", "D", "E", "F"]
+    groups["cc_budget"] = {"Currency Conversion": {"B4": (rng.randint(500, 5000), '"$"#,##0.00'), "D4": (rng.randint(1000, 90000), "#,##0.00")}}
+    groups["cc_row15"] = {"Currency Conversion": {f"{c}15": (letter.upper(), None) for c, letter in zip(cols, letters)}}
+    groups["cc_row16"] = {"Currency Conversion": {f"{c}16": (country, None) for c, country in zip(cols, countries)}}
+    groups["cc_row17"] = {"Currency Conversion": {f"{c}17": (today, "mm/dd/yyyy") for c in cols}}
+    groups["cc_row18"] = {"Currency Conversion": {f"{c}18": (code, None) for c, code in zip(cols, codes)}}
+    groups["cc_row19"] = {"Currency Conversion": {f"{c}19": (rates[code], "0.000") for c, code in zip(cols, codes)}}
+    groups["cc_row20"] = {"Currency Conversion": {f"{c}20": (f"=B4*{c}19", '"$"#,##0.00') for c in cols}}
+    groups["cc_row21"] = {"Currency Conversion": {f"{c}21": (f"=D4/{c}19", '"$"#,##0.00') for c in cols}}
+
+    return groups
+
+
+def _add_income_chart(ws):
+    """
+    The XY scatter of income by year the handout asks for, so the chart
+    export / embed paths (headless render, J4 insert) get timed too.
+    """
+    chart = ScatterChart()
+    chart.title = "Income by Year"
+    chart.style = 13
+    chart.x_axis.title = "Year"
+    chart.y_axis.title = "Income"
+
+    xvalues = Reference(ws, min_col=1, min_row=19, max_row=26)
+    yvalues = Reference(ws, min_col=2, min_row=19, max_row=26)
+    series = Series(yvalues, xvalues, title="Income")
+    series.marker.symbol = "circle"
+    series.graphicalProperties.line.noFill = True
+    chart.series.append(series)
+
+    ws.add_chart(chart, "G2")
+
+
+def _wrong_answer(value):
+    """What a student who got the cell wrong typically leaves behind."""
+    if isinstance(value, str) and value.startswith("="):
+        return "=" + value[1:].replace("*", "+").replace("/", "*")
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value * 3 + 1
+    if isinstance(value, str):
+        return value[::-1]
+    return None
+
+
+def build_submission(first: str, last: str, quality: str, rates: dict, seed: int = 0):
+    """
+    Builds one synthetic MA1 submission workbook.
+
+    quality:
+      "correct" → every graded answer right (full marks)
+      "partial" → each answer group independently right, wrong or blank
+      (both with the income scatter chart)
+      "blank"   → the three tabs exist but are empty
+
+    Returns:
+        openpyxl Workbook (not saved)
+    """
+    if quality not in DEFAULT_MIX:
+        raise ValueError(f"Unknown submission quality: {quality!r} (expected one of {tuple(DEFAULT_MIX)})")
+
+    rng = random.Random(f"{seed}:{first}:{last}")
+
+    wb = Workbook()
+    tabs = {"Income Analysis": wb.active}
+    tabs["Income Analysis"].title = "Income Analysis"
+    tabs["Unit Conversions"] = wb.create_sheet("Unit Conversions")
+    tabs["Currency Conversion"] = wb.create_sheet("Currency Conversion")
+
+    # Data the formulas point at (present in every submission, like the handout)
+    ws = tabs["Income Analysis"]
+    base_income = rng.randint(30000, 60000)
+    for i, row in enumerate(range(19, 36)):
+        ws[f"D{row}"] = 2010 + i
+        if row <= 26:
+            ws[f"A{row}"] = 2010 + i
+            ws[f"B{row}"] = base_income + i * rng.randint(800, 2500)
+
+    if quality == "blank":
+        return wb
+
+    _add_income_chart(ws)
+
+    for cells_by_tab in _answer_groups(first, last, rates, rng).values():
+        outcome = "right" if quality == "correct" else rng.choice(("right", "right", "wrong", "blank"))
+        if outcome == "blank":
+            continue
+
+        for tab, cells in cells_by_tab.items():
+            for ref, (value, number_format) in cells.items():
+                cell = tabs[tab][ref]
+                cell.value = value if outcome == "right" else _wrong_answer(value)
+                if number_format and outcome == "right":
+                    cell.number_format = number_format
+
+    return wb
+
+
+def _pick_quality(rng: random.Random, mix: dict) -> str:
+    roll = rng.random()
+    for quality, share in mix.items():
+        if roll < share:
+            return quality
+        roll -= share
+    return "partial"
+
+
+def build_fake_lms_zip(zip_path: str, n_students: int, seed: int = 0, rates_snapshot: dict | None = None, mix: dict | None = None) -> dict:
+    """
+    Writes a ZIP laid out like an LMS "download all submissions":
+
+        MA1 Download/<First>_(<First>)_<Last>_<8-digit id>/MA1_submission.xlsx
+
+    Returns:
+        dict with:
+          zip_path, students, qualities (quality → count), roster (list of
+          {"student": "First_Last", "quality": ...})
+    """
+    rates = (rates_snapshot or synthetic_rates_snapshot())["rates"]
+    mix = mix or DEFAULT_MIX
+    rng = random.Random(seed)
+
+    os.makedirs(os.path.dirname(os.path.abspath(zip_path)), exist_ok=True)
+
+    roster = []
+    qualities = {quality: 0 for quality in mix}
+
+    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as z:
+        for first, last in class_roster(n_students, seed):
+            quality = _pick_quality(rng, mix)
+            qualities[quality] += 1
+
+            folder = f"{first}_({first})_{last}_{rng.randint(10000000, 99999999)}"
+            wb = build_submission(first, last, quality, rates, seed)
+
+            with z.open(f"MA1 Download/{folder}/{SUBMISSION_FILENAME}", "w") as member:
+                wb.save(member)
+
+            roster.append({"student": f"{first}_{last}", "quality": quality})
+
+    return {
+        "zip_path": os.path.abspath(zip_path),
+        "students": n_students,
+        "qualities": qualities,
+        "roster": roster,
+    }
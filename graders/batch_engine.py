@@ -0,0 +1,473 @@
+# graders/batch_engine.py
+
+"""
+Column-oriented grading of a whole class at once.
+
+The per-sheet path grades one workbook at a time: every row checker runs
+once per student. The batch engine turns that around:
+
+  1. extract — every student's manifest cells (graders/cell_manifest.py)
+     go into one class table: a column per (tab, cell) holding that cell's
+     value (formula text for formula cells) and number format for every
+     student, in student order.
+
+  2. evaluate — each row check runs over its columns at once. The check's
+     input columns are zipped into one key per student; the checker runs
+     once per DISTINCT key and its result is broadcast to every student
+     with that key. Most of a class types one of a handful of answers
+     into a row, so e.g. "E19:E35 equals =B30*D{row}+B31" or "C19:F19
+     within ±5% of the rate" is evaluated a few dozen times for a class of
+     a thousand.
+
+  3. combine — per student, the row results go through the same combine
+     functions the per-sheet tab graders use, so both paths produce
+     identical results dicts. Score and feedback-code columns per check,
+     and whole-class statistics (mean / min / max score, distinct inputs,
+     feedback code counts), fall out of the same table.
+
+Checks read exactly the cells their @memoized_row declaration lists
+(graders/row_memo.py); row 17 and row 19, which are not memoized, declare
+theirs here. Checks that take the student's name (rows 15 / 16) or another
+row's result (row 18 uses row 16's country entries) have those in their
+key too. Run-wide constants — the FX snapshot, today's date — are the same
+for every student and not part of any key.
+
+    table = ClassTable()
+    for student, source in submissions:
+        table.add(student, extract_submission_cells(source))
+    graded = grade_class(table, rates_snapshot)
+    graded.student("Jane_Doe")   → {"results": {...}, "errors": {...}, "error": None}
+    graded.statistics()          → per-check class statistics
+"""
+
+import inspect
+from collections import Counter
+
+from graders.cell_manifest import MA1_CELL_MANIFEST
+from graders.row_memo import _copy, _freeze
+from utilities.timing import timer
+from utilities.xlsx_cell_reader import CellValue, expand_cell_refs, read_workbook_cells
+
+from graders.income_analysis.check_name_present import check_name_present
+from graders.income_analysis.check_predictions import check_predictions
+from graders.income_analysis.check_predictions_formatting import check_currency_formatting
+from graders.income_analysis.check_slope_intercept import check_slope_intercept
+from graders.income_analysis.check_slope_intercept_formatting import check_slope_intercept_formatting
+from graders.income_analysis.grade_income_analysis import combine_income_analysis
+
+from graders.unit_conversions.row26_checker_v2 import grade_row_26_v2
+from graders.unit_conversions.row27_checker_v2 import grade_row_27_v2
+from graders.unit_conversions.row28_checker_v2 import grade_row_28_v2
+from graders.unit_conversions.row29_checker_v2 import grade_row_29_v2
+from graders.unit_conversions.temp_conversions_v2 import grade_temp_conversions_v2
+from graders.unit_conversions.unit_conversions_checker_v2 import combine_unit_conversion_rows
+
+from graders.currency_conversion.grade_currency_conversion_tab_v2 import (
+    combine_currency_conversion,
+    grade_row19_against_snapshot,
+)
+from graders.currency_conversion.row15_name_letters_v2 import grade_row15_name_letters_v2
+from graders.currency_conversion.row16_country_selection_v2 import grade_row16_country_selection_v2
+from graders.currency_conversion.row17_date_entries_v2 import grade_row17_date_entries_v2
+from graders.currency_conversion.row18_currency_codes_v2 import grade_row18_currency_codes_v2
+from graders.currency_conversion.row20_budget_conversion_v2 import grade_row20_budget_conversion_v2
+from graders.currency_conversion.row21_usd_conversion_back_v2 import grade_row21_usd_conversion_back_v2
+
+
+# ------------------------------
+# CLASS TABLE (extract)
+# ------------------------------
+def extract_submission_cells(source, manifest: dict = MA1_CELL_MANIFEST) -> dict:
+    """
+    One student's row of the class table.
+
+    Args:
+        source: path to the .xlsx or a binary file-like object
+        manifest (dict): {tab: [cells / ranges]} to extract
+
+    Returns:
+        dict with:
+          cells: {(tab, cell): (value, number_format)}
+          missing: {tab: exception} for tabs the workbook doesn't have
+          error: exception when the workbook couldn't be read at all, else None
+    """
+    row = {"cells": {}, "missing": {}, "error": None}
+    try:
+        wb = read_workbook_cells(source, manifest)
+    except Exception as e:
+        row["error"] = e
+        return row
+
+    for tab, refs in manifest.items():
+        try:
+            sheet = wb[tab]
+        except KeyError as e:
+            row["missing"][tab] = e
+            continue
+        for cell in expand_cell_refs(refs):
+            found = sheet[cell]
+            row["cells"][(tab, cell)] = (found.value, found.number_format)
+    return row
+
+
+class ClassTable:
+    """
+    The rubric cells of a whole class, one column per (tab, cell).
+
+    Students whose workbook couldn't be read are kept in `unreadable` and
+    have no row; students missing a tab have blank cells there and are
+    skipped by that tab's checks (`missing`).
+    """
+
+    def __init__(self, manifest: dict = MA1_CELL_MANIFEST):
+        self.manifest = manifest
+        self.students = []
+        self.values = {}   # (tab, cell) → [value per student]
+        self.formats = {}  # (tab, cell) → [number format per student]
+        self.missing = []  # per student: {tab: exception}
+        self.unreadable = {}  # student → exception
+        for tab, refs in manifest.items():
+            for cell in expand_cell_refs(refs):
+                self.values[(tab, cell)] = []
+                self.formats[(tab, cell)] = []
+
+    def add(self, student: str, row: dict):
+        """Appends one extract_submission_cells() row."""
+        if row["error"] is not None:
+            self.unreadable[student] = row["error"]
+            return
+        self.students.append(student)
+        self.missing.append(row["missing"])
+        cells = row["cells"]
+        for column in self.values:
+            value, number_format = cells.get(column, (None, "General"))
+            self.values[column].append(value)
+            self.formats[column].append(number_format)
+
+    def column(self, tab: str, cell: str, formats: bool = False) -> list:
+        """A cell's values (or number formats) for every student."""
+        columns = self.formats if formats else self.values
+        try:
+            return columns[(tab, cell)]
+        except KeyError:
+            raise KeyError(f"Cell {cell} is not in the cell manifest for sheet '{tab}'.") from None
+
+    def __len__(self):
+        return len(self.students)
+
+
+class _RowView:
+    """One student's cells of one tab, shaped like a sheet (sheet["A1"].value)."""
+
+    def __init__(self, table: ClassTable, tab: str, index: int):
+        self.title = tab
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, coordinate: str) -> CellValue:
+        key = str(coordinate).replace("$", "").upper()
+        value = self._table.column(self.title, key)[self._index]
+        number_format = self._table.column(self.title, key, formats=True)[self._index]
+        return CellValue(key, value, number_format)
+
+
+# ------------------------------
+# CHECKS (evaluate)
+# ------------------------------
+class _Failed:
+    """A checker raised for this input; the tab reports the exception."""
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+class BatchCheck:
+    """
+    One row checker as a column operation.
+
+    Args:
+        check_id (str): name in score / code columns and statistics
+        tab (str): sheet the checker reads
+        fn: the row checker, fn(sheet, *args, *shared)
+        values / formats: cells whose values / number formats it reads
+                 (default: its @memoized_row declaration)
+        student (bool): pass the student's name as the first argument
+        depends (tuple): check ids whose results are arguments, via `args`
+        args: callable(results of `depends`) → tuple of extra arguments
+        shared (tuple): names of run-wide constants appended to the call
+    """
+
+    def __init__(self, check_id: str, tab: str, fn, values=None, formats=None,
+                 student: bool = False, depends: tuple = (), args=None, shared: tuple = ()):
+        declared = getattr(fn, "row_inputs", ((), ()))
+        self.id = check_id
+        self.tab = tab
+        # Columns are deduplicated here, so the per-call memo / timer wrappers are skipped
+        self.fn = inspect.unwrap(fn)
+        self.values = tuple(expand_cell_refs(values)) if values is not None else declared[0]
+        self.formats = tuple(expand_cell_refs(formats)) if formats is not None else declared[1]
+        self.student = student
+        self.depends = tuple(depends)
+        self.args = args
+        self.shared = tuple(shared)
+
+        if not self.values and not self.formats:
+            raise ValueError(
+                f"Batch check has no input cells.\n"
+                f"- Check: {check_id}\n"
+                f"Fix: declare them with @memoized_row or pass values= / formats=."
+            )
+
+
+def _row16_entries(row16):
+    return (row16[2],)
+
+
+IA = "Income Analysis"
+UC = "Unit Conversions"
+CC = "Currency Conversion"
+
+BATCH_CHECKS = (
+    BatchCheck("ia_name", IA, check_name_present),
+    BatchCheck("ia_slope_intercept", IA, check_slope_intercept),
+    BatchCheck("ia_slope_intercept_formatting", IA, check_slope_intercept_formatting),
+    BatchCheck("ia_predictions", IA, check_predictions),
+    BatchCheck("ia_predictions_formatting", IA, check_currency_formatting),
+
+    BatchCheck("uc_row26", UC, grade_row_26_v2),
+    BatchCheck("uc_row27", UC, grade_row_27_v2),
+    BatchCheck("uc_row28", UC, grade_row_28_v2),
+    BatchCheck("uc_row29", UC, grade_row_29_v2),
+    BatchCheck("uc_temp", UC, grade_temp_conversions_v2),
+
+    BatchCheck("cc_row15", CC, grade_row15_name_letters_v2, student=True),
+    BatchCheck("cc_row16", CC, grade_row16_country_selection_v2, student=True),
+    BatchCheck("cc_row17", CC, grade_row17_date_entries_v2, values=["C17:F17"]),
+    BatchCheck("cc_row18", CC, grade_row18_currency_codes_v2, depends=("cc_row16",), args=_row16_entries),
+    BatchCheck("cc_row19", CC, grade_row19_against_snapshot,
+               values=["C18:F19"], formats=["C19:F19"], shared=("rates_snapshot",)),
+    BatchCheck("cc_row20", CC, grade_row20_budget_conversion_v2),
+    BatchCheck("cc_row21", CC, grade_row21_usd_conversion_back_v2),
+)
+
+# Tab results key → (sheet, combine function, its check ids, run-wide constants appended)
+BATCH_TABS = {
+    "income_analysis": (IA, combine_income_analysis, (
+        "ia_name", "ia_slope_intercept", "ia_slope_intercept_formatting",
+        "ia_predictions", "ia_predictions_formatting",
+    ), ()),
+    "unit_conversions_v2": (UC, combine_unit_conversion_rows, (
+        "uc_row26", "uc_row27", "uc_row28", "uc_row29", "uc_temp",
+    ), ()),
+    "currency_conversion_v2": (CC, combine_currency_conversion, (
+        "cc_row15", "cc_row16", "cc_row17", "cc_row18", "cc_row19", "cc_row20", "cc_row21",
+    ), ("rates_snapshot",)),
+}
+
+
+def _evaluate(check: BatchCheck, table: ClassTable, columns: dict, shared: dict) -> tuple:
+    """
+    Runs one check over the whole class.
+
+    Returns:
+        (results column — None where the student lacks the tab, distinct inputs evaluated)
+    """
+    key_columns = [table.column(check.tab, cell) for cell in check.values]
+    key_columns += [table.column(check.tab, cell, formats=True) for cell in check.formats]
+    if check.student:
+        key_columns.append(table.students)
+    key_columns += [columns[dep] for dep in check.depends]
+
+    constants = tuple(shared[name] for name in check.shared)
+    distinct = {}
+    results = []
+
+    for index, key in enumerate(zip(*key_columns)):
+        if check.tab in table.missing[index]:
+            results.append(None)
+            continue
+
+        upstream = [columns[dep][index] for dep in check.depends]
+        failed = next((r for r in upstream if isinstance(r, _Failed)), None)
+        if failed is not None:
+            results.append(failed)
+            continue
+
+        try:
+            frozen = _freeze(key)
+            hash(frozen)
+        except TypeError:
+            frozen = None  # unhashable cell value: evaluate this student on their own
+
+        if frozen is None or frozen not in distinct:
+            args = (table.students[index],) if check.student else ()
+            if check.depends:
+                args += check.args(*upstream)
+            try:
+                result = check.fn(_RowView(table, check.tab, index), *args, *constants)
+            except Exception as e:
+                result = _Failed(e)
+            if frozen is None:
+                results.append(result)
+                continue
+            distinct[frozen] = result
+
+        results.append(distinct[frozen])
+
+    return results, len(distinct)
+
+
+# ------------------------------
+# SCORE / CODE COLUMNS
+# ------------------------------
+def _is_feedback(value) -> bool:
+    return isinstance(value, list) and all(
+        isinstance(item, tuple) and len(item) == 2 and isinstance(item[0], str) for item in value
+    )
+
+
+def check_score(result) -> float | None:
+    """
+    Points of one checker result: the first element of a (score, ...) tuple,
+    or the sum of the *_score entries of a row dict.
+
+    Returns:
+        float, or None for a missing tab / failed checker
+    """
+    if isinstance(result, tuple):
+        return float(result[0])
+    if isinstance(result, dict):
+        return float(sum(v for k, v in result.items() if k.endswith("_score")))
+    return None
+
+
+def check_codes(result) -> list:
+    """
+    Feedback codes of one checker result, in order.
+
+    Returns:
+        list of code strings ([] for a missing tab / failed checker)
+    """
+    if isinstance(result, tuple):
+        parts = result
+    elif isinstance(result, dict):
+        parts = [v for k, v in result.items() if k.endswith("_feedback")]
+    else:
+        return []
+    return [code for part in parts if _is_feedback(part) for code, _params in part]
+
+
+class ClassGrade:
+    """
+    Whole-class grading results: per-check result / score / code columns,
+    and per-student tab results identical to the per-sheet graders'.
+    """
+
+    def __init__(self, table: ClassTable, columns: dict, distinct: dict, shared: dict):
+        self.table = table
+        self.columns = columns  # check id → [checker result per student]
+        self.distinct = distinct  # check id → distinct inputs evaluated
+        self.shared = shared
+        self._index = {student: i for i, student in enumerate(table.students)}
+
+    def __contains__(self, student) -> bool:
+        return student in self._index or student in self.table.unreadable
+
+    def scores(self, check_id: str) -> list:
+        """Score column of a check (None where it didn't run)."""
+        return [check_score(result) for result in self.columns[check_id]]
+
+    def codes(self, check_id: str) -> list:
+        """Feedback-code column of a check: one list of codes per student."""
+        return [check_codes(result) for result in self.columns[check_id]]
+
+    def student(self, student: str) -> dict:
+        """
+        One student's graded tabs, for writing their grading sheet.
+
+        Returns:
+            dict with:
+              results: {tab key: results dict} (same shape as the tab graders')
+              errors: {tab key: exception} for tabs that are missing or whose
+                      checker raised (the per-sheet path raises the same)
+              error: exception when the workbook couldn't be read, else None
+        """
+        graded = {"results": {}, "errors": {}, "error": self.table.unreadable.get(student)}
+        if graded["error"] is not None:
+            return graded
+        if student not in self._index:
+            raise KeyError(f"Student {student!r} is not in the class table.")
+
+        index = self._index[student]
+        for tab_key, (tab, combine, check_ids, constants) in BATCH_TABS.items():
+            if tab in self.table.missing[index]:
+                graded["errors"][tab_key] = self.table.missing[index][tab]
+                continue
+            rows = [self.columns[check_id][index] for check_id in check_ids]
+            failed = next((r for r in rows if isinstance(r, _Failed)), None)
+            if failed is not None:
+                graded["errors"][tab_key] = failed.error
+                continue
+            # Students sharing an input share the cached result: hand out copies
+            rows = [_copy(row) for row in rows]
+            graded["results"][tab_key] = combine(*rows, *(self.shared[name] for name in constants))
+        return graded
+
+    def statistics(self) -> dict:
+        """
+        Whole-class statistics per check.
+
+        Returns:
+            dict with:
+              students, unreadable, row_checks (student × check results),
+              evaluations (distinct inputs actually graded),
+              checks: {check id: {tab, graded, distinct_inputs, mean, min, max, codes}}
+        """
+        checks = {}
+        for check in BATCH_CHECKS:
+            scores = [s for s in self.scores(check.id) if s is not None]
+            codes = Counter(code for row in self.codes(check.id) for code in row)
+            checks[check.id] = {
+                "tab": check.tab,
+                "graded": len(scores),
+                "distinct_inputs": self.distinct[check.id],
+                "mean": round(sum(scores) / len(scores), 3) if scores else None,
+                "min": min(scores) if scores else None,
+                "max": max(scores) if scores else None,
+                "codes": dict(codes.most_common()),
+            }
+        return {
+            "students": len(self.table),
+            "unreadable": len(self.table.unreadable),
+            "row_checks": sum(c["graded"] for c in checks.values()),
+            "evaluations": sum(self.distinct.values()),
+            "checks": checks,
+        }
+
+
+def describe_class_statistics(stats: dict) -> str:
+    """One-line form for the console, e.g. "680 row checks over 40 students → 131 evaluations"."""
+    return (
+        f"{stats['row_checks']} row checks over {stats['students']} students "
+        f"→ {stats['evaluations']} evaluations"
+    )
+
+
+def grade_class(table: ClassTable, rates_snapshot: dict) -> ClassGrade:
+    """
+    Evaluates every batch check over the class table.
+
+    Args:
+        table (ClassTable): the extracted class
+        rates_snapshot (dict): the run-wide FX snapshot (row 19)
+
+    Returns:
+        ClassGrade
+    """
+    shared = {"rates_snapshot": rates_snapshot}
+    columns = {}
+    distinct = {}
+    for check in BATCH_CHECKS:
+        with timer(f"batch.{check.id}"):
+            columns[check.id], distinct[check.id] = _evaluate(check, table, columns, shared)
+    return ClassGrade(table, columns, distinct, shared)
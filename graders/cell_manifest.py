@@ -0,0 +1,24 @@
+# graders/cell_manifest.py
+
+"""
+Every cell the MA1 graders read from a student workbook, per tab.
+
+The targeted reader (utilities/xlsx_cell_reader.py) extracts exactly these
+cells instead of loading the whole workbook. If a row checker starts reading
+a new cell, add it here — the reader raises KeyError for undeclared cells.
+Tabs graded from a declarative rubric (graders/rubric_plan.py) take their
+cells from the compiled plan.
+"""
+
+from graders.rubric_plan import load_rubric_plan
+
+MA1_CELL_MANIFEST = {
+    # check_name_present, check_slope_intercept(_formatting), check_predictions(_formatting)
+    "Income Analysis": ["B1", "B30", "B31", "E19:E35"],
+
+    # rows 26–29 + temperature conversions (rubrics/unit_conversions.json)
+    "Unit Conversions": list(load_rubric_plan("unit_conversions").cells),
+
+    # rows 15–21 (C..F) + trip budget B4 and foreign amount D4
+    "Currency Conversion": ["B4", "D4", "C15:F21"],
+}
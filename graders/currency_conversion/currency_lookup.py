@@ -1,5 +1,9 @@
 # currency_lookup.py
 
+import unicodedata
+from collections import Counter
+from types import MappingProxyType
+
 country_currency_dict = {
     "Afghanistan": "AFN",
     "Albania": "ALL",
@@ -8,7 +12,6 @@ country_currency_dict = {
     "Argentina": "ARS",
     "Armenia": "AMD",
     "Aruba": "AWG",
-    "Netherlands":"AWG",
     "Australia": "AUD",
     "Azerbaijan": "AZN",
     "Bahamas": "BSD",
@@ -166,19 +169,194 @@ country_currency_dict = {
     "Yemen": "YER",
     "Zambia": "ZMW"
 }
+
+# Other spellings students use for approved countries -> key in country_currency_dict
+COUNTRY_ALIASES = {
+    "Hong Kong": "Hong Kong (China)",
+    "Hong Kong SAR": "Hong Kong (China)",
+    "Macau": "Macau (China)",
+    "Macao": "Macau (China)",
+    "Côte d'Ivoire": "Ivory Coast",
+    "UK": "United Kingdom",
+    "U.K.": "United Kingdom",
+    "Great Britain": "United Kingdom",
+    "Britain": "United Kingdom",
+    "England": "United Kingdom",
+    "UAE": "United Arab Emirates",
+    "Czech Republic": "Czechia",
+    "Cape Verde": "Cabo Verde",
+    "Burma": "Myanmar",
+    "Holland": "Netherlands",
+    "Türkiye": "Turkey",
+    "Russian Federation": "Russia",
+    "Macedonia": "North Macedonia",
+    "Republic of Korea": "South Korea",
+    "Korea, South": "South Korea",
+    "Korea, North": "North Korea",
+    "Democratic Republic of the Congo": "Congo",
+    "DR Congo": "Congo",
+    "Lao PDR": "Laos",
+    "Viet Nam": "Vietnam",
+    "Brunei Darussalam": "Brunei",
+    "Falkland Islands (Malvinas)": "Falkland Islands",
+    "IMF": "International Monetary Fund",
+}
+
+# Row 16 checks a country's initial on its approved name. These reviewed,
+# official alternate names count with their own initial too; every other
+# alias is recognised but takes the approved name's initial
+# (England -> United Kingdom counts for U).
+INITIAL_ALTERNATE_NAMES = {
+    "Ivory Coast": ("Côte d'Ivoire",),
+}
+
+# Trigram overlap (Dice coefficient) a near miss needs before it is suggested
+SUGGESTION_MIN_SIMILARITY = 0.4
+
+_DROPPED_CHARS = str.maketrans("", "", "'’`,().")
+
+
+def normalize_country_name(name) -> str:
+    """
+    Lookup key for a country as typed: case, accents, punctuation and
+    repeated spaces are ignored ("Côte d'Ivoire" -> "cote divoire").
+    """
+    if not name:
+        return ""
+    text = unicodedata.normalize("NFKD", str(name))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = text.lower().replace("&", " and ").replace("-", " ").translate(_DROPPED_CHARS)
+    return " ".join(text.split())
+
+
+def _trigrams(key: str) -> frozenset:
+    padded = f"  {key} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+# ------------------------------
+# INDEXES (built once at import, read-only)
+# ------------------------------
+def _build_indexes():
+    by_key = {}
+    for country in country_currency_dict:
+        by_key[normalize_country_name(country)] = country
+
+    for alias, country in COUNTRY_ALIASES.items():
+        if country not in country_currency_dict:
+            raise KeyError(
+                f"Country alias points at an unknown country.\n"
+                f"- Alias: {alias}\n"
+                f"- Country: {country}"
+            )
+        key = normalize_country_name(alias)
+        if by_key.get(key, country) != country:
+            raise ValueError(
+                f"Country alias clashes with another country.\n"
+                f"- Alias: {alias} -> {country}\n"
+                f"- Already: {by_key[key]}"
+            )
+        by_key[key] = country
+
+    for country, alternates in INITIAL_ALTERNATE_NAMES.items():
+        for alternate in alternates:
+            if COUNTRY_ALIASES.get(alternate) != country:
+                raise KeyError(
+                    f"Initial alternate name is not an alias of its country.\n"
+                    f"- Alternate: {alternate}\n"
+                    f"- Country: {country}\n"
+                    f"Fix: add it to COUNTRY_ALIASES first."
+                )
+
+    by_code = {}
+    for country, code in country_currency_dict.items():
+        by_code.setdefault(code, []).append(country)
+
+    key_trigrams = {key: _trigrams(key) for key in by_key}
+    by_trigram = {}
+    for key, grams in key_trigrams.items():
+        for gram in grams:
+            by_trigram.setdefault(gram, []).append(key)
+
+    return (
+        MappingProxyType(by_key),
+        MappingProxyType({code: tuple(countries) for code, countries in by_code.items()}),
+        MappingProxyType(key_trigrams),
+        MappingProxyType({gram: tuple(keys) for gram, keys in by_trigram.items()}),
+    )
+
+
+_COUNTRY_BY_KEY, _COUNTRIES_BY_CODE, _KEY_TRIGRAMS, _KEYS_BY_TRIGRAM = _build_indexes()
+
+
+# ------------------------------
+# LOOKUPS
+# ------------------------------
 def get_country_entry_by_name(country_name: str):
-    if not country_name:
+    """
+    Approved country for a name as typed (canonical names and aliases).
+
+    Returns:
+        {"country": <canonical name>, "currency_code": <ISO code>} or None
+    """
+    country = _COUNTRY_BY_KEY.get(normalize_country_name(country_name))
+    if country is None:
         return None
+    return {"country": country, "currency_code": country_currency_dict[country]}
+
+
+def initial_names(country: str, typed_name: str) -> tuple:
+    """
+    Names whose first letter counts in row 16 for an approved country as
+    the student typed it: the approved name, plus the typed name when it
+    is one of the country's INITIAL_ALTERNATE_NAMES.
+
+    Returns:
+        tuple of names
+    """
+    typed_key = normalize_country_name(typed_name)
+    for alternate in INITIAL_ALTERNATE_NAMES.get(country, ()):
+        if normalize_country_name(alternate) == typed_key:
+            return country, alternate
+    return (country,)
+
+
+def countries_for_currency(currency_code: str) -> tuple:
+    """
+    Approved countries that use a currency code (e.g. "EUR").
+
+    Returns:
+        tuple of canonical country names (empty if none)
+    """
+    return _COUNTRIES_BY_CODE.get(str(currency_code or "").strip().upper(), ())
+
 
-    normalized = country_name.strip().lower()
+def suggest_countries(country_name: str, limit: int = 3) -> list:
+    """
+    Approved countries a misspelt name probably meant, best match first.
+    Only the trigram postings of the typed name are visited, so the cost
+    does not grow with the size of the approved list.
 
-    # ✅ Allow flexible lookup ignoring repeated spaces or punctuation differences
-    normalized = normalized.replace("'", "").replace(",", "").replace("(", "").replace(")", "").replace("  ", " ")
+    Returns:
+        list of canonical country names (at most `limit`, possibly empty)
+    """
+    key = normalize_country_name(country_name)
+    if not key:
+        return []
 
-    for name, code in country_currency_dict.items():
-        canonical = name.lower().replace("'", "").replace(",", "").replace("(", "").replace(")", "").replace("  ", " ")
-        if canonical == normalized:
-            return {"country": name, "currency_code": code}
+    grams = _trigrams(key)
+    shared = Counter(k for gram in grams for k in _KEYS_BY_TRIGRAM.get(gram, ()))
 
-    return None
+    ranked = sorted(
+        ((2 * hits / (len(grams) + len(_KEY_TRIGRAMS[k])), k) for k, hits in shared.items()),
+        key=lambda item: (-item[0], item[1]),
+    )
 
+    suggestions = []
+    for similarity, k in ranked:
+        if similarity < SUGGESTION_MIN_SIMILARITY or len(suggestions) >= limit:
+            break
+        country = _COUNTRY_BY_KEY[k]
+        if country not in suggestions:
+            suggestions.append(country)
+    return suggestions
@@ -4,18 +4,26 @@ from .row15_name_letters_v2 import grade_row15_name_letters_v2
 from .row16_country_selection_v2 import grade_row16_country_selection_v2
 from .row17_date_entries_v2 import grade_row17_date_entries_v2
 from .row18_currency_codes_v2 import grade_row18_currency_codes_v2
-from .row19_exchange_rates_v2 import grade_row19_exchange_rates_v2, fetch_live_usd_rates
+from .row19_exchange_rates_v2 import grade_row19_exchange_rates_v2
 from .row20_budget_conversion_v2 import grade_row20_budget_conversion_v2
 from .row21_usd_conversion_back_v2 import grade_row21_usd_conversion_back_v2
+from .rates_snapshot import get_rates_snapshot
+from utilities.timing import timed
 
 
-def grade_currency_conversion_tab_v2(sheet, student_name: str):
+@timed("tab.currency_conversion")
+def grade_currency_conversion_tab_v2(sheet, student_name: str, rates_snapshot: dict | None = None):
     """
     Currency Conversion V2 wrapper.
 
     Matches the V1 wrapper's scoring categories and keys, but uses V2 graders
     that return feedback as (code, params).
 
+    rates_snapshot:
+      The run-wide FX snapshot (see rates_snapshot.py). The pipeline fetches it
+      once and passes the same snapshot for every student. If omitted, the
+      workspace cache is used (and refreshed when older than its TTL).
+
     Returns:
       dict with:
         row15_score, row15_feedback
@@ -26,48 +34,84 @@ def grade_currency_conversion_tab_v2(sheet, student_name: str):
         row20_formula_score, row20_format_score, row20_feedback
         row21_formula_score, row21_format_score, row21_feedback
         formatting_total
+        rates_snapshot_at, rates_snapshot_source
     """
 
+    if rates_snapshot is None:
+        rates_snapshot = get_rates_snapshot()
+
+    row16 = grade_row16_country_selection_v2(sheet, student_name)
+    return combine_currency_conversion(
+        grade_row15_name_letters_v2(sheet, student_name),
+        row16,
+        grade_row17_date_entries_v2(sheet),
+        grade_row18_currency_codes_v2(sheet, row16[2]),  # row 16's entries
+        grade_row19_against_snapshot(sheet, rates_snapshot),
+        grade_row20_budget_conversion_v2(sheet),
+        grade_row21_usd_conversion_back_v2(sheet),
+        rates_snapshot,
+    )
+
+
+def grade_row19_against_snapshot(sheet, rates_snapshot: dict):
+    """
+    Row 19 (API-based), graded against the run-wide snapshot (fetched once
+    per run). A snapshot that failed to load scores 0 with the fetch error.
+
+    Returns:
+      (total_score, accuracy_score, format_score, feedback)
+    """
+    err = rates_snapshot.get("error")
+    if err:
+        return 0.0, 0.0, 0.0, [("CC19_API_FETCH_FAILED", {"error": err})]
+    return grade_row19_exchange_rates_v2(sheet, live_rates=rates_snapshot["rates"])
+
+
+def combine_currency_conversion(row15, row16, row17, row18, row19, row20, row21, rates_snapshot: dict) -> dict:
+    """
+    Builds the tab results from the row checkers' return values.
+    Shared by the per-sheet grader above and the batch engine.
+
+    Returns:
+      dict (see grade_currency_conversion_tab_v2)
+    """
     results = {}
 
     # -----------------------------
     # Row 15
     # -----------------------------
-    score15, fb15 = grade_row15_name_letters_v2(sheet, student_name)
+    score15, fb15 = row15
     results["row15_score"] = score15
     results["row15_feedback"] = fb15
 
     # -----------------------------
-    # Row 16 (returns entries used by row 18)
+    # Row 16
     # -----------------------------
-    score16, fb16, country_entries = grade_row16_country_selection_v2(sheet, student_name)
+    score16, fb16, _country_entries = row16
     results["row16_score"] = score16
     results["row16_feedback"] = fb16
 
     # -----------------------------
     # Row 17
     # -----------------------------
-    score17, fb17, _parsed_dates = grade_row17_date_entries_v2(sheet)
+    score17, fb17, _parsed_dates = row17
     results["row17_score"] = score17
     results["row17_feedback"] = fb17
 
     # -----------------------------
     # Row 18
     # -----------------------------
-    score18, fb18 = grade_row18_currency_codes_v2(sheet, country_entries)
+    score18, fb18 = row18
     results["row18_score"] = score18
     results["row18_feedback"] = fb18
 
     # -----------------------------
-    # Row 19 (API-based)
-    # Fetch once and pass in (future-proof + faster)
+    # Row 19
     # -----------------------------
-    live_rates, err = fetch_live_usd_rates()
-    if err:
-        score19_total, acc19, fmt19 = 0.0, 0.0, 0.0
-        fb19 = [("CC19_API_FETCH_FAILED", {"error": err})]
-    else:
-        score19_total, acc19, fmt19, fb19 = grade_row19_exchange_rates_v2(sheet, live_rates=live_rates)
+    results["rates_snapshot_at"] = rates_snapshot.get("fetched_at")
+    results["rates_snapshot_source"] = rates_snapshot.get("source")
+
+    score19_total, acc19, fmt19, fb19 = row19
 
     # Wrapper-compatible split (same style as V1)
     results["row19_accuracy_score"] = round(min(acc19, 4.0), 2)
@@ -77,7 +121,7 @@ def grade_currency_conversion_tab_v2(sheet, student_name: str):
     # -----------------------------
     # Row 20
     # -----------------------------
-    score20_total, formula20, fmt20, fb20 = grade_row20_budget_conversion_v2(sheet)
+    score20_total, formula20, fmt20, fb20 = row20
     results["row20_formula_score"] = round(min(formula20, 8.0), 2)
     results["row20_format_score"] = round(max(0.0, fmt20), 2)
     results["row20_feedback"] = fb20
@@ -85,7 +129,7 @@ def grade_currency_conversion_tab_v2(sheet, student_name: str):
     # -----------------------------
     # Row 21
     # -----------------------------
-    score21_total, formula21, fmt21, fb21 = grade_row21_usd_conversion_back_v2(sheet)
+    score21_total, formula21, fmt21, fb21 = row21
     results["row21_formula_score"] = round(min(formula21, 8.0), 2)
     results["row21_format_score"] = round(max(0.0, fmt21), 2)
     results["row21_feedback"] = fb21
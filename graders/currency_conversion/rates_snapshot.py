@@ -0,0 +1,151 @@
+# graders/currency_conversion/rates_snapshot.py
+
+"""
+One exchange-rate snapshot per pipeline run.
+
+Row 19 compares each student's rates against live USD rates. Fetching those
+rates per student means hundreds of blocking HTTPS calls and students graded
+seconds apart being scored against different numbers. Instead, the pipeline
+takes ONE snapshot up front and hands it to every student.
+
+Snapshot format (also the on-disk JSON format):
+    {
+      "base": "USD",
+      "rates": {"EUR": 0.92, ...},
+      "fetched_at": "2026-03-01T14:05:09+00:00",   # UTC, ISO-8601
+      "fetched_at_epoch": 1772373909.0,
+      "source": "live" | "cache" | "file",
+      "error": None | "message"
+    }
+
+Snapshots are cached in the workspace:
+    Documents/MA1_Autograder/cache/usd_rates_snapshot.json
+and reused while younger than the TTL. A saved snapshot file can also be
+passed in explicitly to grade fully offline.
+"""
+
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+from utilities.paths import ws_path
+from utilities.timing import timer
+from graders.currency_conversion.row19_exchange_rates_v2 import fetch_live_usd_rates
+
+
+DEFAULT_CACHE_TTL_SECONDS = 6 * 60 * 60  # 6 hours
+
+
+def default_snapshot_cache_path() -> str:
+    return ws_path("cache", "usd_rates_snapshot.json")
+
+
+def _make_snapshot(rates: dict, fetched_at_epoch: float, source: str, error=None) -> dict:
+    fetched_at = datetime.fromtimestamp(fetched_at_epoch, tz=timezone.utc).isoformat(timespec="seconds")
+    return {
+        "base": "USD",
+        "rates": dict(rates or {}),
+        "fetched_at": fetched_at,
+        "fetched_at_epoch": float(fetched_at_epoch),
+        "source": source,
+        "error": error,
+    }
+
+
+def fetch_rates_snapshot() -> dict:
+    """
+    Fetch live USD rates ONCE and wrap them as a snapshot.
+    Never raises: a failed fetch returns a snapshot with empty rates + error.
+    """
+    with timer("fx.fetch"):
+        rates, err = fetch_live_usd_rates()
+    return _make_snapshot(rates, time.time(), "live", err)
+
+
+def save_rates_snapshot(snapshot: dict, path: str) -> str:
+    """Write a snapshot as JSON (temp file + rename, so readers never see half a file)."""
+    path = os.path.abspath(path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_rates_snapshot_file(path: str, source: str = "file") -> dict:
+    """
+    Load a snapshot saved by save_rates_snapshot().
+
+    Raises:
+        FileNotFoundError if the file is missing
+        ValueError if it does not contain usable rates
+    """
+    path = os.path.abspath(path)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Exchange-rate snapshot not found: {path}")
+
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    rates = data.get("rates") if isinstance(data, dict) else None
+    if not isinstance(rates, dict) or not rates:
+        raise ValueError(f"Exchange-rate snapshot has no rates: {path}")
+
+    epoch = data.get("fetched_at_epoch")
+    if epoch is None:
+        epoch = os.path.getmtime(path)
+
+    return _make_snapshot(rates, epoch, source, None)
+
+
+def get_rates_snapshot(
+    snapshot_path: str | None = None,
+    ttl_seconds: float = DEFAULT_CACHE_TTL_SECONDS,
+    offline: bool = False,
+    cache_path: str | None = None,
+) -> dict:
+    """
+    Returns the snapshot to grade a whole run against.
+
+    Priority:
+      1) snapshot_path given → load that file (offline grading, never fetches)
+      2) workspace cache younger than ttl_seconds → reuse it
+      3) offline=True → reuse the cache even if stale (error snapshot if none)
+      4) fetch live, refresh the cache
+         (if the fetch fails, fall back to a stale cache before giving up)
+    """
+    if snapshot_path:
+        return load_rates_snapshot_file(snapshot_path, source="file")
+
+    cache_path = cache_path or default_snapshot_cache_path()
+
+    cached = None
+    try:
+        cached = load_rates_snapshot_file(cache_path, source="cache")
+    except (OSError, ValueError):
+        cached = None
+
+    if cached is not None and (time.time() - cached["fetched_at_epoch"]) < ttl_seconds:
+        return cached
+
+    if offline:
+        if cached is not None:
+            return cached
+        return _make_snapshot({}, time.time(), "cache", "Offline mode and no saved exchange-rate snapshot.")
+
+    snapshot = fetch_rates_snapshot()
+
+    if snapshot["error"]:
+        if cached is not None:
+            return cached
+        return snapshot
+
+    try:
+        save_rates_snapshot(snapshot, cache_path)
+    except OSError:
+        pass  # cache is an optimization; grading continues with the live snapshot
+
+    return snapshot
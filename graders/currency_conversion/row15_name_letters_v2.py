@@ -1,5 +1,9 @@
 # graders/currency_conversion_v2/row15_name_letters_v2.py
 
+from graders.row_memo import memoized_row
+from utilities.timing import timed
+
+
 def _split_student_name(student_name: str):
     """
     Supports:
@@ -27,6 +31,8 @@ def _split_student_name(student_name: str):
     return first, last
 
 
+@timed("row.grade_row15_name_letters_v2")
+@memoized_row("cc_row15", values=["C15:F15"])
 def grade_row15_name_letters_v2(sheet, student_name: str):
     """
     Currency Conversion V2 — Row 15 (C15–F15)
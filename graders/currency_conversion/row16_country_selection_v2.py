@@ -1,7 +1,14 @@
 # graders/currency_conversion_v2/row16_country_selection_v2.py
 
-from graders.currency_conversion.currency_lookup import get_country_entry_by_name
+from graders.currency_conversion.currency_lookup import (
+    get_country_entry_by_name,
+    initial_names,
+    normalize_country_name,
+    suggest_countries,
+)
 from graders.currency_conversion.utils import norm_unit
+from graders.row_memo import memoized_row
+from utilities.timing import timed
 
 
 def _split_student_name(student_name: str):
@@ -32,6 +39,8 @@ def _split_student_name(student_name: str):
     return first, last
 
 
+@timed("row.grade_row16_country_selection_v2")
+@memoized_row("cc_row16", values=["C16:F16"])
 def grade_row16_country_selection_v2(sheet, student_name: str):
     """
     Currency Conversion V2 — Row 16 (C16–F16)
@@ -40,7 +49,11 @@ def grade_row16_country_selection_v2(sheet, student_name: str):
       - C16, D16 must start with first two letters of FIRST name
       - E16, F16 must start with first two letters of LAST name
       - 0.5 pts each cell (max 2.0)
-      - Country must exist on approved list (currency_lookup)
+      - Country must exist on approved list (currency_lookup); near misses
+        get a "did you mean" suggestion
+      - The initial is checked on the approved name (England counts as
+        United Kingdom, so for U), plus the few official alternate names
+        in currency_lookup.INITIAL_ALTERNATE_NAMES when typed (Côte d'Ivoire for C)
 
     Returns:
       (score: float, feedback: list[(code, params)], country_entries: list[entry_or_none])
@@ -76,17 +89,31 @@ def grade_row16_country_selection_v2(sheet, student_name: str):
         entry = get_country_entry_by_name(country_name)
 
         if not entry:
-            feedback.append(("CC16_COUNTRY_NOT_APPROVED", {"cell": cell, "found": country_name}))
+            suggestions = suggest_countries(country_name, limit=1)
+            if suggestions:
+                feedback.append((
+                    "CC16_COUNTRY_NOT_APPROVED_SUGGEST",
+                    {"cell": cell, "found": country_name, "suggestion": suggestions[0]}
+                ))
+            else:
+                feedback.append(("CC16_COUNTRY_NOT_APPROVED", {"cell": cell, "found": country_name}))
             continue
 
         canonical_country = entry["country"]
-
-        if not canonical_country.lower().startswith(expected_letter.lower()):
+        typed_country = str(raw).strip()
+        # The student's entry, with the approved name it counts as when that differs
+        if normalize_country_name(typed_country) == normalize_country_name(canonical_country):
+            shown_country = canonical_country
+        else:
+            shown_country = f"{typed_country} ({canonical_country})"
+
+        letter = normalize_country_name(expected_letter)
+        if not any(normalize_country_name(name).startswith(letter) for name in initial_names(canonical_country, typed_country)):
             feedback.append((
                 "CC16_COUNTRY_WRONG_INITIAL",
                 {
                     "cell": cell,
-                    "country": canonical_country,
+                    "country": shown_country,
                     "expected_letter": expected_letter.upper()
                 }
             ))
@@ -98,7 +125,7 @@ def grade_row16_country_selection_v2(sheet, student_name: str):
             "CC16_COUNTRY_CORRECT",
             {
                 "cell": cell,
-                "country": canonical_country,
+                "country": shown_country,
                 "expected_letter": expected_letter.upper()
             }
         ))
@@ -1,8 +1,10 @@
 # graders/currency_conversion_v2/row17_date_entries_v2.py
 
 from datetime import datetime, date
+from utilities.timing import timed
 
 
+@timed("row.grade_row17_date_entries_v2")
 def grade_row17_date_entries_v2(sheet):
     """
     Currency Conversion V2 — Row 17 (C17–F17)
@@ -59,7 +61,7 @@ def grade_row17_date_entries_v2(sheet):
             parsed_dates.append(date_val)
 
         except Exception:
-            feedback.append(("CC17_DATE_PARSE_ERROR", {"cell": cell}))
+            feedback.append(("CC17_DATE_PARSE_ERROR", {"cell": cell, "found": str(cell_value).strip()}))
             parsed_dates.append(None)
 
     score_rounded = round(score, 1)
@@ -1,5 +1,11 @@
 # graders/currency_conversion_v2/row18_currency_codes_v2.py
 
+from graders.row_memo import memoized_row
+from utilities.timing import timed
+
+
+@timed("row.grade_row18_currency_codes_v2")
+@memoized_row("cc_row18", values=["C18:F18"])
 def grade_row18_currency_codes_v2(sheet, country_entries):
     """
     Currency Conversion V2 — Row 18 (C18–F18)
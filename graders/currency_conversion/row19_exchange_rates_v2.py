@@ -2,6 +2,8 @@
 
 import requests
 
+from utilities.timing import timed
+
 
 def fetch_live_usd_rates():
     """
@@ -19,6 +21,7 @@ def fetch_live_usd_rates():
         return {}, str(e)
 
 
+@timed("row.grade_row19_exchange_rates_v2")
 def grade_row19_exchange_rates_v2(sheet, live_rates=None):
     """
     Currency Conversion V2 — Row 19 (C19–F19)
@@ -66,7 +69,10 @@ def grade_row19_exchange_rates_v2(sheet, live_rates=None):
             upper = true_rate * 1.05
 
             if student_rate is None:
-                feedback.append(("CC19_RATE_NOT_NUMERIC", {"rate_cell": rate_cell}))
+                feedback.append((
+                    "CC19_RATE_NOT_NUMERIC",
+                    {"rate_cell": rate_cell, "found": str(raw_rate).strip() if raw_rate is not None else ""}
+                ))
             else:
                 if lower <= float(student_rate) <= upper:
                     accuracy_score += 1.0
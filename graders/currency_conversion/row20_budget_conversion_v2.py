@@ -1,8 +1,12 @@
 # graders/currency_conversion_v2/row20_budget_conversion_v2.py
 
-from ..currency_conversion.utils import norm_unit
+from graders.row_memo import memoized_row
+from utilities.formula_parser import formula_key
+from utilities.timing import timed
 
 
+@timed("row.grade_row20_budget_conversion_v2")
+@memoized_row("cc_row20", values=["C20:F20"], formats=["C20:F20"])
 def grade_row20_budget_conversion_v2(sheet):
     """
     Currency Conversion V2 — Row 20 (C20–F20)
@@ -39,18 +43,20 @@ def grade_row20_budget_conversion_v2(sheet):
         if not isinstance(raw_formula, str) or not raw_formula.startswith("="):
             feedback.append(("CC20_FORMULA_MISSING", {"cell": target_cell, "rate_ref": rate_ref}))
         else:
-            f = norm_unit(raw_formula)  # your existing normalizer (lowercases & strips)
-
-            valid_1 = f == f"=b4*{rate_ref.lower()}"
-            valid_2 = f == f"={rate_ref.lower()}*b4"
-
-            if valid_1 or valid_2:
+            # Canonical keys sort the factors, so B4*C19 and C19*B4 are one key
+            if formula_key(raw_formula) == formula_key(f"=B4*{rate_ref}"):
                 formula_score += 2.0
                 feedback.append(("CC20_FORMULA_OK", {"cell": target_cell, "rate_ref": rate_ref}))
             else:
                 feedback.append((
                     "CC20_FORMULA_BAD",
-                    {"cell": target_cell, "rate_ref": rate_ref, "expected_a": f"=B4*{rate_ref}", "expected_b": f"={rate_ref}*B4"}
+                    {
+                        "cell": target_cell,
+                        "rate_ref": rate_ref,
+                        "expected_a": f"=B4*{rate_ref}",
+                        "expected_b": f"={rate_ref}*B4",
+                        "found": raw_formula,
+                    }
                 ))
 
         # -----------------------------
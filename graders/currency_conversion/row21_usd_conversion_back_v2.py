@@ -1,23 +1,12 @@
 # graders/currency_conversion_v2/row21_usd_conversion_back_v2.py
 
-import re
-
-
-def _normalize_formula(formula):
-    """
-    Normalize an Excel formula string for comparison:
-      - removes leading '='
-      - strips $, spaces, parentheses
-      - lowercase
-    """
-    if not isinstance(formula, str):
-        return ""
-    f = formula.lstrip("=")
-    f = f.replace("$", "")
-    f = re.sub(r"[()\s]", "", f)
-    return f.lower()
+from graders.row_memo import memoized_row
+from utilities.formula_parser import formula_key
+from utilities.timing import timed
 
 
+@timed("row.grade_row21_usd_conversion_back_v2")
+@memoized_row("cc_row21", values=["C21:F21"], formats=["C21:F21"])
 def grade_row21_usd_conversion_back_v2(sheet):
     """
     Currency Conversion V2 — Row 21 (C21–F21)
@@ -60,14 +49,14 @@ def grade_row21_usd_conversion_back_v2(sheet):
         if not isinstance(raw_formula, str) or not raw_formula.startswith("="):
             feedback.append(("CC21_FORMULA_MISSING", {"cell": cell_ref, "expected": f"=D4/{source_rate_cell}"}))
         else:
-            cleaned = _normalize_formula(raw_formula)
-            expected = _normalize_formula(f"{usd_cell}/{source_rate_cell}")
-
-            if cleaned == expected:
+            if formula_key(raw_formula) == formula_key(f"={usd_cell}/{source_rate_cell}"):
                 formula_score += 2.0
                 feedback.append(("CC21_FORMULA_OK", {"cell": cell_ref, "expected": f"=D4/{source_rate_cell}"}))
             else:
-                feedback.append(("CC21_FORMULA_BAD", {"cell": cell_ref, "expected": f"=D4/{source_rate_cell}"}))
+                feedback.append((
+                    "CC21_FORMULA_BAD",
+                    {"cell": cell_ref, "expected": f"=D4/{source_rate_cell}", "found": raw_formula}
+                ))
 
         # -----------------------------
         # Formatting check (same acceptance logic as V1)
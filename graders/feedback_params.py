@@ -0,0 +1,100 @@
+# graders/feedback_params.py
+
+"""
+Which params each feedback code is emitted with.
+
+Feedback templates (feedback/<tab>.json) are checked against this table
+when they load (utilities/feedback_catalog.py), so a placeholder the
+graders never send is reported once instead of turning into
+"[FORMAT ERROR]" on every student's sheet.
+
+The table comes from two places:
+  - literal emissions in grader code, e.g.
+        feedback.append(("CC19_CODE_INVALID", {"code_cell": code_cell, "code": student_code}))
+    found by reading every module under graders/ with ast (nothing is
+    imported or run);
+  - the codes of declarative rubrics (RubricPlan.emitted_params()).
+
+A code emitted from several places only guarantees the param names every
+site passes. Codes emitted with params built any other way (a variable,
+a **spread) map to None: they are not checked.
+"""
+
+import ast
+import os
+import re
+from functools import lru_cache
+from types import MappingProxyType
+
+from graders.rubric_plan import RUBRICS_DIR, load_rubric_plan
+
+
+GRADERS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+FEEDBACK_CODE_RE = re.compile(r"^[A-Z][A-Z0-9]*_[A-Z0-9_]+$")
+
+
+def _merge(table: dict, code: str, names):
+    """Keeps only the names every emission site of `code` passes (None = unchecked)."""
+    if code in table and table[code] is None:
+        return
+    if names is None:
+        table[code] = None
+    elif code in table:
+        table[code] = table[code] & names
+    else:
+        table[code] = frozenset(names)
+
+
+def _literal_emissions(source: str) -> list:
+    """
+    (code, param names | None) for every ("CODE", {...}) tuple in the source.
+
+    Returns:
+        list of (code, frozenset | None)
+    """
+    found = []
+    for node in ast.walk(ast.parse(source)):
+        if not (isinstance(node, ast.Tuple) and len(node.elts) == 2):
+            continue
+        code, params = node.elts
+        if not (isinstance(code, ast.Constant) and isinstance(code.value, str)):
+            continue
+        if not FEEDBACK_CODE_RE.match(code.value):
+            continue
+
+        names = None
+        if isinstance(params, ast.Dict) and all(
+            isinstance(k, ast.Constant) and isinstance(k.value, str) for k in params.keys
+        ):
+            names = frozenset(k.value for k in params.keys)
+        found.append((code.value, names))
+    return found
+
+
+@lru_cache(maxsize=None)
+def emitted_params() -> MappingProxyType:
+    """
+    Param names each feedback code is emitted with (computed once per process).
+
+    Returns:
+        read-only mapping code → frozenset of names, or None (not checked)
+    """
+    table = {}
+
+    for dirpath, _dirnames, filenames in os.walk(GRADERS_DIR):
+        for fn in sorted(filenames):
+            if not fn.endswith(".py"):
+                continue
+            with open(os.path.join(dirpath, fn), "r", encoding="utf-8") as f:
+                source = f.read()
+            for code, names in _literal_emissions(source):
+                _merge(table, code, names)
+
+    if os.path.isdir(RUBRICS_DIR):
+        for fn in sorted(os.listdir(RUBRICS_DIR)):
+            if fn.endswith(".json"):
+                for code, names in load_rubric_plan(fn[:-len(".json")]).emitted_params().items():
+                    _merge(table, code, frozenset(names))
+
+    return MappingProxyType(table)
@@ -1,5 +1,11 @@
 # graders/income_analysis/check_name_present.py
 
+from graders.row_memo import memoized_row
+from utilities.timing import timed
+
+
+@timed("row.check_name_present")
+@memoized_row("ia_name", values=["B1"])
 def check_name_present(ws_income):
     """
     Check if a name is present in cell B1 of the Income Analysis worksheet.
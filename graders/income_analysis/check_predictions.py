@@ -1,5 +1,12 @@
 # graders/income_analysis/check_predictions.py
 
+from graders.row_memo import memoized_row
+from utilities.formula_parser import formula_key
+from utilities.timing import timed
+
+
+@timed("row.check_predictions")
+@memoized_row("ia_predictions", values=["E19:E35"])
 def check_predictions(ws):
     """
     Check predicted values in E19–E35.
@@ -11,20 +18,10 @@ def check_predictions(ws):
     correct_count = 0
 
     for row in range(19, 36):
-        formula = ws[f"E{row}"].value
-
-        if isinstance(formula, str) and formula.startswith("="):
-            normalized = (
-                formula.replace("$", "")
-                       .replace(" ", "")
-                       .replace("(", "")
-                       .replace(")", "")
-                       .upper()
-            )
-            expected = f"=B30*D{row}+B31".upper()
-
-            if normalized == expected:
-                correct_count += 1
+        key = formula_key(ws[f"E{row}"].value)
+
+        if key is not None and key == formula_key(f"=B30*D{row}+B31"):
+            correct_count += 1
 
     if correct_count == total_rows:
         return 6.0, [("IA_PREDICTIONS_ALL_CORRECT", {"range": "E19:E35"})]
@@ -1,5 +1,11 @@
 # graders/income_analysis/check_predictions_formatting.py
 
+from graders.row_memo import memoized_row
+from utilities.timing import timed
+
+
+@timed("row.check_currency_formatting")
+@memoized_row("ia_predictions_formatting", formats=["E19:E35"])
 def check_currency_formatting(ws):
     """
     Check formatting of predicted values E19–E35.
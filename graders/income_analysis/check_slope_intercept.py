@@ -1,5 +1,12 @@
 # graders/income_analysis/check_slope_intercept.py
 
+from graders.row_memo import memoized_row
+from utilities.formula_parser import formula_key
+from utilities.timing import timed
+
+
+@timed("row.check_slope_intercept")
+@memoized_row("ia_slope_intercept", values=["B30", "B31"])
 def check_slope_intercept(ws):
     """
     Check the slope and intercept formulas in B30 and B31.
@@ -16,34 +23,37 @@ def check_slope_intercept(ws):
     score = 0
     feedback = []
 
-    correct_slope = "=SLOPE(B19:B26,A19:A26)"
-    correct_intercept = "=INTERCEPT(B19:B26,A19:A26)"
-    reversed_slope = "=SLOPE(A19:A26,B19:B26)"
-    reversed_intercept = "=INTERCEPT(A19:A26,B19:B26)"
+    correct_slope = formula_key("=SLOPE(B19:B26,A19:A26)")
+    correct_intercept = formula_key("=INTERCEPT(B19:B26,A19:A26)")
+    reversed_slope = formula_key("=SLOPE(A19:A26,B19:B26)")
+    reversed_intercept = formula_key("=INTERCEPT(A19:A26,B19:B26)")
+
+    slope_key = formula_key(slope_cell.value)
+    intercept_key = formula_key(intercept_cell.value)
 
     # ----- Slope -----
-    if slope_formula == correct_slope:
+    if slope_key == correct_slope:
         score += 3
         feedback.append(("IA_SLOPE_CORRECT", {"cell": "B30"}))
-    elif slope_formula == reversed_slope:
+    elif slope_key == reversed_slope:
         score += 2
-        feedback.append(("IA_SLOPE_REVERSED", {"cell": "B30"}))
+        feedback.append(("IA_SLOPE_REVERSED", {"cell": "B30", "found": slope_cell.value}))
     elif "SLOPE(" in slope_formula:
         score += 1
-        feedback.append(("IA_SLOPE_WRONG_RANGE", {"cell": "B30"}))
+        feedback.append(("IA_SLOPE_WRONG_RANGE", {"cell": "B30", "found": slope_cell.value}))
     else:
         feedback.append(("IA_SLOPE_MISSING", {"cell": "B30"}))
 
     # ----- Intercept -----
-    if intercept_formula == correct_intercept:
+    if intercept_key == correct_intercept:
         score += 3
         feedback.append(("IA_INTERCEPT_CORRECT", {"cell": "B31"}))
-    elif intercept_formula == reversed_intercept:
+    elif intercept_key == reversed_intercept:
         score += 2
-        feedback.append(("IA_INTERCEPT_REVERSED", {"cell": "B31"}))
+        feedback.append(("IA_INTERCEPT_REVERSED", {"cell": "B31", "found": intercept_cell.value}))
     elif "INTERCEPT(" in intercept_formula:
         score += 1
-        feedback.append(("IA_INTERCEPT_WRONG_RANGE", {"cell": "B31"}))
+        feedback.append(("IA_INTERCEPT_WRONG_RANGE", {"cell": "B31", "found": intercept_cell.value}))
     else:
         feedback.append(("IA_INTERCEPT_MISSING", {"cell": "B31"}))
 
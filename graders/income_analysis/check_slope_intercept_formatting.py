@@ -1,5 +1,11 @@
 # graders/income_analysis/check_slope_intercept_formatting.py
 
+from graders.row_memo import memoized_row
+from utilities.timing import timed
+
+
+@timed("row.check_slope_intercept_formatting")
+@memoized_row("ia_slope_intercept_formatting", formats=["B30", "B31"])
 def check_slope_intercept_formatting(ws):
     """
     Checks formatting of B30 (slope) and B31 (intercept).
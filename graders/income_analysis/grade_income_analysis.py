@@ -5,30 +5,49 @@ from .check_slope_intercept import check_slope_intercept
 from .check_slope_intercept_formatting import check_slope_intercept_formatting
 from .check_predictions import check_predictions
 from .check_predictions_formatting import check_currency_formatting
+from utilities.timing import timed
 
 
+@timed("tab.income_analysis")
 def grade_income_analysis(ws):
     """
     Run all grading checks for the Income Analysis tab and return a dictionary
     of scores and feedback (feedback is codes+params for JSON rendering).
     """
+    return combine_income_analysis(
+        check_name_present(ws),
+        check_slope_intercept(ws),
+        check_slope_intercept_formatting(ws),
+        check_predictions(ws),
+        check_currency_formatting(ws),
+    )
+
+
+def combine_income_analysis(name, slope, slope_format, predictions, predictions_format) -> dict:
+    """
+    Builds the tab results from the five checks' (score, feedback) pairs.
+    Shared by the per-sheet grader above and the batch engine.
+
+    Returns:
+        dict with name/slope/predictions/scatterplot scores and feedback
+    """
     results = {}
 
     # Row 3: Name
-    score, fb = check_name_present(ws)
+    score, fb = name
     results["name_score"] = score
     results["name_feedback"] = fb
 
     # Row 4: Slope/Intercept formulas + formatting
-    slope_score, slope_fb = check_slope_intercept(ws)
-    fmt_score, fmt_fb = check_slope_intercept_formatting(ws)
+    slope_score, slope_fb = slope
+    fmt_score, fmt_fb = slope_format
 
     results["slope_score"] = slope_score + fmt_score
     results["slope_feedback"] = (slope_fb or []) + (fmt_fb or [])
 
     # Row 5: Predictions + formatting
-    pred_score, pred_fb = check_predictions(ws)
-    pred_fmt_score, pred_fmt_fb = check_currency_formatting(ws)
+    pred_score, pred_fb = predictions
+    pred_fmt_score, pred_fmt_fb = predictions_format
 
     results["predictions_score"] = pred_score + pred_fmt_score
     results["predictions_feedback"] = (pred_fb or []) + (pred_fmt_fb or [])
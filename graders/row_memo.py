@@ -0,0 +1,198 @@
+# graders/row_memo.py
+
+"""
+Cross-student memo for row checkers.
+
+Most of a section types the same thing into a rubric row (the fully correct
+answers above all), so a checker's (score, feedback codes) is cached under
+
+    (checker id, rubric version, exact values of the cells it reads,
+     number formats of the cells it checks, its other arguments)
+
+and the next student with byte-identical inputs gets a copy of the cached
+result instead of a re-grade. Row 15 / row 16 take the student's name as an
+argument, so the name is part of their key automatically.
+
+    @timed("row.grade_row_26_v2")
+    @memoized_row("row26", values=["F26", "G26", "I26", "J26", "O26", "P26"])
+    def grade_row_26_v2(sheet): ...
+
+The memo lives in the grading process (each pool worker keeps its own) and
+is bounded (ROW_MEMO_SIZE entries, least recently used dropped first).
+Checkers that depend on anything besides their cells and arguments — the
+date of today (row 17) or the run's FX snapshot (row 19) — are not memoized.
+
+Hits / misses are counted per checker; _grade_student_workbook hands them
+back with each outcome (drain_memo_stats) and the phase summaries report
+the run's hit rate (summarize_memo_stats).
+"""
+
+import functools
+import threading
+from collections import OrderedDict
+
+from utilities.normalizers import column_index, column_letter, split_cell_ref
+
+
+ROW_MEMO_SIZE = 20000
+
+_memo = OrderedDict()
+_stats = {}  # checker id → [hits, misses] since the last drain
+_lock = threading.Lock()  # lanes mode grades students on threads too
+_rubric_version = None
+
+
+def _expand(refs) -> tuple:
+    """["C26:E26", "O26"] → ("C26", "D26", "E26", "O26")"""
+    cells = []
+    for ref in refs:
+        start, _, end = ref.partition(":")
+        if not end:
+            cells.append(ref)
+            continue
+        c1, r1 = split_cell_ref(start)
+        c2, r2 = split_cell_ref(end)
+        for row in range(r1, r2 + 1):
+            for col in range(column_index(c1), column_index(c2) + 1):
+                cells.append(f"{column_letter(col)}{row}")
+    return tuple(cells)
+
+
+def rubric_version() -> str:
+    """The manifest's rubric fingerprint, computed once per process."""
+    global _rubric_version
+    if _rubric_version is None:
+        # Imported here: orchestrator modules import the graders
+        from orchestrator.run_manifest import rubric_fingerprint
+        _rubric_version = rubric_fingerprint()
+    return _rubric_version
+
+
+def _freeze(value):
+    """
+    Hashable stand-in for a checker argument or cell value (dicts / lists →
+    tuples). Every value carries its type: TRUE, 1 and 1.0 are equal as
+    keys but not as answers (feedback quotes the student's entry).
+    """
+    if isinstance(value, dict):
+        return "dict", tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return type(value).__name__, tuple(_freeze(v) for v in value)
+    return type(value).__name__, value
+
+
+def _copy(value):
+    """Fresh lists / dicts for every caller; tuples and scalars are shared."""
+    if isinstance(value, list):
+        return [_copy(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return tuple(_copy(v) for v in value)
+    return value
+
+
+def _count(checker_id: str, hit: bool):
+    counts = _stats.setdefault(checker_id, [0, 0])
+    counts[0 if hit else 1] += 1
+
+
+def memoized_row(checker_id: str, values=(), formats=()):
+    """
+    Decorator for a row checker `fn(sheet, *args)`.
+
+    Args:
+        checker_id (str): stable name of the checker in keys and statistics
+        values: cells (or ranges) whose values the checker reads
+        formats: cells (or ranges) whose number formats the checker reads
+    """
+    value_cells = _expand(values)
+    format_cells = _expand(formats)
+
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(sheet, *args, **kwargs):
+            try:
+                key = (
+                    checker_id,
+                    rubric_version(),
+                    _freeze(tuple(sheet[c].value for c in value_cells)),
+                    tuple(sheet[c].number_format for c in format_cells),
+                    _freeze(args),
+                    _freeze(kwargs),
+                )
+                hash(key)
+            except TypeError:
+                # Unhashable cell value: grade without the memo
+                return fn(sheet, *args, **kwargs)
+
+            with _lock:
+                cached = _memo.get(key)
+                if cached is not None:
+                    _memo.move_to_end(key)
+                _count(checker_id, cached is not None)
+
+            if cached is None:
+                cached = fn(sheet, *args, **kwargs)
+                with _lock:
+                    _memo[key] = cached
+                    if len(_memo) > ROW_MEMO_SIZE:
+                        _memo.popitem(last=False)
+
+            return _copy(cached)
+
+        # The batch engine (graders/batch_engine.py) reads the same declaration
+        wrapper.row_inputs = (value_cells, format_cells)
+        return wrapper
+
+    return decorate
+
+
+# ------------------------------
+# STATISTICS
+# ------------------------------
+def drain_memo_stats() -> dict:
+    """
+    Removes and returns this process's counts since the last drain.
+
+    Returns:
+        dict checker id → [hits, misses]
+    """
+    with _lock:
+        drained = {checker: list(counts) for checker, counts in _stats.items()}
+        _stats.clear()
+    return drained
+
+
+def merge_memo_stats(totals: dict, stats: dict | None) -> dict:
+    """Adds drained counts (e.g. from a pool worker's outcome) into `totals`."""
+    for checker, (hits, misses) in (stats or {}).items():
+        counts = totals.setdefault(checker, [0, 0])
+        counts[0] += hits
+        counts[1] += misses
+    return totals
+
+
+def summarize_memo_stats(totals: dict) -> dict:
+    """
+    Run-summary form of merged counts.
+
+    Returns:
+        {"hits", "misses", "hit_rate", "checkers": {id: {"hits", "misses", "hit_rate"}}}
+    """
+    def rate(hits, misses):
+        return round(hits / (hits + misses), 3) if hits + misses else 0.0
+
+    checkers = {
+        checker: {"hits": hits, "misses": misses, "hit_rate": rate(hits, misses)}
+        for checker, (hits, misses) in sorted(totals.items())
+    }
+    hits = sum(c["hits"] for c in checkers.values())
+    misses = sum(c["misses"] for c in checkers.values())
+    return {"hits": hits, "misses": misses, "hit_rate": rate(hits, misses), "checkers": checkers}
+
+
+def describe_memo_stats(summary: dict) -> str:
+    """One-line form for the console, e.g. "412/520 row checks reused (79%)"."""
+    calls = summary["hits"] + summary["misses"]
+    return f"{summary['hits']}/{calls} row checks reused ({summary['hit_rate']:.0%})"
@@ -0,0 +1,300 @@
+# graders/rubric_plan.py
+
+"""
+Declarative rubrics compiled into grading plans.
+
+A rubric is a JSON file in rubrics/ (next to feedback/) describing each
+row of a tab: the cells it reads, accepted formula forms, accepted units,
+point values and feedback codes. For example (rubrics/unit_conversions.json):
+
+    {"id": "row27", "type": "conversion_row",
+     "ratios": {"gal/l": ["=L16/I16", "=L16"], "h/d": ["=L22/I22", "=L22"]},
+     "pairs": [{"formula": "F27", "unit": "G27"}, {"formula": "I27", "unit": "J27"}],
+     "units": ["gal/l", "h/d"], ...}
+
+load_rubric_plan() compiles a rubric once per process: accepted formulas
+become canonical formula keys (utilities/formula_parser.py), unit lists
+become sets, code templates are filled in per cell. The plan lists every
+cell the tab's rows read (RubricPlan.cells), which is what the targeted
+reader extracts (graders/cell_manifest.py).
+
+Row types:
+    conversion_row — ratio formulas + unit labels, final product formula
+                     and final unit (Unit Conversions rows 26–29)
+    formula_cells  — independent cells that must hold one of the accepted
+                     formulas (temperature conversions)
+
+A new assignment tab made of these row types needs only a rubric file.
+"""
+
+import json
+import os
+from functools import lru_cache
+
+from utilities.formula_parser import formula_keys, formula_matches
+from utilities.normalizers import normalize_time_unit, normalize_unit_text, split_cell_ref
+
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUBRICS_DIR = os.path.join(PROJECT_ROOT, "rubrics")
+
+UNIT_NORMALIZERS = {
+    "unit_text": normalize_unit_text,
+    "time": lambda val: normalize_time_unit(normalize_unit_text(val)),
+}
+
+
+def _column(cell: str) -> str:
+    return split_cell_ref(cell)[0]
+
+
+def _entry(value) -> str:
+    """The student's entry as text ("found" param of the *_bad codes)."""
+    return str(value).strip() if value is not None else ""
+
+
+# ------------------------------
+# ROW TYPES
+# ------------------------------
+class ConversionRow:
+    """
+    Ratio formulas with unit labels, then a final product formula and unit.
+
+    grade() returns the V2 row structure used by the Unit Conversions tab:
+        formulas_score, unit_text_score, final_formula_score, final_unit_score,
+        and the matching *_feedback lists of (code, params)
+    """
+
+    def __init__(self, spec: dict):
+        self.id = spec["id"]
+        self.ratios = {ratio: formula_keys(*forms) for ratio, forms in spec["ratios"].items()}
+        self.units = tuple(spec["units"])
+        self.unit_set = frozenset(self.units)
+        self.normalize_unit = UNIT_NORMALIZERS[spec.get("unit_normalizer", "unit_text")]
+        self.each_ratio_once = bool(spec.get("each_ratio_once", False))
+        self.points = spec["points"]
+
+        codes = spec["codes"]
+        self.codes = codes
+        self.pairs = []
+        for pair in spec["pairs"]:
+            cols = {"formula_col": _column(pair["formula"]), "unit_col": _column(pair["unit"])}
+            self.pairs.append((
+                pair["formula"],
+                pair["unit"],
+                {name: codes[name].format(**cols) for name in ("formula_ok", "formula_bad", "unit_ok", "unit_bad")},
+            ))
+
+        final_formula = spec["final_formula"]
+        self.final_formula_cell = final_formula["cell"]
+        self.final_factors = list(final_formula["product_of"])
+        self.final_formula_keys = formula_keys("=" + "*".join(self.final_factors))
+
+        final_unit = spec["final_unit"]
+        self.final_unit_cell = final_unit["cell"]
+        self.final_units = frozenset(final_unit["accepted"])
+        self.final_unit_expected = final_unit["expected"]
+
+        self.cells = tuple(
+            [cell for formula_cell, unit_cell, _codes in self.pairs for cell in (formula_cell, unit_cell)]
+            + [self.final_formula_cell, self.final_unit_cell]
+        )
+
+    def emitted_params(self) -> dict:
+        """Param names each of this row's feedback codes is emitted with."""
+        params = {}
+        for _formula_cell, _unit_cell, codes in self.pairs:
+            params[codes["formula_ok"]] = {"cell", "ratio"}
+            params[codes["formula_bad"]] = {"cell", "found"}
+            params[codes["unit_ok"]] = {"cell", "unit"}
+            params[codes["unit_bad"]] = {"cell", "expected", "found"}
+        params[self.codes["final_formula_ok"]] = {"cell"}
+        params[self.codes["final_formula_bad"]] = {"cell", "required", "found"}
+        params[self.codes["final_unit_ok"]] = {"cell", "unit"}
+        params[self.codes["final_unit_bad"]] = {"cell", "expected", "found"}
+        return params
+
+    def grade(self, sheet) -> dict:
+        points = self.points
+        result = {
+            "formulas_score": 0,
+            "unit_text_score": 0,
+            "final_formula_score": 0,
+            "final_unit_score": 0,
+            "formulas_feedback": [],
+            "unit_text_feedback": [],
+            "final_formula_feedback": [],
+            "final_unit_feedback": [],
+        }
+        used_ratios = set()
+
+        for formula_cell, unit_cell, codes in self.pairs:
+            # ----- Unit label -----
+            unit_value = sheet[unit_cell].value
+            unit = self.normalize_unit(unit_value)
+            if unit in self.unit_set:
+                result["unit_text_score"] += points["unit"]
+                result["unit_text_feedback"].append((codes["unit_ok"], {"cell": unit_cell, "unit": unit}))
+            else:
+                result["unit_text_feedback"].append((
+                    codes["unit_bad"],
+                    {"cell": unit_cell, "expected": list(self.units), "found": _entry(unit_value)},
+                ))
+
+            # ----- Ratio formula -----
+            formula = sheet[formula_cell].value
+            for ratio, accepted in self.ratios.items():
+                if formula_matches(formula, accepted) and not (self.each_ratio_once and ratio in used_ratios):
+                    used_ratios.add(ratio)
+                    result["formulas_score"] += points["formula"]
+                    result["formulas_feedback"].append((codes["formula_ok"], {"cell": formula_cell, "ratio": ratio}))
+                    break
+            else:
+                result["formulas_feedback"].append((codes["formula_bad"], {"cell": formula_cell, "found": _entry(formula)}))
+
+        # ----- Final formula: the product of exactly these cells -----
+        final_formula = sheet[self.final_formula_cell].value
+        if formula_matches(final_formula, self.final_formula_keys):
+            result["final_formula_score"] = points["final_formula"]
+            result["final_formula_feedback"].append((self.codes["final_formula_ok"], {"cell": self.final_formula_cell}))
+        else:
+            result["final_formula_feedback"].append((
+                self.codes["final_formula_bad"],
+                {"cell": self.final_formula_cell, "required": list(self.final_factors), "found": _entry(final_formula)},
+            ))
+
+        # ----- Final unit -----
+        final_unit = sheet[self.final_unit_cell].value
+        unit = self.normalize_unit(final_unit)
+        if unit in self.final_units:
+            result["final_unit_score"] = points["final_unit"]
+            result["final_unit_feedback"].append((self.codes["final_unit_ok"], {"cell": self.final_unit_cell, "unit": unit}))
+        else:
+            result["final_unit_feedback"].append((
+                self.codes["final_unit_bad"],
+                {"cell": self.final_unit_cell, "expected": self.final_unit_expected, "found": _entry(final_unit)},
+            ))
+
+        return result
+
+
+class FormulaCells:
+    """
+    Cells that each must hold one of their accepted formulas.
+
+    grade() returns {score_key: score (capped at max_points), feedback_key: [(code, params)]}
+    """
+
+    def __init__(self, spec: dict):
+        self.id = spec["id"]
+        self.score_key = spec["score_key"]
+        self.feedback_key = spec["feedback_key"]
+        self.max_points = spec.get("max_points")
+        self.checks = [
+            (c["cell"], formula_keys(*c["accepted"]), c["points"], c["ok"], c["bad"], dict(c.get("bad_params", {})))
+            for c in spec["cells"]
+        ]
+        self.cells = tuple(check[0] for check in self.checks)
+
+    def emitted_params(self) -> dict:
+        """Param names each of this row's feedback codes is emitted with."""
+        params = {}
+        for _cell, _accepted, _points, ok_code, bad_code, bad_params in self.checks:
+            params.setdefault(ok_code, {"cell"})
+            names = {"cell", "found", *bad_params}
+            params[bad_code] = params.get(bad_code, names) & names
+        return params
+
+    def grade(self, sheet) -> dict:
+        score = 0
+        feedback = []
+        for cell, accepted, points, ok_code, bad_code, bad_params in self.checks:
+            value = sheet[cell].value
+            if formula_matches(value, accepted):
+                score += points
+                feedback.append((ok_code, {"cell": cell}))
+            else:
+                feedback.append((bad_code, {"cell": cell, **bad_params, "found": _entry(value)}))
+
+        if self.max_points is not None:
+            score = min(score, self.max_points)
+        return {self.score_key: score, self.feedback_key: feedback}
+
+
+ROW_TYPES = {
+    "conversion_row": ConversionRow,
+    "formula_cells": FormulaCells,
+}
+
+
+# ------------------------------
+# PLAN
+# ------------------------------
+class RubricPlan:
+    """A compiled rubric: its tab, rows by id and every cell they read."""
+
+    def __init__(self, spec: dict):
+        self.tab = spec["tab"]
+        self.rows = {}
+        for row_spec in spec["rows"]:
+            row_type = ROW_TYPES.get(row_spec.get("type"))
+            if row_type is None:
+                raise ValueError(
+                    f"Unknown rubric row type.\n"
+                    f"- Row: {row_spec.get('id')}\n"
+                    f"- Type: {row_spec.get('type')!r}\n"
+                    f"- Known: {', '.join(ROW_TYPES)}"
+                )
+            row = row_type(row_spec)
+            self.rows[row.id] = row
+
+        cells = []
+        for row in self.rows.values():
+            cells.extend(c for c in row.cells if c not in cells)
+        self.cells = tuple(cells)
+
+    def row(self, row_id: str):
+        if row_id not in self.rows:
+            raise KeyError(f"Rubric for {self.tab!r} has no row {row_id!r}.")
+        return self.rows[row_id]
+
+    def emitted_params(self) -> dict:
+        """
+        Param names each feedback code of this rubric is emitted with
+        (a code several rows emit only guarantees the names they share).
+
+        Returns:
+            dict code → set of param names
+        """
+        params = {}
+        for row in self.rows.values():
+            for code, names in row.emitted_params().items():
+                params[code] = params[code] & names if code in params else set(names)
+        return params
+
+    def grade(self, sheet) -> dict:
+        """Runs every row. Returns: dict row id → that row's result."""
+        return {row_id: row.grade(sheet) for row_id, row in self.rows.items()}
+
+
+def rubric_path(name: str) -> str:
+    return os.path.join(RUBRICS_DIR, f"{name}.json")
+
+
+@lru_cache(maxsize=None)
+def load_rubric_plan(name: str) -> RubricPlan:
+    """
+    Loads rubrics/<name>.json and compiles it (once per process).
+
+    Returns:
+        RubricPlan
+    """
+    path = rubric_path(name)
+    if not os.path.exists(path):
+        raise FileNotFoundError(
+            f"Rubric JSON not found.\n"
+            f"- Expected: {path}\n"
+            f"Fix: ensure rubrics/{name}.json exists in your project."
+        )
+    with open(path, "r", encoding="utf-8") as f:
+        return RubricPlan(json.load(f))
@@ -5,8 +5,10 @@ from graders.unit_conversions.row27_checker_v2 import grade_row_27_v2
 from graders.unit_conversions.row28_checker_v2 import grade_row_28_v2
 from graders.unit_conversions.row29_checker_v2 import grade_row_29_v2
 from graders.unit_conversions.temp_conversions_v2 import grade_temp_conversions_v2
+from utilities.timing import timed
 
 
+@timed("tab.unit_conversions")
 def grade_unit_conversions_tab_v2(sheet):
     """
     Orchestrates grading for the entire Unit Conversions tab using the V2 system.
@@ -28,14 +30,23 @@ def grade_unit_conversions_tab_v2(sheet):
           - feedback categories for each grouping
     """
 
-    # ------------------------
-    # Run each row check
-    # ------------------------
-    r26 = grade_row_26_v2(sheet)
-    r27 = grade_row_27_v2(sheet)
-    r28 = grade_row_28_v2(sheet)
-    r29 = grade_row_29_v2(sheet)
-    temp = grade_temp_conversions_v2(sheet)
+    return combine_unit_conversion_rows(
+        grade_row_26_v2(sheet),
+        grade_row_27_v2(sheet),
+        grade_row_28_v2(sheet),
+        grade_row_29_v2(sheet),
+        grade_temp_conversions_v2(sheet),
+    )
+
+
+def combine_unit_conversion_rows(r26, r27, r28, r29, temp) -> dict:
+    """
+    Builds the unified tab structure from the row results.
+    Shared by the per-sheet grader above and the batch engine.
+
+    Returns:
+        dict (see grade_unit_conversions_tab_v2)
+    """
 
     # ------------------------
     # Aggregate scoring
@@ -3,6 +3,7 @@
 # Uses workspace paths (Documents/MA1_Autograder/...) when utilities/paths.py is present.
 
 import json
+import multiprocessing
 import os
 import threading
 import queue
@@ -17,7 +18,10 @@ PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
 bootstrap_assets(PROJECT_ROOT)
 
 
-from run_pipeline import run_pipeline
+from run_pipeline import run_pipeline, resume_pipeline
+from orchestrator.progress import ProgressMonitor, PHASE_START, PHASE_END, RUN_END
+from orchestrator.cancellation import CancelToken, PipelineCancelled
+from orchestrator.rerender_feedback import rerender_feedback
 from writers.import_zip_to_student_groups import import_zip_to_student_groups
 
 # Workspace helpers (Documents/MA1_Autograder/...)
@@ -108,6 +112,33 @@ def apply_dark_theme(root: tk.Tk):
 
     style.configure("Slim.TButton", padding=(10, 6))
 
+    # Spinbox (worker count)
+    style.configure(
+        "TSpinbox",
+        fieldbackground=DARK_FIELD,
+        foreground=DARK_TEXT,
+        insertcolor=DARK_TEXT,
+        arrowcolor=DARK_TEXT,
+        bordercolor=DARK_PANEL,
+        lightcolor=DARK_PANEL,
+        darkcolor=DARK_PANEL
+    )
+
+    # Combobox (chart backend)
+    style.configure(
+        "TCombobox",
+        fieldbackground=DARK_FIELD,
+        foreground=DARK_TEXT,
+        arrowcolor=DARK_TEXT,
+        bordercolor=DARK_PANEL,
+        lightcolor=DARK_PANEL,
+        darkcolor=DARK_PANEL
+    )
+
+    # Checkbutton (streaming ingest)
+    style.configure("TCheckbutton", background=DARK_PANEL, foreground=DARK_TEXT)
+    style.map("TCheckbutton", background=[("active", DARK_PANEL)])
+
     # Progressbar
     style.configure("TProgressbar", troughcolor=DARK_PANEL, background=ACCENT, bordercolor=DARK_PANEL)
 
@@ -203,7 +234,11 @@ class App(tk.Tk):
 
         self.cfg = load_config()
         self.log_queue: queue.Queue = queue.Queue()
+        # Pipeline progress events (filled from the worker thread, drained by the UI)
+        self.progress_queue: queue.Queue = queue.Queue()
+        self.monitor = ProgressMonitor()
         self.worker_thread = None
+        self.cancel_token = None
 
         self.last_graded_path = None
         self.last_course_label = None
@@ -252,18 +287,29 @@ class App(tk.Tk):
         self.progress = ttk.Progressbar(status_strip, mode="indeterminate", length=240)
         self.progress.pack(side="right")
 
+        # "grade 37/120 · 8.2 students/s · ETA 0:10"
+        self.progress_var = tk.StringVar(value="")
+        ttk.Label(status_strip, textvariable=self.progress_var, style="Muted.TLabel").pack(side="right", padx=(0, 10))
+
         # Input card
         frame = ttk.Frame(self, style="Card.TFrame", padding=12)
         frame.pack(fill="x", padx=pad, pady=(0, pad))
 
         self.course_var = tk.StringVar(value=self.cfg.get("course_label", "MAT-144-501"))
         self.zip_var = tk.StringVar(value=self.cfg.get("zip_path", ""))
+        self.workers_var = tk.StringVar(value=str(self.cfg.get("workers", 1)))
+        self.stream_var = tk.BooleanVar(value=bool(self.cfg.get("stream_zip", False)))
+        self.chart_backend_var = tk.StringVar(value=self.cfg.get("chart_backend", "com"))
 
         frame.columnconfigure(1, weight=1)
 
         ttk.Label(frame, text="Course Label", style="Muted.TLabel").grid(row=0, column=0, sticky="w")
         ttk.Entry(frame, textvariable=self.course_var, width=25).grid(row=0, column=1, sticky="w")
 
+        ttk.Label(frame, text="Workers (0 = all cores)", style="Muted.TLabel").grid(row=0, column=2, sticky="e", padx=(10, 0))
+        ttk.Spinbox(frame, textvariable=self.workers_var, from_=0, to=64, width=5)\
+            .grid(row=0, column=3, sticky="e", padx=(10, 0))
+
         ttk.Label(frame, text="Student Zip File", style="Muted.TLabel").grid(row=1, column=0, sticky="w", pady=(10, 0))
         ttk.Entry(frame, textvariable=self.zip_var).grid(row=1, column=1, sticky="ew", pady=(10, 0))
 
@@ -273,6 +319,21 @@ class App(tk.Tk):
         ttk.Button(frame, text="Import Zip", style="Slim.TButton", command=self.on_import_zip)\
             .grid(row=1, column=3, sticky="e", padx=(10, 0), pady=(10, 0))
 
+        ttk.Checkbutton(
+            frame,
+            text="Grade straight from ZIP (no extraction, skips charts)",
+            variable=self.stream_var,
+        ).grid(row=2, column=1, sticky="w", pady=(10, 0))
+
+        ttk.Label(frame, text="Charts", style="Muted.TLabel").grid(row=2, column=2, sticky="e", padx=(10, 0), pady=(10, 0))
+        ttk.Combobox(
+            frame,
+            textvariable=self.chart_backend_var,
+            values=("com", "headless"),
+            state="readonly",
+            width=9,
+        ).grid(row=2, column=3, sticky="e", padx=(10, 0), pady=(10, 0))
+
         # Action buttons
         btn_frame = ttk.Frame(self, style="Card.TFrame", padding=12)
         btn_frame.pack(fill="x", padx=pad, pady=(0, pad))
@@ -280,6 +341,18 @@ class App(tk.Tk):
         self.run_btn = ttk.Button(btn_frame, text="Run Full Pipeline", style="Accent.TButton", command=self.on_run)
         self.run_btn.pack(side="left")
 
+        self.pause_btn = ttk.Button(btn_frame, text="Pause", command=self.on_pause, state="disabled")
+        self.pause_btn.pack(side="left", padx=(10, 0))
+
+        self.cancel_btn = ttk.Button(btn_frame, text="Cancel", command=self.on_cancel, state="disabled")
+        self.cancel_btn.pack(side="left", padx=(10, 0))
+
+        self.resume_btn = ttk.Button(btn_frame, text="Resume Last Run", command=self.on_resume)
+        self.resume_btn.pack(side="left", padx=(10, 0))
+
+        self.rerender_btn = ttk.Button(btn_frame, text="Re-render Feedback", command=self.on_rerender)
+        self.rerender_btn.pack(side="left", padx=(10, 0))
+
         self.open_out_btn = ttk.Button(btn_frame, text="Open Output Folder", command=self.on_open_output, state="disabled")
         self.open_out_btn.pack(side="left", padx=(10, 0))
 
@@ -329,8 +402,42 @@ class App(tk.Tk):
                 self._append_log(msg)
         except queue.Empty:
             pass
+        self._poll_progress()
         self.after(100, self._poll_logs)
 
+    # ---------- Progress plumbing ----------
+    def _poll_progress(self):
+        updated = False
+        try:
+            while True:
+                event = self.progress_queue.get_nowait()
+                self.monitor.update(event)
+                updated = True
+
+                kind = event["event"]
+                if kind == PHASE_START:
+                    self._start_phase_bar()
+                elif kind == PHASE_END and self.monitor.determinate:
+                    self.progress.configure(value=self.monitor.total)
+                elif kind == RUN_END:
+                    self.progress_var.set("")
+        except queue.Empty:
+            pass
+
+        if updated and self.monitor.phase is not None:
+            if self.monitor.determinate:
+                self.progress.configure(value=self.monitor.done)
+            self.progress_var.set(self.monitor.describe())
+
+    def _start_phase_bar(self):
+        """Determinate bar for per-student phases, spinning bar for whole-class steps."""
+        self.progress.stop()
+        if self.monitor.determinate:
+            self.progress.configure(mode="determinate", maximum=self.monitor.total, value=0)
+        else:
+            self.progress.configure(mode="indeterminate", value=0)
+            self.progress.start(10)
+
     # ---------- Button handlers ----------
     def on_clear(self):
         self.log_text.configure(state="normal")
@@ -358,6 +465,39 @@ class App(tk.Tk):
             copy_to_clipboard(self, self.last_graded_path)
             messagebox.showinfo("Copied", "Output path copied to clipboard.")
 
+    def on_pause(self):
+        token = self.cancel_token
+        if token is None or token.cancelled:
+            return
+
+        if token.paused:
+            token.resume()
+            self.pause_btn.configure(text="Pause")
+            self._set_badge("run", "Running…")
+            self.step_var.set("Resumed.")
+        else:
+            token.pause()
+            self.pause_btn.configure(text="Resume")
+            self._set_badge("run", "Paused ⏸")
+            self.step_var.set("Paused — students in progress finish, no new ones start.")
+
+    def on_cancel(self):
+        token = self.cancel_token
+        if token is None or token.cancelled:
+            return
+        if not messagebox.askyesno(
+            "Cancel run",
+            "Stop grading after the students currently in progress?\n\n"
+            "Finished grading sheets are kept; running the course again resumes with the rest.",
+        ):
+            return
+
+        token.cancel()
+        self.pause_btn.configure(state="disabled", text="Pause")
+        self.cancel_btn.configure(state="disabled")
+        self._set_badge("run", "Cancelling…")
+        self.step_var.set("Finishing students in progress…")
+
     def on_browse_zip(self):
         path = filedialog.askopenfilename(
             title="Select Student Zip File",
@@ -415,20 +555,94 @@ class App(tk.Tk):
             messagebox.showerror("Missing", "Please select a valid zip file.")
             return
 
+        try:
+            workers = int(self.workers_var.get().strip() or "1")
+            if workers < 0:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Invalid", "Workers must be a whole number (0 = one per CPU core).")
+            return
+
         # Save config
         self.cfg["course_label"] = course_label
         self.cfg["zip_path"] = zip_path
+        self.cfg["workers"] = workers
+        self.cfg["stream_zip"] = bool(self.stream_var.get())
+        ingest = "stream" if self.cfg["stream_zip"] else "extract"
+        self.cfg["chart_backend"] = chart_backend = self.chart_backend_var.get() or "com"
         save_config(self.cfg)
 
+        def run(token):
+            print("\n=== Starting MA1 Pipeline ===\n")
+            return run_pipeline(
+                zip_path,
+                course_label,
+                workers=workers,
+                ingest=ingest,
+                chart_backend=chart_backend,
+                progress=self.progress_queue.put,
+                cancel_token=token,
+            )
+
+        self._start_run(course_label, "Running full pipeline…", run)
+
+    def on_resume(self):
+        if self.worker_thread and self.worker_thread.is_alive():
+            messagebox.showinfo("Running", "A run is already in progress.")
+            return
+
+        course_label = self.course_var.get().strip()
+        if not course_label:
+            messagebox.showerror("Missing", "Please enter the course label of the run to resume.")
+            return
+
+        def run(token):
+            return resume_pipeline(course_label, progress=self.progress_queue.put, cancel_token=token)
+
+        self._start_run(course_label, "Resuming last run…", run)
+
+    def on_rerender(self):
+        if self.worker_thread and self.worker_thread.is_alive():
+            messagebox.showinfo("Running", "A run is already in progress.")
+            return
+
+        course_label = self.course_var.get().strip()
+        if not course_label:
+            messagebox.showerror("Missing", "Please enter the course label of the graded sheets.")
+            return
+
+        try:
+            workers = int(self.workers_var.get().strip() or "1")
+            if workers < 0:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Invalid", "Workers must be a whole number (0 = one per CPU core).")
+            return
+
+        def run(token):
+            return rerender_feedback(course_label, workers=workers, progress=self.progress_queue.put, cancel_token=token)
+
+        self._start_run(course_label, "Re-rendering feedback…", run)
+
+    def _start_run(self, course_label: str, step_text: str, run):
+        """Locks the UI and calls run(cancel_token) on a worker thread."""
         self.last_course_label = course_label
         self.open_groups_btn.configure(state="normal")
 
         # UI lock
         self._set_badge("run", "Running…")
-        self.step_var.set("Running full pipeline…")
+        self.step_var.set(step_text)
         self.run_btn.configure(state="disabled")
+        self.resume_btn.configure(state="disabled")
+        self.rerender_btn.configure(state="disabled")
         self.open_out_btn.configure(state="disabled")
         self.copy_path_btn.configure(state="disabled")
+        self.cancel_token = token = CancelToken()
+        self.pause_btn.configure(state="normal", text="Pause")
+        self.cancel_btn.configure(state="normal")
+        self.monitor = ProgressMonitor()
+        self.progress_var.set("")
+        self.progress.configure(mode="indeterminate", value=0)
         self.progress.start(10)
 
         # Redirect stdout/stderr to log
@@ -439,8 +653,7 @@ class App(tk.Tk):
 
         def worker():
             try:
-                print("\n=== Starting MA1 Pipeline ===\n")
-                graded_path = run_pipeline(zip_path, course_label)
+                graded_path = run(token)
 
                 # run_pipeline should return a string path; guard just in case
                 if isinstance(graded_path, (tuple, list)):
@@ -456,6 +669,11 @@ class App(tk.Tk):
                 self._ui_safe(self.open_out_btn.configure, state="normal")
                 self._ui_safe(self.copy_path_btn.configure, state="normal")
 
+            except PipelineCancelled as e:
+                print(f"\n⏹️ {e}\n")
+                self._ui_safe(self._set_badge, "idle", "Cancelled ⏹")
+                self._ui_safe(self.step_var.set, "Cancelled — Resume Last Run picks up the rest.")
+
             except Exception as e:
                 print(f"\n❌ ERROR: {e}\n")
                 self._ui_safe(self._set_badge, "err", "Error ❌")
@@ -466,10 +684,16 @@ class App(tk.Tk):
                 sys.stderr = orig_stderr
                 self._ui_safe(self.progress.stop)
                 self._ui_safe(self.run_btn.configure, state="normal")
+                self._ui_safe(self.resume_btn.configure, state="normal")
+                self._ui_safe(self.rerender_btn.configure, state="normal")
+                self._ui_safe(self.pause_btn.configure, state="disabled", text="Pause")
+                self._ui_safe(self.cancel_btn.configure, state="disabled")
 
         self.worker_thread = threading.Thread(target=worker, daemon=True)
         self.worker_thread.start()
 
 
 if __name__ == "__main__":
+    # Required for the grading process pool inside the frozen (PyInstaller) exe
+    multiprocessing.freeze_support()
     App().mainloop()
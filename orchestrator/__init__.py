@@ -1,11 +1,19 @@
-from .phase1_grade_all import phase1_grade_all_students
+from .phase1_grade_all import phase1_grade_all_students, phase1_grade_zip_submissions
 from .phase2_export_charts import phase2_export_all_charts
 from .phase3_insert_charts import phase3_insert_all_charts
 from .phase4_cleanup import phase4_cleanup_temp
+from .scheduler import run_student_dag
+from .rerender_feedback import rerender_feedback
+from .cancellation import CancelToken, PipelineCancelled
 
 __all__ = [
     "phase1_grade_all_students",
+    "phase1_grade_zip_submissions",
     "phase2_export_all_charts",
     "phase3_insert_all_charts",
-    "phase4_cleanup_temp"
+    "phase4_cleanup_temp",
+    "run_student_dag",
+    "rerender_feedback",
+    "CancelToken",
+    "PipelineCancelled",
 ]
@@ -0,0 +1,117 @@
+# orchestrator/cancellation.py
+
+"""
+Cooperative cancel / pause for long pipeline runs.
+
+The GUI (or any caller) owns a CancelToken and passes it to run_pipeline;
+the phase loops check it between students:
+
+    token = CancelToken()
+    threading.Thread(target=run_pipeline, args=(...), kwargs={"cancel_token": token}).start()
+    token.pause() / token.resume() / token.cancel()
+
+Cancelling never interrupts a student that is already being graded: new
+students stop being scheduled, queued pool jobs are dropped, in-flight
+grading sheets finish their (atomic) save and are recorded in the course
+manifest. run_pipeline then raises PipelineCancelled, and the next
+incremental run of the course only grades the students that are left.
+
+Pausing holds back new students the same way until resume() (or cancel()).
+"""
+
+import threading
+from collections import deque
+
+
+class PipelineCancelled(Exception):
+    """Raised by run_pipeline once a cancelled run has stopped cleanly."""
+
+
+class CancelToken:
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self._running = threading.Event()  # cleared while paused
+        self._running.set()
+
+    def cancel(self):
+        self._cancelled.set()
+        self._running.set()  # wake anything waiting in a pause
+
+    def pause(self):
+        if not self._cancelled.is_set():
+            self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def paused(self) -> bool:
+        return not self._running.is_set()
+
+    def wait_if_paused(self, timeout: float | None = None) -> bool:
+        """Blocks while paused. Returns False if still paused after `timeout`."""
+        return self._running.wait(timeout)
+
+    def keep_going(self) -> bool:
+        """Call before starting the next student: waits out a pause, False once cancelled."""
+        self.wait_if_paused()
+        return not self.cancelled
+
+
+def keep_going(token: CancelToken | None) -> bool:
+    return token is None or token.keep_going()
+
+
+def holding_back(token: CancelToken | None) -> bool:
+    """True while no new work should be handed out (paused or cancelled)."""
+    return token is not None and (token.paused or token.cancelled)
+
+
+def raise_if_cancelled(token: CancelToken | None, where: str = ""):
+    """Between pipeline steps: wait out a pause, then stop if the run was cancelled."""
+    if token is None:
+        return
+    token.wait_if_paused()
+    if token.cancelled:
+        raise PipelineCancelled(
+            f"Run cancelled{f' after {where}' if where else ''}.\n"
+            f"Students finished so far are saved — run the course again to resume."
+        )
+
+
+_END = object()
+
+
+def submit_in_order(pool, fn, jobs, window: int, token: CancelToken | None = None):
+    """
+    Submits fn(*job) to the pool lazily, at most `window` jobs ahead of the
+    one being collected, and yields (job, future) in job order.
+
+    While the token is paused nothing new is submitted (in-flight jobs still
+    come back); once it is cancelled queued jobs are dropped and the rest
+    are never submitted.
+    """
+    jobs = iter(jobs)
+    pending = deque()
+
+    while True:
+        if token is not None and token.cancelled:
+            # Drop what no worker has picked up yet; running jobs still come back
+            pending = deque(item for item in pending if not item[1].cancel())
+
+        while len(pending) < window and not holding_back(token):
+            job = next(jobs, _END)
+            if job is _END:
+                break
+            pending.append((job, pool.submit(fn, *job)))
+
+        if pending:
+            yield pending.popleft()
+        elif token is not None and token.paused:
+            token.wait_if_paused()
+        else:
+            return
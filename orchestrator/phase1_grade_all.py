@@ -1,9 +1,46 @@
 # orchestrator/phase1_grade_all.py
 
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from openpyxl import load_workbook
 
+from graders.batch_engine import ClassTable, describe_class_statistics, extract_submission_cells, grade_class
+from graders.cell_manifest import MA1_CELL_MANIFEST
+from orchestrator.cancellation import keep_going, submit_in_order
+from orchestrator.progress import PhaseProgress
+from orchestrator.results_store import sheet_row_scores
+from orchestrator.run_manifest import (
+    file_sha256,
+    phase_done,
+    mark_phase,
+    refresh_student,
+    save_manifest,
+    save_student_results,
+    load_student_results,
+    PHASE_GRADE,
+    PHASE_CHART_EXPORT,
+    PHASE_CHART_INSERT,
+    FEEDBACK_TABS,
+)
+from utilities.feedback_catalog import feedback_catalog
+from utilities.paths import ws_path
+from utilities.timing import (
+    timer,
+    record_timing,
+    timing_enabled,
+    set_trace_args,
+    sample_mark,
+    drain_samples,
+    merge_samples,
+)
+from utilities.xlsx_cell_reader import read_workbook_cells
+from writers.grading_sheet_patcher import load_grading_template
+from writers.render_chart_headless import render_chart_png_bytes, _import_matplotlib
+from writers.zip_submission_index import index_zip_submissions, read_zip_member, zip_member_sha256
+
 from graders.income_analysis.grade_income_analysis import grade_income_analysis
+from graders.row_memo import describe_memo_stats, drain_memo_stats, merge_memo_stats, summarize_memo_stats
 from writers.write_income_analysis_scores import write_income_analysis_scores
 
 # ---- Unit Conversions V2 imports ----
@@ -14,18 +51,623 @@ from writers.unit_conversions_writer_v2 import write_unit_conversions_scores_v2
 # ---- Currency Conversion V2 imports ----
 from graders.currency_conversion.grade_currency_conversion_tab_v2 import grade_currency_conversion_tab_v2
 from writers.write_currency_conversion_results_v2 import write_currency_conversion_results_v2
+from graders.currency_conversion.rates_snapshot import get_rates_snapshot
 # ---------------------------------------
 
+# "cells"    → targeted reader: only the manifest cells are extracted from the zip
+# "openpyxl" → full load_workbook() of the submission (slower, reads everything)
+SUBMISSION_READERS = ("cells", "openpyxl")
+DEFAULT_SUBMISSION_READER = "cells"
+
+# "patch"    → template parsed once per process; only sheet XML + shared strings are rewritten
+# "openpyxl" → load_workbook() + save() of the full grading sheet per student
+GRADING_WRITERS = ("patch", "openpyxl")
+DEFAULT_GRADING_WRITER = "patch"
+
+# "sheet" → every worker grades its student's workbook row checker by row checker
+# "batch" → the class is extracted into one column table first and each check
+#           is evaluated once per distinct input (graders/batch_engine.py);
+#           workers then only write the grading sheets
+GRADING_ENGINES = ("sheet", "batch")
+DEFAULT_GRADING_ENGINE = "sheet"
+
+
+def default_template_path() -> str:
+    return ws_path("templates", "Grading_Sheet_Template.xlsx")
+
+
+def load_submission(submission_file, reader: str = DEFAULT_SUBMISSION_READER):
+    """
+    Opens a student submission for grading.
+    Both readers return an object where wb["Tab"]["A1"].value / .number_format work.
+
+    submission_file is either a path on disk or a (zip_path, member) tuple;
+    ZIP members are read straight into memory.
+    """
+    if isinstance(submission_file, tuple):
+        submission_file = read_zip_member(*submission_file)
+
+    if reader == "cells":
+        return read_workbook_cells(submission_file, MA1_CELL_MANIFEST)
+    if reader == "openpyxl":
+        return load_workbook(submission_file, data_only=False)
+    raise ValueError(f"Unknown submission reader: {reader!r} (expected one of {SUBMISSION_READERS})")
+
+
+def resolve_worker_count(workers, job_count: int) -> int:
+    """
+    Turns the requested worker count into the number of processes to start.
+
+    - None or 0 → one worker per CPU core
+    - never more workers than students
+    - always at least 1
+    """
+    if not workers:
+        workers = os.cpu_count() or 1
+
+    return max(1, min(int(workers), job_count or 1))
+
+
+def _chart_png(chart: str, submission_file) -> bytes | None:
+    """PNG bytes for the student's chart: rendered headlessly or read from an exported file."""
+    if chart == "headless":
+        if hasattr(submission_file, "seek"):
+            submission_file.seek(0)
+        return render_chart_png_bytes(submission_file)
 
-def phase1_grade_all_students(submissions_path, graded_output_path):
+    if not os.path.exists(chart):
+        return None
+    with open(chart, "rb") as f:
+        return f.read()
+
+
+def _add_chart_openpyxl(ws_grading, chart_png: bytes):
+    """openpyxl writer path: anchor the PNG at J4 (openpyxl needs Pillow for images)."""
+    from io import BytesIO
+    from openpyxl.drawing.image import Image
+
+    ws_grading.add_image(Image(BytesIO(chart_png)), "J4")
+
+
+# Auto-graded score cells on the grading sheet (F8/F14/F23/F24 are SUM formulas)
+SCORE_ROWS = range(3, 23)
+
+
+def auto_graded_score(ws_grading) -> float:
+    """Sum of the numeric scores written to F3:F22 (formulas and blank cells skipped)."""
+    total = 0
+    for row in SCORE_ROWS:
+        value = ws_grading[f"F{row}"].value
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            total += value
+    return round(total, 2)
+
+
+def _grade_student_workbook(
+    student_name: str,
+    submission_file: str,
+    grading_file: str,
+    rates_snapshot: dict,
+    reader: str = DEFAULT_SUBMISSION_READER,
+    template_file: str | None = None,
+    writer: str = DEFAULT_GRADING_WRITER,
+    chart: str | None = None,
+    graded: dict | None = None,
+) -> dict:
+    """
+    Grades ONE student's workbook and saves their grading sheet.
+
+    chart (str): None → no chart. "headless" → render the student's scatter
+    chart from their workbook. Any other value is the path of an already
+    exported PNG. Either way the image is anchored at J4 in the SAME save as
+    the scores (no second open/save pass).
+
+    If template_file is given the grading sheet is built from the template
+    (streaming ZIP mode, no pre-copied sheet); otherwise grading_file is updated.
+    The "patch" writer always builds from the template (default: workspace copy).
+
+    graded (dict): the student's tabs already graded by the batch engine
+    (ClassGrade.student()); the workbook is then only opened for the chart.
+
+    Runs either in the calling process or inside a pool worker, so it must stay
+    a top-level function and must never raise: any failure is reported in the
+    returned dict so one bad workbook cannot take down the rest of the class.
+
+    Returns:
+        dict with:
+          student, status ("graded" | "failed"), error, warnings, results,
+          score (auto-graded points, None on failure), chart_embedded (bool),
+          timings (only while timing is enabled: this worker's samples,
+          merged by the parent), memo (row-memo hits/misses, graders/row_memo.py)
+    """
+    started = time.perf_counter()
+    mark = sample_mark()
+    set_trace_args(student=student_name)
+    outcome = {
+        "student": student_name,
+        "status": "graded",
+        "error": None,
+        "warnings": [],
+        "results": {},
+        "score": None,
+        "chart_embedded": False,
+    }
+
+    try:
+        # ZIP members are read once; grading and chart rendering share the buffer
+        if isinstance(submission_file, tuple) and (graded is None or chart):
+            submission_file = read_zip_member(*submission_file)
+
+        with timer("workbook.load"):
+            if graded is None:
+                student_wb = load_submission(submission_file, reader)
+            elif graded["error"] is not None:
+                raise graded["error"]
+            if writer == "patch":
+                template = load_grading_template(template_file or default_template_path())
+                ws_grading = template.new_sheet()
+            elif writer == "openpyxl":
+                grading_wb = load_workbook(template_file or grading_file)
+                ws_grading = grading_wb["Grading Sheet"]
+            else:
+                raise ValueError(f"Unknown grading writer: {writer!r} (expected one of {GRADING_WRITERS})")
+
+        # -----------------------------
+        # INCOME ANALYSIS
+        # -----------------------------
+        if graded is None:
+            ia_results = grade_income_analysis(student_wb["Income Analysis"])
+        else:
+            ia_results = _batch_tab(graded, "income_analysis")
+        write_income_analysis_scores(ws_grading, ia_results)
+        outcome["results"]["income_analysis"] = ia_results
+
+        # -----------------------------
+        # UNIT CONVERSIONS — V2 ONLY
+        # -----------------------------
+        try:
+            if graded is None:
+                uc_results = grade_unit_conversions_tab_v2(student_wb["Unit Conversions"])
+            else:
+                uc_results = _batch_tab(graded, "unit_conversions_v2")
+            write_unit_conversions_scores_v2(ws_grading, uc_results)
+            outcome["results"]["unit_conversions_v2"] = uc_results
+        except Exception as e:
+            outcome["warnings"].append(f"Unit Conversions error for {student_name}: {e}")
+
+        # -----------------------------
+        # CURRENCY CONVERSION — V2 ONLY
+        # -----------------------------
+        try:
+            if graded is None:
+                cc_results = grade_currency_conversion_tab_v2(
+                    student_wb["Currency Conversion"], student_name, rates_snapshot=rates_snapshot,
+                )
+            else:
+                cc_results = _batch_tab(graded, "currency_conversion_v2")
+            write_currency_conversion_results_v2(ws_grading, cc_results)
+            outcome["results"]["currency_conversion_v2"] = cc_results
+        except Exception as e:
+            outcome["warnings"].append(f"Currency Conversion error for {student_name}: {e}")
+
+        outcome["score"] = auto_graded_score(ws_grading)
+
+        # -----------------------------
+        # CHART (embedded at J4 in this same write)
+        # -----------------------------
+        chart_png = None
+        if chart:
+            try:
+                with timer("chart.render"):
+                    chart_png = _chart_png(chart, submission_file)
+                if chart_png is None:
+                    outcome["warnings"].append(f"No XY Scatter chart found for {student_name}")
+            except Exception as e:
+                outcome["warnings"].append(f"Chart error for {student_name}: {e}")
+
+        with timer("workbook.save"):
+            if writer == "patch":
+                template.save(ws_grading, grading_file, chart_png=chart_png)
+            else:
+                if chart_png:
+                    _add_chart_openpyxl(ws_grading, chart_png)
+                # Same tmp + rename as the patch writer: a stopped run never leaves half a sheet
+                tmp_path = f"{grading_file}.{os.getpid()}.tmp"
+                grading_wb.save(tmp_path)
+                os.replace(tmp_path, grading_file)
+
+        outcome["chart_embedded"] = chart_png is not None
+
+    except Exception as e:
+        outcome["status"] = "failed"
+        outcome["error"] = str(e)
+        outcome["score"] = None
+
+    record_timing("student", time.perf_counter() - started)
+    set_trace_args()
+    if timing_enabled():
+        outcome["timings"] = drain_samples(mark)
+    outcome["memo"] = drain_memo_stats()
+
+    return outcome
+
+
+def _batch_tab(graded: dict, tab_key: str) -> dict:
+    """A tab graded by the batch engine; raises what the per-sheet grader raised."""
+    if tab_key in graded["errors"]:
+        raise graded["errors"][tab_key]
+    return graded["results"][tab_key]
+
+
+def _unreadable_row(error: Exception) -> dict:
+    """A class table row for a submission that couldn't be read (extract_submission_cells' shape)."""
+    return {"cells": {}, "missing": {}, "error": error}
+
+
+def _extract_job_cells(submission_file) -> dict:
+    """
+    Pool task: one student's row of the class table (ZIP members read in the worker).
+
+    Never raises: an unreadable ZIP member fails that student only, as in the sheet engine.
+    """
+    if isinstance(submission_file, tuple):
+        try:
+            submission_file = read_zip_member(*submission_file)
+        except Exception as e:
+            return _unreadable_row(e)
+    return extract_submission_cells(submission_file)
+
+
+def _grade_jobs_as_class(
+    jobs: list,
+    rates_snapshot: dict,
+    pool=None,
+    worker_count: int = 1,
+    cancel_token=None,
+    progress=None,
+) -> tuple:
+    """
+    Batch engine: extracts every queued student into one class table (on the
+    pool when there is one), grades it column by column, and attaches each
+    student's graded tabs to their job — the jobs then only write sheets.
+
+    Extraction reports as its own phase "extract" (one "student_done" per
+    row, status "extracted" or "failed") and, like grading, submits to the
+    pool a few students at a time so a paused / cancelled token holds it.
+
+    Returns:
+        (jobs with the graded tabs appended, ClassGrade | None when cancelled
+         before anything was extracted)
+    """
+    table = ClassTable()
+    tracker = PhaseProgress(progress, "extract", total=len(jobs))
+
+    def add_row(job: tuple, row: dict):
+        table.add(job[0], row)
+        tracker.student_done(job[0], "extracted" if row["error"] is None else "failed")
+
+    with timer("batch.extract"):
+        if pool is None:
+            for job in jobs:
+                if not keep_going(cancel_token):
+                    break
+                add_row(job, _extract_job_cells(job[1]))
+        else:
+            cell_jobs = [(job[1],) for job in jobs]
+            arrivals = submit_in_order(pool, _extract_job_cells, cell_jobs, worker_count * 2, cancel_token)
+            for job, (_cell_job, future) in zip(jobs, arrivals):
+                try:
+                    row = future.result()
+                except Exception as e:
+                    row = _unreadable_row(RuntimeError(f"worker process failed: {e}"))
+                add_row(job, row)
+
+    tracker.end()
+
+    if not len(table) and not table.unreadable:
+        return jobs, None
+
+    class_grade = grade_class(table, rates_snapshot)
+    # Students not extracted (cancelled) keep grading per sheet if they ever start
+    graded_jobs = [(*job, class_grade.student(job[0]) if job[0] in class_grade else None) for job in jobs]
+    return graded_jobs, class_grade
+
+
+def _print_student_outcome(outcome: dict):
+    for warning in outcome["warnings"]:
+        print(f"⚠️ {warning}")
+
+    if outcome["status"] == "graded":
+        print(f"✅ Graded: {outcome['student']}")
+    else:
+        print(f"❌ Error grading {outcome['student']}: {outcome['error']}")
+
+
+def _print_rates_snapshot(rates_snapshot: dict):
+    if rates_snapshot.get("error"):
+        print(f"⚠️ Exchange rates unavailable ({rates_snapshot['error']}) — Row 19 will score 0.\n")
+    else:
+        print(f"💱 Exchange rates as of {rates_snapshot['fetched_at']} ({rates_snapshot['source']})\n")
+
+
+def _print_feedback_problems():
+    """Workspace feedback templates that can't be used are reported once per run (not per sheet)."""
+    for problem in feedback_catalog().problems(FEEDBACK_TABS):
+        print(f"⚠️ {problem}")
+
+
+def results_label(manifest: dict | None, graded_output_path: str) -> str:
+    """
+    Course folder the per-student results are stored under (state/<course>/results):
+    the manifest's course, else the graded output folder's name (graded_output/<course>).
+    """
+    if manifest is not None:
+        return manifest["course_label"]
+    return os.path.basename(os.path.normpath(graded_output_path))
+
+
+def _reused_outcome(manifest: dict, student_name: str) -> dict | None:
+    stored = load_student_results(manifest["course_label"], student_name)
+    if stored is None:
+        return None
+    # Same total auto_graded_score reads off F3:F22, rebuilt from the stored results
+    scores = [
+        score for score in sheet_row_scores(stored).values()
+        if isinstance(score, (int, float)) and not isinstance(score, bool)
+    ]
+    return {
+        "student": student_name,
+        "status": "reused",
+        "error": None,
+        "warnings": [],
+        "results": stored,
+        "score": round(sum(scores), 2),
+    }
+
+
+def _job_chart(embed_charts: str | None, student_name: str) -> str | None:
+    if not embed_charts or embed_charts == "headless":
+        return embed_charts
+    return os.path.join(embed_charts, f"{student_name}.png")
+
+
+def _check_embed_charts(embed_charts: str | None) -> str | None:
+    """Headless embedding without matplotlib: say so once, then grade without charts."""
+    if embed_charts == "headless":
+        try:
+            _import_matplotlib()
+        except ImportError as e:
+            print(f"⚠️ {e}\n   Grading continues without embedded charts.\n")
+            return None
+    return embed_charts
+
+
+def _run_grading_jobs(
+    jobs: list,
+    reused: dict,
+    workers,
+    rates_snapshot: dict,
+    manifest,
+    started: float,
+    progress=None,
+    cancel_token=None,
+    engine: str = DEFAULT_GRADING_ENGINE,
+    course: str | None = None,
+) -> dict:
+    """
+    Grades the queued jobs (in-process or on a pool), records them in the
+    manifest and builds the phase 1 summary. Shared by the folder and ZIP modes.
+
+    Every graded student's results — scores and (code, params) feedback —
+    are stored under state/<course>/results, manifest or not, so the sheets'
+    feedback text can be re-rendered later (orchestrator/rerender_feedback.py).
+
+    engine "batch" grades the whole class column by column first (same pool)
+    and the jobs only write the sheets; the summary gets the class
+    statistics under "batch".
+
+    Progress events ("grade" phase) are sent from this process as each
+    outcome is collected, so they look the same with 1 or N workers. The
+    batch engine's class extraction comes first, as phase "extract".
+
+    Pool jobs are submitted a few at a time, so a paused / cancelled token
+    (orchestrator/cancellation.py) stops new students from starting while
+    the ones already running finish and are recorded.
+    """
+    if reused:
+        print(f"♻️ Reusing previous results for {len(reused)} unchanged student(s).\n")
+
+    if engine not in GRADING_ENGINES:
+        raise ValueError(f"Unknown grading engine: {engine!r} (expected one of {GRADING_ENGINES})")
+
+    worker_count = resolve_worker_count(workers, len(jobs))
+    outcomes = []
+    memo_totals = {}
+    class_grade = None
+    tracker = None
+
+    def start_grading():
+        # After the batch engine's "extract" phase, so the grade phase's events follow it
+        nonlocal tracker
+        tracker = PhaseProgress(progress, "grade", total=len(jobs) + len(reused))
+        for outcome in reused.values():
+            tracker.student_done(outcome["student"], outcome["status"])
+
+    def collect(outcome: dict):
+        merge_samples(outcome.pop("timings", None))
+        merge_memo_stats(memo_totals, outcome.pop("memo", None))
+        _print_student_outcome(outcome)
+
+        if course is not None and outcome["status"] == "graded":
+            save_student_results(course, outcome["student"], outcome["results"])
+
+        # Recorded in the manifest as they arrive, so a run journal
+        # (run_journal.py) can checkpoint them mid-phase
+        if manifest is not None and outcome["status"] == "graded":
+            mark_phase(manifest, outcome["student"], PHASE_GRADE)
+            if outcome.get("chart_embedded"):
+                mark_phase(manifest, outcome["student"], PHASE_CHART_EXPORT)
+                mark_phase(manifest, outcome["student"], PHASE_CHART_INSERT)
+
+        tracker.student_done(outcome["student"], outcome["status"], outcome.get("score"), outcome["error"])
+        outcomes.append(outcome)
+
+    if worker_count == 1:
+        if engine == "batch" and jobs:
+            jobs, class_grade = _grade_jobs_as_class(jobs, rates_snapshot, cancel_token=cancel_token, progress=progress)
+        start_grading()
+        for job in jobs:
+            if not keep_going(cancel_token):
+                break
+            collect(_grade_student_workbook(*job))
+    else:
+        print(f"⚙️ Grading {len(jobs)} students with {worker_count} worker processes...\n")
+
+        with ProcessPoolExecutor(max_workers=worker_count) as pool:
+            if engine == "batch" and jobs:
+                jobs, class_grade = _grade_jobs_as_class(
+                    jobs, rates_snapshot, pool, worker_count, cancel_token, progress
+                )
+            start_grading()
+
+            # Collected in submission order so output stays deterministic
+            window = worker_count * 2
+            for job, future in submit_in_order(pool, _grade_student_workbook, jobs, window, cancel_token):
+                try:
+                    outcome = future.result()
+                except Exception as e:
+                    # Worker process died (crash, out of memory, ...)
+                    outcome = {
+                        "student": job[0],
+                        "status": "failed",
+                        "error": f"worker process failed: {e}",
+                        "warnings": [],
+                        "results": {},
+                        "score": None,
+                    }
+
+                collect(outcome)
+
+    if manifest is not None:
+        save_manifest(manifest)
+
+    tracker.end()
+
+    cancelled = len(jobs) - len(outcomes)
+    if cancelled:
+        print(f"\n⏹️ Cancelled — {cancelled} student(s) not graded (they will be graded on the next run).")
+
+    # Report everyone (graded + reused) in filename order
+    outcomes = sorted(outcomes + list(reused.values()), key=lambda o: o["student"])
+
+    graded = sum(1 for o in outcomes if o["status"] == "graded")
+    failed = sum(1 for o in outcomes if o["status"] == "failed")
+    charts = sum(1 for o in outcomes if o.get("chart_embedded"))
+
+    summary = {
+        "total": len(outcomes),
+        "graded": graded,
+        "reused": len(reused),
+        "failed": failed,
+        "cancelled": cancelled,
+        "charts_embedded": charts,
+        "workers": worker_count,
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+        "rates_snapshot_at": rates_snapshot.get("fetched_at"),
+        "memo": summarize_memo_stats(memo_totals),
+        "engine": engine,
+        "students": outcomes,
+    }
+    if class_grade is not None:
+        summary["batch"] = class_grade.statistics()
+
+    print(
+        f"\n📘 PHASE 1 complete — {summary['graded']}/{summary['total']} graded, "
+        f"{summary['reused']} reused, {summary['failed']} failed ({summary['elapsed_seconds']}s, {worker_count} worker(s))"
+    )
+    if memo_totals:
+        print(f"♻️ Row memo: {describe_memo_stats(summary['memo'])}")
+    if class_grade is not None:
+        print(f"📊 Batch engine: {describe_class_statistics(summary['batch'])}")
+
+    return summary
+
+
+def phase1_grade_all_students(
+    submissions_path,
+    graded_output_path,
+    workers: int = 1,
+    rates_snapshot: dict | None = None,
+    reader: str = DEFAULT_SUBMISSION_READER,
+    manifest: dict | None = None,
+    writer: str = DEFAULT_GRADING_WRITER,
+    embed_charts: str | None = None,
+    progress=None,
+    cancel_token=None,
+    engine: str = DEFAULT_GRADING_ENGINE,
+) -> dict:
     """
     Grades the formula-based parts of every student's MA1 workbook.
     (Chart export and insertion happen in later phases.)
+
+    Args:
+        submissions_path (str): student_submissions/<course_label>
+        graded_output_path (str): graded_output/<course_label>
+        workers (int): 1 grades in this process (default).
+                       >1 shards students across a process pool.
+                       0/None uses one worker per CPU core.
+        rates_snapshot (dict): FX snapshot every student is graded against.
+                       If omitted, one is taken here (see rates_snapshot.py).
+        reader (str): "cells" (default) extracts only the manifest cells;
+                       "openpyxl" fully loads each submission.
+        manifest (dict): Optional course manifest (run_manifest.py). Students
+                       whose submission hash is unchanged and who were already
+                       graded are skipped and their stored results reused.
+                       Newly graded students are recorded in it (and saved).
+        writer (str): "patch" (default) emits each grading sheet by patching the
+                       template's zip (writers/grading_sheet_patcher.py);
+                       "openpyxl" loads + saves the copied sheet per student.
+        embed_charts (str): None (default) leaves charts to phases 2–3.
+                       "headless" renders each student's chart in the worker;
+                       a folder path embeds <First_Last>.png exported there.
+                       The picture is anchored at J4 in the same write as the scores.
+        progress (callable): Optional event callback (orchestrator/progress.py):
+                       one "student_done" event per student with status and score.
+        cancel_token (CancelToken): Optional (orchestrator/cancellation.py).
+                       Paused → no new student starts; cancelled → the
+                       remaining students are skipped (summary["cancelled"])
+                       and stay pending in the manifest for the next run.
+        engine (str): "sheet" (default) grades each workbook on its own.
+                       "batch" extracts the class into one column table and
+                       evaluates each check once per distinct input
+                       (graders/batch_engine.py; always the "cells" reader);
+                       adds the class statistics as summary["batch"].
+
+    Students are always graded, printed and summarized in filename order,
+    no matter which worker finishes first.
+
+    Returns:
+        dict run summary:
+          total, graded, reused, failed, cancelled, workers, elapsed_seconds, rates_snapshot_at,
+          memo, engine, batch (engine "batch" only),
+          students: list of per-student outcome dicts (see _grade_student_workbook)
     """
 
     print("\n📘 PHASE 1 — Grading all students...\n")
 
-    for filename in os.listdir(submissions_path):
+    started = time.perf_counter()
+
+    # One FX snapshot for the whole class
+    if rates_snapshot is None:
+        rates_snapshot = get_rates_snapshot()
+
+    _print_rates_snapshot(rates_snapshot)
+    _print_feedback_problems()
+    embed_charts = _check_embed_charts(embed_charts)
+
+    jobs = []
+    reused = {}
+    for filename in sorted(os.listdir(submissions_path)):
         if not filename.endswith(".xlsx"):
             continue
 
@@ -33,41 +675,105 @@ def phase1_grade_all_students(submissions_path, graded_output_path):
         submission_file = os.path.join(submissions_path, filename)
         grading_file = os.path.join(graded_output_path, f"{student_name}_MA1_Grade.xlsx")
 
-        try:
-            student_wb = load_workbook(submission_file, data_only=False)
-            grading_wb = load_workbook(grading_file)
+        # ---- Incremental: unchanged + already graded → reuse ----
+        if manifest is not None and os.path.exists(grading_file):
+            if phase_done(manifest, student_name, PHASE_GRADE, file_sha256(submission_file)):
+                outcome = _reused_outcome(manifest, student_name)
+                if outcome is not None:
+                    reused[student_name] = outcome
+                    continue
 
-            ws_income = student_wb["Income Analysis"]
-            ws_grading = grading_wb["Grading Sheet"]
+        jobs.append((
+            student_name, submission_file, grading_file, rates_snapshot, reader, None, writer,
+            _job_chart(embed_charts, student_name),
+        ))
 
-            # -----------------------------
-            # INCOME ANALYSIS
-            # -----------------------------
-            ia_results = grade_income_analysis(ws_income)
-            write_income_analysis_scores(ws_grading, ia_results)
+    return _run_grading_jobs(
+        jobs, reused, workers, rates_snapshot, manifest, started, progress, cancel_token, engine,
+        course=results_label(manifest, graded_output_path),
+    )
 
-            # -----------------------------
-            # UNIT CONVERSIONS — V2 ONLY
-            # -----------------------------
-            try:
-                ws_unit = student_wb["Unit Conversions"]
-                uc_results = grade_unit_conversions_tab_v2(ws_unit)
-                write_unit_conversions_scores_v2(ws_grading, uc_results)
-            except Exception as e:
-                print(f"⚠️ Unit Conversions error for {student_name}: {e}")
 
-            # -----------------------------
-            # CURRENCY CONVERSION — V2 ONLY
-            # -----------------------------
-            try:
-                ws_currency = student_wb["Currency Conversion"]
-                cc_results = grade_currency_conversion_tab_v2(ws_currency, student_name)
-                write_currency_conversion_results_v2(ws_grading, cc_results)
-            except Exception as e:
-                print(f"⚠️ Currency Conversion error for {student_name}: {e}")
+def phase1_grade_zip_submissions(
+    zip_path: str,
+    graded_output_path: str,
+    workers: int = 1,
+    rates_snapshot: dict | None = None,
+    reader: str = DEFAULT_SUBMISSION_READER,
+    manifest: dict | None = None,
+    template_path: str | None = None,
+    writer: str = DEFAULT_GRADING_WRITER,
+    embed_charts: str | None = None,
+    progress=None,
+    cancel_token=None,
+    engine: str = DEFAULT_GRADING_ENGINE,
+) -> dict:
+    """
+    Streaming ingest: grades every submission straight out of the LMS ZIP.
 
-            grading_wb.save(grading_file)
-            print(f"✅ Graded: {student_name}")
+    Nothing is extracted — no student_groups/ or student_submissions/ copies.
+    Each worker reads its own ZIP member into memory, builds the grading
+    sheet from the template and saves it to graded_output_path. Only the
+    graded sheets are written to disk.
 
-        except Exception as e:
-            print(f"❌ Error grading {student_name}: {e}")
+    Args:
+        zip_path (str): LMS download of student submissions
+        graded_output_path (str): graded_output/<course_label>
+        template_path (str): Grading sheet template
+                       (default: workspace templates/Grading_Sheet_Template.xlsx)
+        workers, rates_snapshot, reader, manifest, writer, embed_charts, progress, cancel_token, engine:
+                       as phase1_grade_all_students
+
+    Returns:
+        dict run summary (same shape as phase1_grade_all_students)
+    """
+
+    print("\n📘 PHASE 1 — Grading all students (streaming from ZIP)...\n")
+
+    started = time.perf_counter()
+
+    template_path = template_path or default_template_path()
+    if not os.path.exists(template_path):
+        raise FileNotFoundError(
+            f"Grading sheet template not found:\n{template_path}\n"
+            f"Run ensure_workspace_assets() first."
+        )
+
+    if rates_snapshot is None:
+        rates_snapshot = get_rates_snapshot()
+
+    _print_rates_snapshot(rates_snapshot)
+    _print_feedback_problems()
+    embed_charts = _check_embed_charts(embed_charts)
+
+    zip_path = os.path.abspath(zip_path)
+    os.makedirs(graded_output_path, exist_ok=True)
+
+    jobs = []
+    reused = {}
+    for entry in index_zip_submissions(zip_path):
+        student_name = entry["student"]
+        grading_file = os.path.join(graded_output_path, f"{student_name}_MA1_Grade.xlsx")
+
+        # ---- Incremental: unchanged + already graded → reuse ----
+        if manifest is not None:
+            unchanged = refresh_student(manifest, student_name, zip_member_sha256(zip_path, entry["member"]))
+            if unchanged and os.path.exists(grading_file) and phase_done(manifest, student_name, PHASE_GRADE):
+                outcome = _reused_outcome(manifest, student_name)
+                if outcome is not None:
+                    reused[student_name] = outcome
+                    continue
+            mark_phase(manifest, student_name, PHASE_GRADE, status="pending")
+
+        jobs.append((
+            student_name, (zip_path, entry["member"]), grading_file, rates_snapshot, reader, template_path, writer,
+            _job_chart(embed_charts, student_name),
+        ))
+
+    if not jobs and not reused:
+        print(f"📭 No student submissions found inside: {zip_path}")
+
+    return _run_grading_jobs(
+        jobs, reused, workers, rates_snapshot, manifest, started, progress, cancel_token, engine,
+        course=results_label(manifest, graded_output_path),
+    )
@@ -1,28 +1,167 @@
 # orchestrator/phase2_export_charts.py
 
+import io
 import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+
 from utilities.paths import ensure_dir
-from writers.export_chart_to_image import export_chart_to_image
+from utilities.timing import timer, sample_mark, drain_samples, merge_samples
+from orchestrator.cancellation import keep_going, submit_in_order
+from orchestrator.phase1_grade_all import resolve_worker_count
+from orchestrator.progress import PhaseProgress
+
+# "com"      → Excel via pywin32 (Windows only, one Excel instance per student)
+# "headless" → chart XML + cell values rendered with matplotlib (any OS, parallel)
+CHART_BACKENDS = ("com", "headless")
+DEFAULT_CHART_BACKEND = "com"
+
+
+def _export_one_headless(full_path: str, temp_dir: str):
+    """
+    Pool worker: exports one chart and hands its log lines back to the parent
+    (worker stdout never reaches the GUI log).
+
+    Returns:
+        (image_path or None, captured output, timing samples)
+    """
+    from writers.render_chart_headless import export_chart_headless
+
+    mark = sample_mark()
+    student_name = os.path.basename(full_path).replace("_MA1.xlsx", "")
+
+    out = io.StringIO()
+    with redirect_stdout(out), timer("chart.export", student=student_name):
+        image_path = export_chart_headless(full_path, image_output_dir=temp_dir)
+    return image_path, out.getvalue(), drain_samples(mark)
+
+
+def _try_export(fn, *args):
+    try:
+        return fn(*args)
+    except Exception as e:
+        return e
+
+
+def _collect(student_name: str, filename: str, result, exported: list, tracker: PhaseProgress):
+    if isinstance(result, Exception):
+        print(f"⚠️ Chart export failed for {filename}: {result}")
+        tracker.student_done(student_name, "failed", error=str(result))
+        return
+
+    image_path, output, samples = result
+    merge_samples(samples)
+    if output:
+        print(output, end="")
+    if image_path:
+        exported.append(student_name)
+    tracker.student_done(student_name, "exported" if image_path else "no_chart")
 
 
-def phase2_export_all_charts(submissions_path: str):
+def phase2_export_all_charts(
+    submissions_path: str,
+    students=None,
+    backend: str = DEFAULT_CHART_BACKEND,
+    workers: int = 1,
+    temp_dir: str | None = None,
+    progress=None,
+    cancel_token=None,
+) -> list:
     """
     Exports scatterplot charts for every student submission.
     Safe per-student: one failure won't stop the entire pipeline.
 
-    Exports into workspace: Documents/MA1_Autograder/temp_charts/
+    Exports into temp_dir (default: Documents/MA1_Autograder/temp_charts/;
+    the pipeline passes a per-course temp_charts/<course_label>/ folder).
+
+    Args:
+        submissions_path (str): student_submissions/<course_label>
+        students (iterable): Optional student names ("First_Last") to export.
+                       None exports everyone (incremental runs pass only the
+                       students whose grading sheet still needs a chart).
+        backend (str): "com" (Excel, default) or "headless" (no Excel needed;
+                       see writers/render_chart_headless.py)
+        workers (int): Processes for the headless backend (0 = one per CPU).
+                       The COM backend always runs one student at a time.
+        progress (callable): Optional event callback (orchestrator/progress.py),
+                       "chart_export" phase, one event per student.
+        cancel_token (CancelToken): Optional (orchestrator/cancellation.py):
+                       no new export starts while paused or after cancel.
+
+    Returns:
+        list of student names whose chart was exported
     """
-    print("\n📊 PHASE 2 — Exporting scatterplot charts...\n")
+    if backend not in CHART_BACKENDS:
+        raise ValueError(f"Unknown chart backend: {backend!r} (expected one of {CHART_BACKENDS})")
 
-    temp_dir = ensure_dir("temp_charts")
+    print(f"\n📊 PHASE 2 — Exporting scatterplot charts ({backend})...\n")
 
-    for filename in os.listdir(submissions_path):
+    temp_dir = temp_dir or ensure_dir("temp_charts")
+    os.makedirs(temp_dir, exist_ok=True)
+    wanted = set(students) if students is not None else None
+
+    jobs = []
+    for filename in sorted(os.listdir(submissions_path)):
         if not filename.endswith(".xlsx"):
             continue
 
-        full_path = os.path.join(submissions_path, filename)
+        student_name = filename.replace("_MA1.xlsx", "")
+        if wanted is not None and student_name not in wanted:
+            continue
+
+        jobs.append((student_name, filename, os.path.join(submissions_path, filename)))
+
+    exported = []
+    tracker = PhaseProgress(progress, "chart_export", total=len(jobs))
+
+    if backend == "com":
+        # Imported here so the headless backend works where pywin32 isn't installed
+        from writers.export_chart_to_image import export_chart_to_image
+
+        for student_name, filename, full_path in jobs:
+            if not keep_going(cancel_token):
+                break
+            try:
+                with timer("chart.export", student=student_name):
+                    image_path = export_chart_to_image(full_path, image_output_dir=temp_dir)
+                if image_path:
+                    exported.append(student_name)
+                tracker.student_done(student_name, "exported" if image_path else "no_chart")
+            except Exception as e:
+                print(f"⚠️ Chart export failed for {filename}: {e}")
+                tracker.student_done(student_name, "failed", error=str(e))
+
+        tracker.end()
+        return exported
+
+    # Missing matplotlib is one message, not one failure per student
+    try:
+        from writers.render_chart_headless import _import_matplotlib
+        _import_matplotlib()
+    except ImportError as e:
+        print(f"❌ {e}")
+        tracker.end()
+        return exported
+
+    worker_count = resolve_worker_count(workers, len(jobs))
+
+    if worker_count == 1:
+        for student_name, filename, full_path in jobs:
+            if not keep_going(cancel_token):
+                break
+            result = _try_export(_export_one_headless, full_path, temp_dir)
+            _collect(student_name, filename, result, exported, tracker)
+    else:
+        pool_jobs = [(full_path, temp_dir) for _n, _f, full_path in jobs]
+        names = {full_path: (student_name, filename) for student_name, filename, full_path in jobs}
+
+        with ProcessPoolExecutor(max_workers=worker_count) as pool:
+            # Collected in submission order so the log stays deterministic
+            for (full_path, _dir), future in submit_in_order(
+                pool, _export_one_headless, pool_jobs, worker_count * 2, cancel_token
+            ):
+                student_name, filename = names[full_path]
+                _collect(student_name, filename, _try_export(future.result), exported, tracker)
 
-        try:
-            export_chart_to_image(full_path, image_output_dir=temp_dir)
-        except Exception as e:
-            print(f"⚠️ Chart export failed for {filename}: {e}")
+    tracker.end()
+    return exported
@@ -1,20 +1,49 @@
 # orchestrator/phase3_insert_charts.py
 
 from utilities.paths import ensure_dir
+from orchestrator.progress import PhaseProgress
 
 
-def phase3_insert_all_charts(graded_output_path: str):
+def phase3_insert_all_charts(graded_output_path: str, students=None, temp_dir: str | None = None, progress=None) -> list:
     """
     Inserts previously exported charts into final grading sheets.
     Only inserts into THIS COURSE folder.
-    """
-    from writers.insert_saved_images_into_grading_sheets import insert_images_into_grading_sheets
 
+    Args:
+        students (iterable): Optional student names to insert for (None = every PNG found).
+        temp_dir (str): Folder the charts were exported to (default: workspace temp_charts).
+        progress (callable): Optional event callback (orchestrator/progress.py).
+                       Excel inserts the whole batch in one call, so the
+                       "chart_insert" events arrive when it finishes.
+
+    Optional since charts can be embedded during phase 1 (embed_charts);
+    this pass re-opens every grading sheet in Excel.
+
+    Returns:
+        list of student names whose chart was inserted
+    """
     print("\n📥 PHASE 3 — Inserting charts into grading sheets...\n")
 
-    temp_dir = ensure_dir("temp_charts")
+    tracker = PhaseProgress(progress, "chart_insert", total=len(students) if students is not None else None)
 
-    insert_images_into_grading_sheets(
+    try:
+        from writers.insert_saved_images_into_grading_sheets import insert_images_into_grading_sheets
+    except ImportError as e:
+        # Headless chart export works without Excel; inserting still needs it
+        print(f"⚠️ Chart insertion needs Excel (pywin32): {e}")
+        tracker.end()
+        return []
+
+    temp_dir = temp_dir or ensure_dir("temp_charts")
+
+    inserted = insert_images_into_grading_sheets(
         temp_chart_dir=temp_dir,
-        graded_output_dir=graded_output_path
+        graded_output_dir=graded_output_path,
+        students=students,
     )
+
+    for student in inserted or []:
+        tracker.student_done(student, "inserted")
+    tracker.end()
+
+    return inserted
@@ -0,0 +1,157 @@
+# orchestrator/progress.py
+
+"""
+Structured progress events for run_pipeline and the phase functions.
+
+Pass `progress=callback` and the callback receives one dict per event,
+always from the thread that called run_pipeline (never from a pool worker),
+so parallel grading reports exactly like sequential grading:
+
+    {"event": "run_start",    "course_label": ...}
+    {"event": "phase_start",  "phase": "grade", "total": 120}
+    {"event": "student_done", "phase": "grade", "student": "Ann_Lee",
+                              "status": "graded" | "reused" | "failed" | ...,
+                              "score": 61.5 | None, "done": 3, "total": 120}
+    {"event": "error",        "phase": "grade", "student": "Ann_Lee", "error": "..."}
+    {"event": "phase_end",    "phase": "grade", "done": 120, "total": 120,
+                              "elapsed_seconds": 14.2}
+    {"event": "run_end",      "graded_path": ...}
+    {"event": "cancelled",    "after": "grade"}   (run stopped by its CancelToken)
+
+Phases: "prepare", "chart_export", "extract" (batch engine only, just
+before "grade"), "grade", "chart_insert", plus the
+whole-class steps "import", "master" (total None → no per-student events).
+The feedback re-render command (orchestrator/rerender_feedback.py) reports
+as phase "rerender".
+
+A callback that raises is reported once and then ignored; it can never
+stop a grading run.
+"""
+
+import time
+
+RUN_START = "run_start"
+RUN_END = "run_end"
+PHASE_START = "phase_start"
+PHASE_END = "phase_end"
+STUDENT_DONE = "student_done"
+ERROR = "error"
+CANCELLED = "cancelled"
+
+
+def emit(progress, event: str, **fields):
+    """Sends one event to the callback (no-op when progress is None)."""
+    if progress is None:
+        return
+
+    try:
+        progress({"event": event, **fields})
+    except Exception as e:
+        if not getattr(progress, "_ma1_failed", False):
+            print(f"⚠️ Progress callback failed (ignored from now on): {e}")
+            try:
+                progress._ma1_failed = True
+            except AttributeError:
+                pass
+
+
+class PhaseProgress:
+    """
+    Counts one phase's students and emits its events.
+
+        tracker = PhaseProgress(progress, "grade", total=len(jobs))
+        tracker.student_done(outcome["student"], outcome["status"], score=..., error=...)
+        tracker.end()
+    """
+
+    def __init__(self, progress, phase: str, total: int | None = None):
+        self.progress = progress
+        self.phase = phase
+        self.total = total
+        self.done = 0
+        self.started = time.perf_counter()
+        emit(progress, PHASE_START, phase=phase, total=total)
+
+    def student_done(self, student: str, status: str, score: float | None = None, error: str | None = None):
+        self.done += 1
+        emit(
+            self.progress, STUDENT_DONE,
+            phase=self.phase, student=student, status=status, score=score,
+            done=self.done, total=self.total,
+        )
+        if error:
+            emit(self.progress, ERROR, phase=self.phase, student=student, error=error)
+
+    def end(self):
+        emit(
+            self.progress, PHASE_END,
+            phase=self.phase, done=self.done, total=self.total,
+            elapsed_seconds=round(time.perf_counter() - self.started, 3),
+        )
+
+
+class ProgressMonitor:
+    """
+    Consumer side (e.g. the GUI): feed it events, read back how far the
+    current phase is, its throughput and an ETA.
+    """
+
+    def __init__(self):
+        self.phase = None
+        self.total = None
+        self.done = 0
+        self.failed = 0
+        self.phase_started = None
+
+    def update(self, event: dict):
+        kind = event.get("event")
+        if kind == PHASE_START:
+            self.phase = event.get("phase")
+            self.total = event.get("total")
+            self.done = 0
+            self.failed = 0
+            self.phase_started = time.perf_counter()
+        elif kind == STUDENT_DONE and event.get("phase") == self.phase:
+            self.done = event.get("done", self.done + 1)
+            if event.get("status") == "failed":
+                self.failed += 1
+
+    @property
+    def determinate(self) -> bool:
+        return bool(self.total)
+
+    @property
+    def fraction(self) -> float:
+        return min(1.0, self.done / self.total) if self.total else 0.0
+
+    @property
+    def rate(self) -> float | None:
+        """Students per second in the current phase."""
+        if not self.done or self.phase_started is None:
+            return None
+        elapsed = time.perf_counter() - self.phase_started
+        return self.done / elapsed if elapsed > 0 else None
+
+    @property
+    def eta_seconds(self) -> float | None:
+        rate = self.rate
+        if not rate or not self.total:
+            return None
+        return max(0.0, (self.total - self.done) / rate)
+
+    def describe(self) -> str:
+        """One status line, e.g. 'grade 37/120 · 8.2 students/s · ETA 0:10'."""
+        if self.phase is None:
+            return ""
+        if not self.total:
+            return f"{self.phase}…"
+
+        parts = [f"{self.phase} {self.done}/{self.total}"]
+        if self.rate:
+            parts.append(f"{self.rate:.1f} students/s")
+        if self.eta_seconds is not None:
+            minutes, seconds = divmod(int(round(self.eta_seconds)), 60)
+            parts.append(f"ETA {minutes}:{seconds:02d}")
+        if self.failed:
+            parts.append(f"{self.failed} failed")
+        return " · ".join(parts)
@@ -0,0 +1,204 @@
+# orchestrator/rerender_feedback.py
+
+"""
+Re-render feedback text into existing grading sheets, without regrading.
+
+Every graded student's results — scores and (code, params) feedback — are
+kept in state/<course>/results/<student>.json (phase 1 / the lanes save
+them). After an instructor rewords feedback/<tab>.json, this command
+renders those stored codes again through the feedback catalog
+(utilities/feedback_catalog.py) and rewrites ONLY the G-column feedback
+cells of each graded_output/<course>/<student>_MA1_Grade.xlsx:
+
+  - no submission is opened and nothing is graded,
+  - the sheet is patched in place like the template writer does
+    (writers/grading_sheet_patcher.py): scores, the embedded chart and
+    everything else in the file are kept as they are,
+  - students are spread over a process pool.
+
+If the grading code itself hasn't changed since the course was graded
+(manifest "grading_hash"), the course manifest is brought up to date
+afterwards, so the next incremental run doesn't regrade the class just
+because of the new wording.
+
+    rerender_feedback("MAT-144-501", workers=0)
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from orchestrator.cancellation import keep_going, submit_in_order
+from orchestrator.phase1_grade_all import _print_feedback_problems, resolve_worker_count
+from orchestrator.progress import PhaseProgress
+from orchestrator.run_manifest import (
+    load_manifest,
+    load_student_results,
+    manifest_path,
+    rubric_fingerprint,
+    save_manifest,
+)
+from utilities.paths import ensure_dir
+from writers.generate_course_folders import folder_safe_label
+from writers.grading_sheet_patcher import PATCH_CELLS, GradingSheetTemplate, PatchedSheet
+from writers.unit_conversions_writer_v2 import write_unit_conversions_scores_v2
+from writers.write_currency_conversion_results_v2 import write_currency_conversion_results_v2
+from writers.write_income_analysis_scores import write_income_analysis_scores
+
+
+GRADE_FILE_SUFFIX = "_MA1_Grade.xlsx"
+
+# The writers' feedback cells; the score cells (F) are left as graded
+FEEDBACK_CELLS = tuple(c for c in PATCH_CELLS if c.startswith("G"))
+
+# Stored results key → writer (same order as _grade_student_workbook)
+TAB_WRITERS = (
+    ("income_analysis", write_income_analysis_scores),
+    ("unit_conversions_v2", write_unit_conversions_scores_v2),
+    ("currency_conversion_v2", write_currency_conversion_results_v2),
+)
+
+
+def _rerender_student(student_name: str, grading_file: str, course: str) -> dict:
+    """
+    Rewrites one grading sheet's feedback cells from the student's stored results.
+
+    Runs in the calling process or a pool worker, so it never raises.
+
+    Returns:
+        dict with student, status ("rerendered" | "skipped" | "failed"), error
+    """
+    outcome = {"student": student_name, "status": "rerendered", "error": None}
+
+    try:
+        results = load_student_results(course, student_name)
+        if results is None:
+            outcome["status"] = "skipped"
+            outcome["error"] = "no stored results (graded before results were kept — run the pipeline once)"
+            return outcome
+
+        # The writers fill F3:G22; only their feedback cells are kept
+        rendered = PatchedSheet(PATCH_CELLS)
+        for key, writer in TAB_WRITERS:
+            if key in results:
+                writer(rendered, results[key])
+
+        sheet_file = GradingSheetTemplate(grading_file, coordinates=FEEDBACK_CELLS)
+        sheet = sheet_file.new_sheet()
+        for coord, value in rendered.values().items():
+            if coord in FEEDBACK_CELLS:
+                sheet[coord] = value
+        sheet_file.save(sheet, grading_file)
+
+    except Exception as e:
+        outcome["status"] = "failed"
+        outcome["error"] = str(e)
+
+    return outcome
+
+
+def _grading_files(graded_path: str) -> list:
+    """[(student, grading file)] in filename order."""
+    return [
+        (fn[: -len(GRADE_FILE_SUFFIX)], os.path.join(graded_path, fn))
+        for fn in sorted(os.listdir(graded_path))
+        if fn.endswith(GRADE_FILE_SUFFIX)
+    ]
+
+
+def _print_outcome(outcome: dict):
+    if outcome["status"] == "rerendered":
+        print(f"✅ Re-rendered: {outcome['student']}")
+    elif outcome["status"] == "skipped":
+        print(f"⚠️ Skipped {outcome['student']}: {outcome['error']}")
+    else:
+        print(f"❌ Error re-rendering {outcome['student']}: {outcome['error']}")
+
+
+def _refresh_manifest(course: str, failed: int):
+    """Marks the manifest current for the new wording when only the wording changed."""
+    if not os.path.exists(manifest_path(course)):
+        return
+
+    manifest = load_manifest(course)
+    if failed or manifest.get("grading_hash") != rubric_fingerprint(feedback=False):
+        print("⚠️ Grader code changed since this course was graded (or some sheets failed) — "
+              "the next incremental run regrades the class.")
+        return
+
+    manifest["rubric_hash"] = rubric_fingerprint()
+    save_manifest(manifest)
+    print("♻️ Course manifest updated: the next incremental run keeps the current grades.")
+
+
+def rerender_feedback(course_label: str, workers: int = 0, progress=None, cancel_token=None) -> str:
+    """
+    Re-renders every graded sheet's feedback text of a course from the
+    stored (code, params) results and the current feedback JSON.
+
+    Args:
+        course_label (str): Course label (e.g., MAT-144-501)
+        workers (int): processes (1 = in this process, 0/None = one per CPU)
+        progress (callable): Optional event callback (orchestrator/progress.py),
+                       phase "rerender": one "student_done" per sheet
+        cancel_token (CancelToken): Optional (orchestrator/cancellation.py)
+
+    Returns:
+        str: Path to graded_output/<course_label> inside workspace
+    """
+    course_label = (course_label or "").strip()
+    if not course_label:
+        raise ValueError("Course label cannot be blank.")
+
+    course = folder_safe_label(course_label)
+    graded_path = ensure_dir("graded_output", course)
+    students = _grading_files(graded_path)
+
+    print(f"\n📘 Re-rendering feedback for {course_label} ({len(students)} grading sheets)...\n")
+    started = time.perf_counter()
+
+    # Template problems are reported once here, not by every worker
+    _print_feedback_problems()
+
+    jobs = [(student, grading_file, course) for student, grading_file in students]
+    tracker = PhaseProgress(progress, "rerender", total=len(jobs))
+    worker_count = resolve_worker_count(workers, len(jobs))
+    outcomes = []
+
+    def collect(outcome: dict):
+        _print_outcome(outcome)
+        tracker.student_done(outcome["student"], outcome["status"], error=outcome["error"])
+        outcomes.append(outcome)
+
+    if worker_count == 1:
+        for job in jobs:
+            if not keep_going(cancel_token):
+                break
+            collect(_rerender_student(*job))
+    else:
+        with ProcessPoolExecutor(max_workers=worker_count) as pool:
+            for job, future in submit_in_order(pool, _rerender_student, jobs, worker_count * 2, cancel_token):
+                try:
+                    outcome = future.result()
+                except Exception as e:
+                    outcome = {"student": job[0], "status": "failed", "error": f"worker process failed: {e}"}
+                collect(outcome)
+
+    tracker.end()
+
+    done = sum(1 for o in outcomes if o["status"] == "rerendered")
+    failed = sum(1 for o in outcomes if o["status"] == "failed")
+    skipped = sum(1 for o in outcomes if o["status"] == "skipped")
+    cancelled = len(jobs) - len(outcomes)
+    elapsed = round(time.perf_counter() - started, 3)
+
+    print(
+        f"\n📘 Feedback re-rendered — {done}/{len(jobs)} sheets, {skipped} skipped, "
+        f"{failed} failed ({elapsed}s, {worker_count} worker(s))"
+    )
+    if cancelled:
+        print(f"⏹️ Cancelled — {cancelled} sheet(s) not re-rendered.")
+    else:
+        _refresh_manifest(course, failed + skipped)
+
+    return graded_path
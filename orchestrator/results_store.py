@@ -0,0 +1,392 @@
+# orchestrator/results_store.py
+
+"""
+Workspace-wide SQLite store of per-check grading results.
+
+The grading sheets hold each student's scores and rendered feedback, but
+one workbook per student makes class-wide questions ("how many students
+missed the UC28 final unit?") a matter of opening every file. Each
+pipeline run therefore also writes its students' results here:
+
+    Documents/MA1_Autograder/state/results.sqlite
+
+    runs            one row per pipeline run (course, time, rubric hash, options)
+    students        one row per (run, student): status, auto-graded score, error
+    check_results   one row per (run, student, tab, check): score, max points,
+                    feedback (code, params) list as JSON, grading-sheet row
+    feedback_codes  one row per (run, student, tab, check, code), with how
+                    many times the check emitted that code
+
+Indexed on course and on feedback code, e.g.:
+
+    SELECT COUNT(DISTINCT student) FROM feedback_codes
+     WHERE run_id = ? AND code = 'UC28_FINAL_UNIT_INCORRECT'
+
+Rows are written in bulk: students are buffered and inserted with one
+executemany per table, in one transaction per STORE_CHUNK_SIZE students.
+Reused (unchanged) students are written too, so every run holds the
+whole class.
+"""
+
+import json
+import sqlite3
+import zipfile
+from datetime import datetime, timezone
+
+from utilities.paths import ws_path
+from utilities.xlsx_cell_reader import read_workbook_cells
+
+
+STORE_VERSION = 1
+STORE_CHUNK_SIZE = 100  # students per transaction
+
+GRADING_SHEET_NAME = "Grading Sheet"
+MAX_POINTS_COLUMN = "E"
+
+# Checks as the writers put them on the grading sheet:
+# (results key, tab, check id, score key, feedback key | None, sheet row)
+CHECKS = (
+    ("income_analysis", "income_analysis", "name", "name_score", "name_feedback", 3),
+    ("income_analysis", "income_analysis", "slope", "slope_score", "slope_feedback", 4),
+    ("income_analysis", "income_analysis", "predictions", "predictions_score", "predictions_feedback", 5),
+    ("unit_conversions_v2", "unit_conversions", "final_unit", "final_unit_score", "final_unit_feedback", 9),
+    ("unit_conversions_v2", "unit_conversions", "unit_text", "unit_text_score", "unit_text_feedback", 10),
+    ("unit_conversions_v2", "unit_conversions", "formulas", "formulas_score", "formulas_feedback", 11),
+    ("unit_conversions_v2", "unit_conversions", "final_formula", "final_formula_score", "final_formula_feedback", 12),
+    ("unit_conversions_v2", "unit_conversions", "temp_and_celsius", "temp_and_celsius_score", "temp_and_celsius_feedback", 13),
+    ("currency_conversion_v2", "currency_conversion", "row15", "row15_score", "row15_feedback", 15),
+    ("currency_conversion_v2", "currency_conversion", "row16", "row16_score", "row16_feedback", 16),
+    ("currency_conversion_v2", "currency_conversion", "row17", "row17_score", "row17_feedback", 17),
+    ("currency_conversion_v2", "currency_conversion", "row18", "row18_score", "row18_feedback", 18),
+    ("currency_conversion_v2", "currency_conversion", "row19", "row19_accuracy_score", "row19_feedback", 19),
+    ("currency_conversion_v2", "currency_conversion", "row20", "row20_formula_score", "row20_feedback", 20),
+    ("currency_conversion_v2", "currency_conversion", "row21", "row21_formula_score", "row21_feedback", 21),
+    ("currency_conversion_v2", "currency_conversion", "formatting", "formatting_total", None, 22),
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS runs (
+    run_id      INTEGER PRIMARY KEY AUTOINCREMENT,
+    course      TEXT NOT NULL,
+    recorded_at TEXT NOT NULL,
+    rubric_hash TEXT,
+    options     TEXT
+);
+CREATE TABLE IF NOT EXISTS students (
+    run_id  INTEGER NOT NULL REFERENCES runs(run_id),
+    course  TEXT NOT NULL,
+    student TEXT NOT NULL,
+    status  TEXT NOT NULL,
+    score   REAL,
+    error   TEXT,
+    PRIMARY KEY (run_id, student)
+);
+CREATE TABLE IF NOT EXISTS check_results (
+    run_id     INTEGER NOT NULL REFERENCES runs(run_id),
+    course     TEXT NOT NULL,
+    student    TEXT NOT NULL,
+    tab        TEXT NOT NULL,
+    check_id   TEXT NOT NULL,
+    sheet_row  INTEGER,
+    score      REAL,
+    max_points REAL,
+    feedback   TEXT NOT NULL,
+    PRIMARY KEY (run_id, student, tab, check_id)
+);
+CREATE TABLE IF NOT EXISTS feedback_codes (
+    run_id   INTEGER NOT NULL REFERENCES runs(run_id),
+    course   TEXT NOT NULL,
+    student  TEXT NOT NULL,
+    tab      TEXT NOT NULL,
+    check_id TEXT NOT NULL,
+    code     TEXT NOT NULL,
+    count    INTEGER NOT NULL,
+    PRIMARY KEY (run_id, student, tab, check_id, code)
+);
+CREATE INDEX IF NOT EXISTS idx_runs_course ON runs (course, run_id);
+CREATE INDEX IF NOT EXISTS idx_students_course ON students (course, run_id);
+CREATE INDEX IF NOT EXISTS idx_check_results_course ON check_results (course, run_id, tab, check_id);
+CREATE INDEX IF NOT EXISTS idx_feedback_codes_code ON feedback_codes (code, run_id);
+CREATE INDEX IF NOT EXISTS idx_feedback_codes_course ON feedback_codes (course, run_id);
+"""
+
+
+def results_store_path() -> str:
+    return ws_path("state", "results.sqlite")
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+
+
+def _number(value) -> float | None:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return None
+
+
+# ------------------------------
+# RESULTS → ROWS
+# ------------------------------
+def template_max_points(template_path: str) -> dict:
+    """
+    Points possible per grading-sheet row, from the template's column E.
+
+    Returns:
+        {row: points} for the CHECKS rows; {} if the template can't be read
+    """
+    rows = sorted({check[5] for check in CHECKS})
+    cells = [f"{MAX_POINTS_COLUMN}{row}" for row in rows]
+    try:
+        ws = read_workbook_cells(template_path, {GRADING_SHEET_NAME: cells})[GRADING_SHEET_NAME]
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile) as e:
+        print(f"⚠️ Max points not read from the grading template ({e}) — stored as NULL.")
+        return {}
+    return {row: _number(ws[f"{MAX_POINTS_COLUMN}{row}"].value) for row in rows}
+
+
+def check_rows(results: dict, max_points: dict | None = None) -> list:
+    """
+    One student's results as per-check rows.
+
+    Returns:
+        list of (tab, check_id, sheet_row, score, max_points, feedback list)
+        — only for the tabs present in `results`
+    """
+    max_points = max_points or {}
+    rows = []
+    for results_key, tab, check_id, score_key, feedback_key, sheet_row in CHECKS:
+        tab_results = results.get(results_key)
+        if not isinstance(tab_results, dict):
+            continue
+        feedback = tab_results.get(feedback_key) if feedback_key else None
+        if isinstance(feedback, str):
+            feedback = [feedback]
+        rows.append((
+            tab,
+            check_id,
+            sheet_row,
+            _number(tab_results.get(score_key)),
+            max_points.get(sheet_row),
+            list(feedback or []),
+        ))
+    return rows
+
+
+def sheet_row_scores(results: dict) -> dict:
+    """
+    One student's results as the grading sheet's F scores.
+
+    Returns:
+        {sheet row: score} (the instructor master's totals are built from it)
+    """
+    return {sheet_row: score for _tab, _check, sheet_row, score, _points, _feedback in check_rows(results)}
+
+
+def grade_summary_results(grade_summary: dict) -> dict:
+    """
+    {student: grading results} for every student of a grade summary that
+    has results (failed students are left out).
+    """
+    return {
+        outcome["student"]: outcome["results"]
+        for outcome in (grade_summary or {}).get("students") or []
+        if outcome.get("results")
+    }
+
+
+def _code_counts(feedback: list) -> dict:
+    counts = {}
+    for item in feedback:
+        if isinstance(item, (tuple, list)) and len(item) == 2 and isinstance(item[0], str):
+            counts[item[0]] = counts.get(item[0], 0) + 1
+    return counts
+
+
+# ------------------------------
+# STORE
+# ------------------------------
+class ResultsStore:
+    """
+    Connection to the results database (tables created on first open).
+
+        with ResultsStore() as store:
+            run_id = store.begin_run("MAT-144-501", options, rubric_hash)
+            for outcome in outcomes:
+                store.add_student(run_id, outcome, max_points)
+        # remaining buffered students are written on exit
+
+    Args:
+        path (str): database file (default: state/results.sqlite in the workspace)
+        chunk_size (int): students per insert transaction
+    """
+
+    def __init__(self, path: str | None = None, chunk_size: int = STORE_CHUNK_SIZE):
+        self.path = path or results_store_path()
+        self.chunk_size = max(1, chunk_size)
+        self.conn = sqlite3.connect(self.path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._pending_students = []
+        self._pending_checks = []
+        self._pending_codes = []
+        self._buffered = 0
+        self._courses = {}  # run_id → course of the runs begun here
+        self._create_schema()
+
+    def _create_schema(self):
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            if row is None:
+                self.conn.execute("INSERT INTO meta (key, value) VALUES ('version', ?)", (str(STORE_VERSION),))
+            elif row[0] != str(STORE_VERSION):
+                raise ValueError(
+                    f"Results store has an unknown version.\n"
+                    f"- File: {self.path}\n"
+                    f"- Version: {row[0]} (expected {STORE_VERSION})\n"
+                    f"Fix: move the file aside; the next run starts a new store."
+                )
+
+    # ---- Writing ----
+    def begin_run(self, course: str, options: dict | None = None, rubric_hash: str | None = None) -> int:
+        """Records a new run of `course`. Returns its run_id."""
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (course, recorded_at, rubric_hash, options) VALUES (?, ?, ?, ?)",
+                (course, _now(), rubric_hash, json.dumps(options or {}, default=str)),
+            )
+        self._courses[cursor.lastrowid] = course
+        return cursor.lastrowid
+
+    def add_student(self, run_id: int, outcome: dict, max_points: dict | None = None):
+        """
+        Buffers one student's outcome (phase 1 / lane outcome dict); every
+        chunk_size students are written in one transaction.
+        """
+        course = self._courses[run_id]
+        student = outcome["student"]
+        self._pending_students.append((
+            run_id, course, student, outcome["status"], _number(outcome.get("score")), outcome.get("error"),
+        ))
+
+        for tab, check_id, sheet_row, score, points, feedback in check_rows(outcome.get("results") or {}, max_points):
+            self._pending_checks.append((
+                run_id, course, student, tab, check_id, sheet_row, score, points,
+                json.dumps(feedback, default=str, ensure_ascii=False),
+            ))
+            for code, count in _code_counts(feedback).items():
+                self._pending_codes.append((run_id, course, student, tab, check_id, code, count))
+
+        self._buffered += 1
+        if self._buffered >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Writes the buffered students (one transaction)."""
+        if not self._buffered:
+            return
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO students VALUES (?, ?, ?, ?, ?, ?)", self._pending_students,
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO check_results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", self._pending_checks,
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO feedback_codes VALUES (?, ?, ?, ?, ?, ?, ?)", self._pending_codes,
+            )
+        self._pending_students.clear()
+        self._pending_checks.clear()
+        self._pending_codes.clear()
+        self._buffered = 0
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # ---- Reading ----
+    def latest_run(self, course: str) -> int | None:
+        row = self.conn.execute("SELECT MAX(run_id) FROM runs WHERE course = ?", (course,)).fetchone()
+        return row[0]
+
+    def students_with_code(self, course: str, code: str, run_id: int | None = None) -> list:
+        """Students whose feedback contains `code` in the course's (latest) run, sorted."""
+        run_id = run_id or self.latest_run(course)
+        rows = self.conn.execute(
+            "SELECT DISTINCT student FROM feedback_codes WHERE code = ? AND run_id = ? ORDER BY student",
+            (code, run_id),
+        )
+        return [student for (student,) in rows]
+
+    def check_statistics(self, course: str, run_id: int | None = None) -> list:
+        """
+        Per-check class statistics of the course's (latest) run.
+
+        Returns:
+            list of dicts {tab, check_id, sheet_row, students, mean, max_points, full_marks}
+            in grading-sheet order
+        """
+        run_id = run_id or self.latest_run(course)
+        rows = self.conn.execute(
+            """
+            SELECT tab, check_id, sheet_row, COUNT(*), AVG(score), MAX(max_points),
+                   SUM(CASE WHEN max_points IS NOT NULL AND score >= max_points THEN 1 ELSE 0 END)
+              FROM check_results
+             WHERE course = ? AND run_id = ?
+             GROUP BY tab, check_id, sheet_row
+             ORDER BY sheet_row
+            """,
+            (course, run_id),
+        )
+        return [
+            {
+                "tab": tab,
+                "check_id": check_id,
+                "sheet_row": sheet_row,
+                "students": students,
+                "mean": round(mean, 3) if mean is not None else None,
+                "max_points": max_points,
+                "full_marks": full_marks,
+            }
+            for tab, check_id, sheet_row, students, mean, max_points, full_marks in rows
+        ]
+
+
+def store_grade_summary(
+    course: str,
+    grade_summary: dict,
+    options: dict | None = None,
+    rubric_hash: str | None = None,
+    template_path: str | None = None,
+    path: str | None = None,
+) -> int:
+    """
+    Writes one run's grade summary (phase 1 or lanes: summary["students"])
+    to the results store.
+
+    Returns:
+        int: the run_id
+    """
+    max_points = template_max_points(template_path) if template_path else {}
+    outcomes = grade_summary.get("students") or []
+
+    with ResultsStore(path) as store:
+        run_id = store.begin_run(course, options, rubric_hash)
+        for outcome in outcomes:
+            store.add_student(run_id, outcome, max_points)
+
+    print(f"📊 Results store: run {run_id}, {len(outcomes)} student(s) → {store.path}")
+    return run_id
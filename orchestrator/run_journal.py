@@ -0,0 +1,159 @@
+# orchestrator/run_journal.py
+
+"""
+Per-course run journal: how far the current (or last) pipeline run got.
+
+Stored next to the manifest:
+
+    Documents/MA1_Autograder/state/<course>/journal.json
+
+    {
+      "version": 1,
+      "course_label": "MAT-144-501",
+      "status": "running" | "completed",
+      "started_at": ..., "updated_at": ..., "finished_at": ...,
+      "zip_path": "...", "zip_hash": "<sha256 of the ZIP>",
+      "options": {"workers": 4, "ingest": "extract", "schedule": "phases", ...},
+      "steps": {"import": "done", "prepare": "done", "grade": "done", ...},
+      "students": {"grade": ["Ann_Lee", ...], "chart_export": [...]}
+    }
+
+Every write is temp file + os.replace, so a crash, a hung Excel or a
+sleeping laptop never leaves a half-written journal (or manifest) behind.
+
+Per-student state still lives in the course manifest (run_manifest.py),
+which decides who is reused. The journal listens to the pipeline's
+progress events and, as students finish, checkpoints the manifest and
+itself together — at most every JOURNAL_FLUSH_SECONDS, and always when a
+step ends — so after a crash only the last few seconds of work are redone.
+
+resume_pipeline() (run_pipeline.py) re-runs the journal's options: finished
+whole-class steps (ZIP import, sheet preparation) are skipped while the ZIP
+is unchanged, and only students the manifest doesn't have are graded.
+"""
+
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+from orchestrator.progress import STUDENT_DONE
+from orchestrator.run_manifest import _write_json_atomic, file_sha256, save_manifest
+from utilities.paths import ensure_dir
+
+
+JOURNAL_VERSION = 1
+JOURNAL_FLUSH_SECONDS = 2.0
+
+STATUS_RUNNING = "running"
+STATUS_COMPLETED = "completed"
+
+# Whole-class steps in pipeline order; a step is only skipped on resume when
+# every step before it was finished for the same ZIP
+RESUMABLE_STEPS = ("import", "prepare")
+
+# Student statuses that mean "this phase's work for the student is saved"
+FINISHED_STATUSES = ("graded", "reused", "prepared", "unchanged", "exported", "inserted")
+
+
+def journal_path(course_label: str) -> str:
+    return os.path.join(ensure_dir("state", course_label), "journal.json")
+
+
+def load_journal(course_label: str) -> dict | None:
+    """The course's last journal, or None (never run / unreadable / other version)."""
+    path = journal_path(course_label)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            journal = json.load(f)
+    except (OSError, ValueError):
+        print(f"⚠️ Run journal unreadable, ignoring it: {path}")
+        return None
+    if not isinstance(journal, dict) or journal.get("version") != JOURNAL_VERSION:
+        return None
+    return journal
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+
+
+class RunJournal:
+    """
+    The journal of one run. Feed it progress events (track()), mark whole
+    steps with step_done(), and call complete() when the run finished.
+    """
+
+    def __init__(self, course_label: str, zip_path: str, options: dict, manifest: dict | None = None, resume: bool = False):
+        self.manifest = manifest
+        self._last_flush = 0.0
+
+        zip_path = os.path.abspath(zip_path)
+        zip_hash = file_sha256(zip_path) if os.path.exists(zip_path) else None
+
+        previous = load_journal(course_label) if resume else None
+        carried = {}
+        if previous and previous.get("status") != STATUS_COMPLETED and previous.get("zip_hash") == zip_hash:
+            carried = previous.get("steps", {})
+
+        self.data = {
+            "version": JOURNAL_VERSION,
+            "course_label": course_label,
+            "status": STATUS_RUNNING,
+            "started_at": _now(),
+            "updated_at": None,
+            "finished_at": None,
+            "zip_path": zip_path,
+            "zip_hash": zip_hash,
+            "options": options,
+            "steps": {step: state for step, state in carried.items() if step in RESUMABLE_STEPS},
+            "students": {},
+        }
+        self.flush()
+
+    # ---- Whole-class steps ----
+    def step_done(self, step: str):
+        self.data["steps"][step] = "done"
+        self.flush()
+
+    def can_skip(self, step: str) -> bool:
+        """True when `step` and every resumable step before it finished for this ZIP."""
+        if step not in RESUMABLE_STEPS:
+            return False
+        steps = self.data["steps"]
+        return all(steps.get(s) == "done" for s in RESUMABLE_STEPS[: RESUMABLE_STEPS.index(step) + 1])
+
+    # ---- Students ----
+    def student_done(self, phase: str, student: str):
+        self.data["students"].setdefault(phase, []).append(student)
+        if time.monotonic() - self._last_flush >= JOURNAL_FLUSH_SECONDS:
+            self.flush()
+
+    def track(self, progress=None):
+        """
+        Wraps a progress callback: finished students are journalled, then
+        the event is passed on unchanged.
+        """
+        def on_event(event: dict):
+            if event.get("event") == STUDENT_DONE and event.get("status") in FINISHED_STATUSES:
+                self.student_done(event["phase"], event["student"])
+            if progress is not None:
+                progress(event)
+
+        return on_event
+
+    # ---- Persistence ----
+    def flush(self):
+        """Checkpoints the manifest and the journal (each temp file + rename)."""
+        if self.manifest is not None:
+            save_manifest(self.manifest)
+        self.data["updated_at"] = _now()
+        _write_json_atomic(journal_path(self.data["course_label"]), self.data)
+        self._last_flush = time.monotonic()
+
+    def complete(self):
+        self.data["status"] = STATUS_COMPLETED
+        self.data["finished_at"] = _now()
+        self.flush()
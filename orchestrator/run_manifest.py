@@ -0,0 +1,284 @@
+# orchestrator/run_manifest.py
+
+"""
+Per-course manifest for incremental re-grading.
+
+Stored in the workspace (never in graded_output, which instructors share):
+
+    Documents/MA1_Autograder/state/<course>/manifest.json
+    Documents/MA1_Autograder/state/<course>/results/<First_Last>.json
+
+manifest.json:
+    {
+      "course_label": "MAT-144-501",
+      "rubric_hash": "<sha256 of grader code + feedback JSON + grading template>",
+      "students": {
+        "First_Last": {
+          "submission_hash": "<sha256 of the submitted .xlsx>",
+          "phases": {"grade": "done", "chart_export": "done", "chart_insert": "done"}
+        }
+      }
+    }
+
+A student is reused on the next run when their submission hash AND the
+rubric hash are unchanged and the phase is already "done". Any change to
+either resets that student's phases so they flow through the pipeline again.
+"""
+
+import hashlib
+import json
+import os
+
+from utilities.paths import ensure_dir, ws_path
+
+
+MANIFEST_VERSION = 1
+
+PHASE_GRADE = "grade"
+PHASE_CHART_EXPORT = "chart_export"
+PHASE_CHART_INSERT = "chart_insert"
+PHASES = (PHASE_GRADE, PHASE_CHART_EXPORT, PHASE_CHART_INSERT)
+
+DONE = "done"
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Code that decides scores or feedback text — any edit invalidates old results
+RUBRIC_CODE_DIRS = ("graders",)
+RUBRIC_CODE_FILES = (
+    os.path.join("utilities", "normalizers.py"),
+    os.path.join("utilities", "formula_parser.py"),
+    os.path.join("utilities", "feedback_renderer.py"),
+    os.path.join("utilities", "feedback_catalog.py"),
+    os.path.join("writers", "write_income_analysis_scores.py"),
+    os.path.join("writers", "unit_conversions_writer_v2.py"),
+    os.path.join("writers", "write_currency_conversion_results_v2.py"),
+    os.path.join("writers", "grading_sheet_patcher.py"),
+)
+RUBRIC_SPEC_DIRS = ("rubrics",)
+FEEDBACK_TABS = ("income_analysis", "unit_conversions", "currency_conversion")
+
+
+# ------------------------------
+# HASHING
+# ------------------------------
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _rubric_files(feedback: bool = True) -> list:
+    """
+    [(label, path)] of everything that decides scores or feedback text
+    (feedback=False: everything but the feedback JSON).
+    Labels are stable names ("feedback/income_analysis.json"), so the hash
+    doesn't change when the same content moves from the packaged default to
+    the workspace copy.
+    """
+    files = []
+
+    for rel_dir in RUBRIC_CODE_DIRS:
+        for dirpath, _dirnames, filenames in os.walk(os.path.join(PROJECT_ROOT, rel_dir)):
+            for fn in filenames:
+                if fn.endswith(".py"):
+                    path = os.path.join(dirpath, fn)
+                    files.append((os.path.relpath(path, PROJECT_ROOT), path))
+
+    files.extend((rel, os.path.join(PROJECT_ROOT, rel)) for rel in RUBRIC_CODE_FILES)
+
+    # Declarative rubrics (graders/rubric_plan.py): cells, accepted forms, points
+    for rel_dir in RUBRIC_SPEC_DIRS:
+        spec_dir = os.path.join(PROJECT_ROOT, rel_dir)
+        if os.path.isdir(spec_dir):
+            for fn in os.listdir(spec_dir):
+                if fn.endswith(".json"):
+                    files.append((f"{rel_dir}/{fn}", os.path.join(spec_dir, fn)))
+
+    # Feedback JSON as the graders will load it: workspace copy first, else packaged default
+    for tab in FEEDBACK_TABS if feedback else ():
+        workspace_json = ws_path("feedback", f"{tab}.json")
+        default_json = os.path.join(PROJECT_ROOT, "feedback", f"{tab}.json")
+        files.append((f"feedback/{tab}.json", workspace_json if os.path.exists(workspace_json) else default_json))
+        # Codes missing from an older workspace copy fall back to the packaged text
+        files.append((f"feedback/defaults/{tab}.json", default_json))
+
+    files.append(("templates/Grading_Sheet_Template.xlsx", ws_path("templates", "Grading_Sheet_Template.xlsx")))
+
+    return sorted(
+        (label.replace("\\", "/"), path) for label, path in files if os.path.isfile(path)
+    )
+
+
+def rubric_fingerprint(feedback: bool = True) -> str:
+    """
+    Single hash over grader code, feedback JSON and the grading template.
+    feedback=False leaves the feedback JSON out: equal hashes then mean only
+    the wording changed, which re-rendering (orchestrator/rerender_feedback.py)
+    brings into the sheets without regrading.
+    """
+    h = hashlib.sha256()
+    for label, path in _rubric_files(feedback):
+        h.update(label.encode("utf-8"))
+        h.update(_content_hash(path).encode("ascii"))
+    return h.hexdigest()
+
+
+def _content_hash(path: str) -> str:
+    # JSON is hashed by content: load_feedback re-serializes the packaged
+    # defaults when it copies them into the workspace
+    if path.endswith(".json"):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                canonical = json.dumps(json.load(f), sort_keys=True, ensure_ascii=False)
+            return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+        except (OSError, ValueError):
+            pass
+    return file_sha256(path)
+
+
+# ------------------------------
+# LOAD / SAVE
+# ------------------------------
+def manifest_path(course_label: str) -> str:
+    return os.path.join(ensure_dir("state", course_label), "manifest.json")
+
+
+def _write_json_atomic(path: str, data) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+    os.replace(tmp_path, path)
+
+
+def load_manifest(course_label: str, rubric_hash: str | None = None, grading_hash: str | None = None) -> dict:
+    """
+    Loads (or starts) the course manifest.
+
+    If rubric_hash differs from the stored one, every student's phases are
+    reset so the whole class is regraded under the new rubric.
+    grading_hash (rubric_fingerprint(feedback=False)) is stored alongside.
+    """
+    path = manifest_path(course_label)
+    manifest = None
+
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            print(f"⚠️ Manifest unreadable, regrading everyone: {path}")
+            manifest = None
+
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        manifest = {"version": MANIFEST_VERSION, "course_label": course_label, "rubric_hash": None, "students": {}}
+
+    manifest["course_label"] = course_label
+
+    if rubric_hash is not None and manifest.get("rubric_hash") != rubric_hash:
+        if manifest["students"]:
+            print("♻️ Rubric or feedback changed since the last run — regrading all students.")
+        for entry in manifest["students"].values():
+            entry["phases"] = {}
+        manifest["rubric_hash"] = rubric_hash
+
+    if grading_hash is not None:
+        manifest["grading_hash"] = grading_hash
+
+    return manifest
+
+
+def save_manifest(manifest: dict) -> str:
+    path = manifest_path(manifest["course_label"])
+    _write_json_atomic(path, manifest)
+    return path
+
+
+# ------------------------------
+# PER-STUDENT STATE
+# ------------------------------
+def _entry(manifest: dict, student: str) -> dict:
+    return manifest["students"].setdefault(student, {"submission_hash": None, "phases": {}})
+
+
+def refresh_student(manifest: dict, student: str, submission_hash: str) -> bool:
+    """
+    Records the student's current submission hash.
+    Returns True if nothing changed (same hash as last run), else resets their phases.
+    """
+    entry = _entry(manifest, student)
+    if entry.get("submission_hash") == submission_hash:
+        return True
+
+    entry["submission_hash"] = submission_hash
+    entry["phases"] = {}
+    return False
+
+
+def phase_done(manifest: dict, student: str, phase: str, submission_hash: str | None = None) -> bool:
+    entry = manifest["students"].get(student)
+    if not entry:
+        return False
+    if submission_hash is not None and entry.get("submission_hash") != submission_hash:
+        return False
+    return entry.get("phases", {}).get(phase) == DONE
+
+
+def mark_phase(manifest: dict, student: str, phase: str, status: str = DONE) -> None:
+    entry = _entry(manifest, student)
+    entry.setdefault("phases", {})[phase] = status
+
+    # A regraded sheet is a fresh template copy: later phases must run again
+    if phase == PHASE_GRADE:
+        for later in (PHASE_CHART_EXPORT, PHASE_CHART_INSERT):
+            entry["phases"].pop(later, None)
+
+
+def students_pending(manifest: dict, phase: str, requires: str | None = PHASE_GRADE) -> list:
+    """Students whose `phase` is not done (and whose `requires` phase is), sorted."""
+    pending = []
+    for student, entry in manifest["students"].items():
+        phases = entry.get("phases", {})
+        if phases.get(phase) == DONE:
+            continue
+        if requires and phases.get(requires) != DONE:
+            continue
+        pending.append(student)
+    return sorted(pending)
+
+
+# ------------------------------
+# STORED RESULTS (reused for unchanged students)
+# ------------------------------
+def _results_path(course_label: str, student: str) -> str:
+    return os.path.join(ensure_dir("state", course_label, "results"), f"{student}.json")
+
+
+def _restore_feedback_tuples(value):
+    """JSON turns (code, params) tuples into lists; turn them back."""
+    if isinstance(value, list):
+        if len(value) == 2 and isinstance(value[0], str) and isinstance(value[1], dict):
+            return (value[0], value[1])
+        return [_restore_feedback_tuples(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _restore_feedback_tuples(v) for k, v in value.items()}
+    return value
+
+
+def save_student_results(course_label: str, student: str, results: dict) -> str:
+    path = _results_path(course_label, student)
+    _write_json_atomic(path, results)
+    return path
+
+
+def load_student_results(course_label: str, student: str) -> dict | None:
+    path = _results_path(course_label, student)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return _restore_feedback_tuples(json.load(f))
+    except (OSError, ValueError):
+        return None
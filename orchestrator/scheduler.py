@@ -0,0 +1,557 @@
+# orchestrator/scheduler.py
+
+import os
+import shutil
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from orchestrator.run_manifest import (
+    file_sha256,
+    phase_done,
+    mark_phase,
+    refresh_student,
+    save_manifest,
+    save_student_results,
+    PHASE_GRADE,
+    PHASE_CHART_EXPORT,
+    PHASE_CHART_INSERT,
+)
+from orchestrator.phase1_grade_all import (
+    DEFAULT_SUBMISSION_READER,
+    DEFAULT_GRADING_WRITER,
+    default_template_path,
+    resolve_worker_count,
+    _grade_student_workbook,
+    _print_student_outcome,
+    _print_feedback_problems,
+    _print_rates_snapshot,
+    _reused_outcome,
+    results_label,
+    _check_embed_charts,
+)
+from orchestrator.phase2_export_charts import CHART_BACKENDS, _export_one_headless
+from orchestrator.progress import PhaseProgress
+from orchestrator.cancellation import PipelineCancelled, holding_back
+from graders.currency_conversion.rates_snapshot import get_rates_snapshot
+from graders.row_memo import describe_memo_stats, merge_memo_stats, summarize_memo_stats
+from utilities.timing import merge_samples, record_span
+from writers.zip_submission_index import index_zip_submissions, zip_member_sha256
+
+# Resource classes a stage can run on, each with its own concurrency limit:
+#   "cpu"   → grading / headless chart rendering (process pool, `workers` wide)
+#   "excel" → Excel COM automation (ONE slot: a single thread owns Excel)
+#   "io"    → hashing + copying submissions (small thread pool)
+RESOURCE_CPU = "cpu"
+RESOURCE_EXCEL = "excel"
+RESOURCE_IO = "io"
+
+DEFAULT_IO_WORKERS = 4
+
+# How often a paused / cancellable scheduler looks at its token while waiting
+TOKEN_POLL_SECONDS = 0.2
+
+
+class Step:
+    """One stage of a lane: fn(*args) run on a resource's executor."""
+
+    __slots__ = ("stage", "resource", "fn", "args")
+
+    def __init__(self, stage: str, resource: str, fn, args=()):
+        self.stage = stage
+        self.resource = resource
+        self.fn = fn
+        self.args = tuple(args)
+
+
+def _timed_call(fn, args):
+    """
+    Runs on the executor; the elapsed time is the stage's busy time (no queueing).
+    Start time, process and thread come back too, for the lane's trace span.
+    """
+    started_at = time.time()
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started, started_at, os.getpid(), threading.current_thread().name
+
+
+def _make_executor(resource: str, limit: int):
+    # One CPU slot stays in-process (a thread), like phase 1 with workers=1
+    if resource == RESOURCE_CPU and limit > 1:
+        return ProcessPoolExecutor(max_workers=limit)
+    return ThreadPoolExecutor(max_workers=max(1, limit), thread_name_prefix=f"ma1-{resource}")
+
+
+def run_lanes(lanes: dict, limits: dict, cancel_token=None) -> tuple:
+    """
+    Runs independent lanes (one per student) through shared, size-limited executors.
+
+    A lane is a generator that yields Step objects. The step's result (or its
+    exception) is sent back into the generator, which then yields its next
+    step or returns. Lane code therefore reads top to bottom, while the
+    scheduler keeps every resource busy: as soon as one lane's step finishes,
+    that lane's next step is queued on ITS resource, whatever the other lanes
+    are doing. A slow workbook only delays its own lane.
+
+    Lane generators always run in the calling thread, so they can safely
+    update shared state (manifest, results) without locks.
+
+    Steps queue here per resource and are handed to an executor only when
+    one of its `limits` slots is free. So with a cancel_token
+    (orchestrator/cancellation.py) a paused run starts nothing new until
+    resume, and a cancelled run closes every lane still waiting for a slot
+    (its result is PipelineCancelled). Running steps always finish and are
+    sent back to their lane.
+
+    Args:
+        lanes (dict): key → lane generator
+        limits (dict): resource name → max concurrent steps on that resource
+        cancel_token (CancelToken): optional pause / cancel control
+
+    Returns:
+        (results, stages)
+          results → key → the lane's return value, or the exception that ended it
+          stages  → stage name → {"count", "busy_seconds"}
+    """
+    executors = {}
+    running = {}
+    ready = {}      # resource → deque of (key, lane, step) waiting for a free slot
+    busy_slots = {}  # resource → steps currently submitted to its executor
+    results = {}
+    stages = {}
+
+    def stop_lane(key, lane, step):
+        lane.close()
+        results[key] = PipelineCancelled(f"cancelled before {step.stage}")
+
+    def advance(key, lane, value=None, error=None):
+        try:
+            step = lane.throw(error) if error is not None else lane.send(value)
+        except StopIteration as stop:
+            results[key] = stop.value
+            return
+        except Exception as e:
+            results[key] = e
+            return
+
+        if step.resource not in limits:
+            raise KeyError(
+                f"No concurrency limit for resource {step.resource!r}\n"
+                f"(stage {step.stage!r}; known resources: {sorted(limits)})"
+            )
+        ready.setdefault(step.resource, deque()).append((key, lane, step))
+
+    def pump():
+        # Steps wait here, not in the executor's queue, so pause / cancel
+        # reach everything that hasn't started yet
+        for resource, queue in ready.items():
+            while queue and busy_slots.get(resource, 0) < limits[resource] and not holding_back(cancel_token):
+                key, lane, step = queue.popleft()
+                if resource not in executors:
+                    executors[resource] = _make_executor(resource, limits[resource])
+                future = executors[resource].submit(_timed_call, step.fn, step.args)
+                running[future] = (key, lane, step)
+                busy_slots[resource] = busy_slots.get(resource, 0) + 1
+
+    def waiting() -> bool:
+        return any(ready.values())
+
+    try:
+        for key, lane in lanes.items():
+            advance(key, lane)
+
+        while running or waiting():
+            if cancel_token is not None and cancel_token.cancelled:
+                for queue in ready.values():
+                    while queue:
+                        stop_lane(*queue.popleft())
+            pump()
+
+            if not running:
+                if waiting():
+                    cancel_token.wait_if_paused(TOKEN_POLL_SECONDS)
+                continue
+
+            timeout = TOKEN_POLL_SECONDS if cancel_token is not None else None
+            done, _pending = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                key, lane, step = running.pop(future)
+                busy_slots[step.resource] -= 1
+                try:
+                    value, busy, started_at, pid, thread = future.result()
+                except Exception as e:
+                    advance(key, lane, error=e)
+                    continue
+
+                # Lanes are students here; the span lands on the worker's own track
+                record_span(f"lane.{step.stage}", started_at, busy, pid, thread, student=key)
+
+                stat = stages.setdefault(step.stage, {"count": 0, "busy_seconds": 0.0})
+                stat["count"] += 1
+                stat["busy_seconds"] += busy
+                advance(key, lane, value)
+    finally:
+        for executor in executors.values():
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    for stat in stages.values():
+        stat["busy_seconds"] = round(stat["busy_seconds"], 3)
+
+    return results, stages
+
+
+# -----------------------------
+# MA1 student lanes
+# -----------------------------
+def _copy_submission(original: str, submission_dest: str) -> str:
+    """Ingest (extract mode): copy the submission into student_submissions/ and hash it."""
+    shutil.copyfile(original, submission_dest)
+    return file_sha256(submission_dest)
+
+
+def _com_export_chart(submission_file: str, temp_dir: str) -> str | None:
+    # Imported here so the scheduler loads where pywin32 isn't installed
+    from writers.export_chart_to_image import export_chart_to_image
+
+    return export_chart_to_image(submission_file, image_output_dir=temp_dir)
+
+
+def _com_insert_chart(temp_dir: str, graded_output_path: str, student_name: str) -> bool:
+    from writers.insert_saved_images_into_grading_sheets import insert_images_into_grading_sheets
+
+    return student_name in insert_images_into_grading_sheets(temp_dir, graded_output_path, students=[student_name])
+
+
+def _failed_outcome(student_name: str, error: str) -> dict:
+    return {
+        "student": student_name,
+        "status": "failed",
+        "error": error,
+        "warnings": [],
+        "results": {},
+        "score": None,
+        "chart_embedded": False,
+    }
+
+
+def _reporting_lane(student_name: str, lane, tracker: PhaseProgress):
+    """Wraps a lane so its end (any return or ingest error) is reported as it happens."""
+    try:
+        outcome = yield from lane
+    except Exception as e:
+        tracker.student_done(student_name, "failed", error=str(e))
+        raise
+    tracker.student_done(student_name, outcome["status"], outcome.get("score"), outcome["error"])
+    return outcome
+
+
+def _student_lane(entry: dict, run: dict):
+    """
+    One student's DAG: ingest → [chart export] → grade → [chart export → chart insert].
+    Returns the student's outcome dict (the master row comes from their grading sheet).
+    """
+    student_name = entry["student"]
+    manifest = run["manifest"]
+    grading_file = os.path.join(run["graded_output_path"], f"{student_name}_MA1_Grade.xlsx")
+
+    # ---- Ingest ----
+    if "member" in entry:
+        submission_file = (run["zip_path"], entry["member"])
+        submission_hash = yield Step("ingest", RESOURCE_IO, zip_member_sha256, submission_file)
+    else:
+        submission_file = os.path.join(run["submissions_path"], f"{student_name}_MA1.xlsx")
+        submission_hash = yield Step("ingest", RESOURCE_IO, _copy_submission, (entry["path"], submission_file))
+
+    # ---- Incremental: unchanged + already graded → reuse ----
+    outcome = None
+    if manifest is not None:
+        unchanged = refresh_student(manifest, student_name, submission_hash)
+        if unchanged and os.path.exists(grading_file) and phase_done(manifest, student_name, PHASE_GRADE):
+            outcome = _reused_outcome(manifest, student_name)
+        if outcome is None:
+            mark_phase(manifest, student_name, PHASE_GRADE, status="pending")
+        else:
+            print(f"♻️ Unchanged: {student_name}")
+
+    if outcome is None:
+        # ---- Excel chart export BEFORE grading, so the grade write embeds it ----
+        chart = run["embed_charts"]
+        if chart == "com":
+            try:
+                chart = yield Step("chart_export", RESOURCE_EXCEL, _com_export_chart, (submission_file, run["temp_dir"]))
+            except Exception as e:
+                print(f"⚠️ Chart export failed for {student_name}: {e}")
+                chart = None
+
+        # ---- Grade (+ embedded chart) ----
+        try:
+            outcome = yield Step("grade", RESOURCE_CPU, _grade_student_workbook, (
+                student_name, submission_file, grading_file, run["rates_snapshot"], run["reader"],
+                run["template_path"], run["writer"], chart,
+            ))
+        except Exception as e:
+            # Worker process died (crash, out of memory, ...)
+            outcome = _failed_outcome(student_name, f"worker process failed: {e}")
+
+        merge_samples(outcome.pop("timings", None))
+        merge_memo_stats(run["memo"], outcome.pop("memo", None))
+        _print_student_outcome(outcome)
+
+        # A failed grade ends the lane: no chart work for a sheet that wasn't written
+        if outcome["status"] != "graded":
+            return outcome
+
+        save_student_results(run["course"], student_name, outcome["results"])
+        if manifest is not None:
+            mark_phase(manifest, student_name, PHASE_GRADE)
+            if outcome.get("chart_embedded"):
+                mark_phase(manifest, student_name, PHASE_CHART_EXPORT)
+                mark_phase(manifest, student_name, PHASE_CHART_INSERT)
+
+    # Graded (or reused): still reported if a cancel closes the lane before its chart steps
+    run["finished"][student_name] = outcome
+
+    # ---- Legacy separate Excel insertion (chart_insert="excel") ----
+    insert_backend = run["insert_charts"]
+    if not insert_backend or (manifest is not None and phase_done(manifest, student_name, PHASE_CHART_INSERT)):
+        return outcome
+
+    try:
+        if insert_backend == "headless":
+            image_path, output, samples = yield Step(
+                "chart_export", RESOURCE_CPU, _export_one_headless, (submission_file, run["temp_dir"])
+            )
+            merge_samples(samples)
+            if output:
+                print(output, end="")
+        else:
+            image_path = yield Step("chart_export", RESOURCE_EXCEL, _com_export_chart, (submission_file, run["temp_dir"]))
+    except Exception as e:
+        print(f"⚠️ Chart export failed for {student_name}: {e}")
+        return outcome
+
+    if not image_path:
+        return outcome
+    if manifest is not None:
+        mark_phase(manifest, student_name, PHASE_CHART_EXPORT)
+
+    try:
+        inserted = yield Step(
+            "chart_insert", RESOURCE_EXCEL, _com_insert_chart,
+            (run["temp_dir"], run["graded_output_path"], student_name),
+        )
+    except Exception as e:
+        print(f"⚠️ Chart insert failed for {student_name}: {e}")
+        return outcome
+
+    if inserted:
+        outcome["chart_embedded"] = True
+        if manifest is not None:
+            mark_phase(manifest, student_name, PHASE_CHART_INSERT)
+
+    return outcome
+
+
+def _com_available() -> bool:
+    try:
+        import win32com.client  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def run_student_dag(
+    graded_output_path: str,
+    submissions_path: str | None = None,
+    student_groups_path: str | None = None,
+    zip_path: str | None = None,
+    workers: int = 1,
+    rates_snapshot: dict | None = None,
+    reader: str = DEFAULT_SUBMISSION_READER,
+    manifest: dict | None = None,
+    template_path: str | None = None,
+    writer: str = DEFAULT_GRADING_WRITER,
+    chart_backend: str = "com",
+    chart_insert: str = "embed",
+    temp_dir: str | None = None,
+    progress=None,
+    cancel_token=None,
+) -> dict:
+    """
+    Grades the class as independent per-student lanes instead of whole-class phases.
+
+    Each student flows through ingest → grade → chart export → chart insert on
+    their own, limited only by the resource each stage needs:
+        cpu   → `workers` grading processes (0 = one per CPU)
+        excel → one Excel COM slot (export + insert never overlap)
+        io    → a few threads hashing / copying submissions
+    So one slow workbook no longer holds up everyone else, and a student
+    whose grading failed never reaches the chart stages. The master row is
+    the lane's outcome; the caller rebuilds INSTRUCTOR_MASTER.xlsx at the end.
+
+    Source of submissions (one of):
+        student_groups_path → extracted folders (copied into submissions_path)
+        zip_path            → LMS ZIP, graded straight from memory
+
+    Args:
+        chart_backend (str): "com" or "headless" (see phase2_export_charts.py)
+        chart_insert (str): "embed" (chart written with the scores), "excel"
+                       (separate Excel insertion stage) or "none"
+        temp_dir (str): Folder for exported chart PNGs
+        progress (callable): Optional event callback (orchestrator/progress.py):
+                       a "grade" phase with one event per finished lane,
+                       in completion order
+        cancel_token (CancelToken): Optional (orchestrator/cancellation.py):
+                       pause holds back every next step; cancel stops new
+                       steps, lets running ones finish (summary["cancelled"])
+        workers, rates_snapshot, reader, manifest, template_path, writer:
+                       as phase1_grade_all_students / phase1_grade_zip_submissions
+
+    Returns:
+        dict run summary (same shape as phase1_grade_all_students) plus:
+          stages → stage name → {"count", "busy_seconds"}
+    """
+    # Imported here: create_grading_sheet imports the orchestrator package
+    from writers.create_grading_sheet import find_student_submissions
+
+    if chart_backend not in CHART_BACKENDS:
+        raise ValueError(f"Unknown chart backend: {chart_backend!r} (expected one of {CHART_BACKENDS})")
+    if (student_groups_path is None) == (zip_path is None):
+        raise ValueError("Pass exactly one of student_groups_path (extracted) or zip_path (streaming).")
+    if student_groups_path is not None and not submissions_path:
+        raise ValueError("submissions_path is required when grading extracted student folders.")
+
+    print("\n📘 Grading all students (per-student lanes)...\n")
+
+    started = time.perf_counter()
+
+    template_path = template_path or default_template_path()
+    if not os.path.exists(template_path):
+        raise FileNotFoundError(
+            f"Grading sheet template not found:\n{template_path}\n"
+            f"Run ensure_workspace_assets() first."
+        )
+
+    if rates_snapshot is None:
+        rates_snapshot = get_rates_snapshot()
+    _print_rates_snapshot(rates_snapshot)
+    _print_feedback_problems()
+
+    # ---- Which chart stages the lanes get ----
+    embed_charts = None
+    insert_charts = None
+    if chart_insert == "embed":
+        embed_charts = _check_embed_charts("headless" if chart_backend == "headless" else "com")
+    elif chart_insert == "excel":
+        insert_charts = chart_backend
+
+    if zip_path is not None and "com" in (embed_charts, insert_charts):
+        print("⚠️ Streaming ingest: Excel chart export needs files on disk — grading without charts.\n")
+        embed_charts = None if embed_charts == "com" else embed_charts
+        insert_charts = None
+    if insert_charts == "headless":
+        insert_charts = _check_embed_charts(insert_charts)
+    # Every insertion (and any Excel export) goes through Excel
+    if embed_charts == "com" or insert_charts:
+        if not _com_available():
+            print("⚠️ Excel automation (pywin32) is not available — grading without charts.\n")
+            embed_charts = None if embed_charts == "com" else embed_charts
+            insert_charts = None
+
+    # ---- Students ----
+    if zip_path is not None:
+        zip_path = os.path.abspath(zip_path)
+        entries = index_zip_submissions(zip_path)
+    else:
+        os.makedirs(submissions_path, exist_ok=True)
+        entries = find_student_submissions(student_groups_path)
+
+    os.makedirs(graded_output_path, exist_ok=True)
+    if temp_dir:
+        os.makedirs(temp_dir, exist_ok=True)
+
+    if not entries:
+        print(f"📭 No student submissions found inside: {zip_path or student_groups_path}")
+
+    run = {
+        "manifest": manifest,
+        "course": results_label(manifest, graded_output_path),
+        "zip_path": zip_path,
+        "submissions_path": submissions_path,
+        "graded_output_path": graded_output_path,
+        "rates_snapshot": rates_snapshot,
+        "reader": reader,
+        "template_path": template_path,
+        "writer": writer,
+        "embed_charts": embed_charts,
+        "insert_charts": insert_charts,
+        "temp_dir": temp_dir,
+        "finished": {},
+        "memo": {},
+    }
+
+    worker_count = resolve_worker_count(workers, len(entries))
+    limits = {
+        RESOURCE_CPU: worker_count,
+        RESOURCE_EXCEL: 1,
+        RESOURCE_IO: min(DEFAULT_IO_WORKERS, max(1, len(entries))),
+    }
+
+    tracker = PhaseProgress(progress, "grade", total=len(entries))
+    lanes = {
+        entry["student"]: _reporting_lane(entry["student"], _student_lane(entry, run), tracker)
+        for entry in entries
+    }
+    results, stages = run_lanes(lanes, limits, cancel_token)
+    tracker.end()
+
+    outcomes = []
+    cancelled = 0
+    for student_name in sorted(results):
+        outcome = results[student_name]
+        if isinstance(outcome, PipelineCancelled):
+            outcome = run["finished"].get(student_name)
+            if outcome is None:
+                cancelled += 1
+                continue
+        if isinstance(outcome, Exception):
+            # Ingest failed (unreadable file, bad ZIP member, ...)
+            outcome = _failed_outcome(student_name, str(outcome))
+            _print_student_outcome(outcome)
+        outcomes.append(outcome)
+
+    if manifest is not None:
+        save_manifest(manifest)
+
+    graded = sum(1 for o in outcomes if o["status"] == "graded")
+    reused = sum(1 for o in outcomes if o["status"] == "reused")
+    failed = sum(1 for o in outcomes if o["status"] == "failed")
+    charts = sum(1 for o in outcomes if o.get("chart_embedded"))
+
+    summary = {
+        "total": len(outcomes),
+        "graded": graded,
+        "reused": reused,
+        "failed": failed,
+        "cancelled": cancelled,
+        "charts_embedded": charts,
+        "workers": worker_count,
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+        "rates_snapshot_at": rates_snapshot.get("fetched_at"),
+        "memo": summarize_memo_stats(run["memo"]),
+        "students": outcomes,
+        "stages": stages,
+    }
+
+    busy = ", ".join(f"{name} {stat['busy_seconds']}s" for name, stat in sorted(stages.items()))
+    print(
+        f"\n📘 Grading complete — {graded}/{summary['total']} graded, {reused} reused, {failed} failed "
+        f"({summary['elapsed_seconds']}s, {worker_count} worker(s); busy: {busy or 'none'})"
+    )
+    if run["memo"]:
+        print(f"♻️ Row memo: {describe_memo_stats(summary['memo'])}")
+    if cancelled:
+        print(f"⏹️ Cancelled — {cancelled} student(s) not graded (they will be graded on the next run).")
+
+    return summary
@@ -1,29 +1,153 @@
 # run_pipeline.py
 
+import os
+import sqlite3
+
 from utilities.paths import ensure_dir
+from utilities.timing import (
+    timer,
+    enable_timing,
+    disable_timing,
+    reset_timing,
+    timing_enabled,
+    write_timing_report,
+    write_chrome_trace,
+)
 from writers.ensure_workspace_assets import ensure_workspace_assets
 
-from writers.generate_course_folders import generate_course_folders
+from writers.generate_course_folders import generate_course_folders, folder_safe_label
 from writers.create_grading_sheet import create_grading_sheets_from_folder
 from writers.import_zip_to_student_groups import import_zip_to_student_groups
 
 from orchestrator import (
     phase1_grade_all_students,
+    phase1_grade_zip_submissions,
     phase2_export_all_charts,
     phase3_insert_all_charts,
-    phase4_cleanup_temp
+    phase4_cleanup_temp,
+    run_student_dag,
+)
+from orchestrator.phase1_grade_all import GRADING_ENGINES, default_template_path
+from orchestrator.results_store import grade_summary_results, store_grade_summary
+
+from writers.build_instructor_master_workbook import build_instructor_master_workbook, MASTER_MODES
+from graders.currency_conversion.rates_snapshot import get_rates_snapshot, save_rates_snapshot
+from orchestrator.progress import emit, PhaseProgress, RUN_START, RUN_END, CANCELLED
+from orchestrator.cancellation import PipelineCancelled, raise_if_cancelled
+from orchestrator.run_journal import RunJournal, load_journal, STATUS_COMPLETED
+from orchestrator.run_manifest import (
+    load_manifest,
+    save_manifest,
+    rubric_fingerprint,
+    mark_phase,
+    students_pending,
+    PHASE_GRADE,
+    PHASE_CHART_EXPORT,
+    PHASE_CHART_INSERT,
 )
 
-from writers.build_instructor_master_workbook import build_instructor_master_workbook
+
+def _checkpoint(cancel_token, progress, where: str, journal: RunJournal | None = None):
+    """Between steps: honour a pause, stop here (PipelineCancelled) if cancelled."""
+    try:
+        raise_if_cancelled(cancel_token, where)
+    except PipelineCancelled:
+        if journal is not None:
+            journal.flush()
+        emit(progress, CANCELLED, after=where)
+        print(f"\n⏹️ Run cancelled after {where} — finished students are saved.")
+        raise
 
 
-def run_pipeline(zip_path: str, course_label: str) -> str:
+def run_pipeline(
+    zip_path: str,
+    course_label: str,
+    workers: int = 1,
+    rates_snapshot_path: str | None = None,
+    incremental: bool = True,
+    ingest: str = "extract",
+    chart_backend: str = "com",
+    chart_insert: str = "embed",
+    schedule: str = "phases",
+    engine: str = "sheet",
+    master: str = "links",
+    timing: bool | None = None,
+    trace: bool = False,
+    progress=None,
+    cancel_token=None,
+    resume: bool = False,
+) -> str:
     """
     Full MA1 grading pipeline designed for GUI use.
 
     Args:
         zip_path (str): Path to uploaded ZIP of student submissions
         course_label (str): Course label (e.g., MAT-144-501)
+        workers (int): Grading processes for phase 1 (1 = sequential, 0 = one per CPU)
+        rates_snapshot_path (str): Optional saved FX snapshot JSON to grade
+            against offline (no network). Otherwise rates are fetched once
+            per run (or reused from the workspace cache).
+        incremental (bool): Re-grade only students whose submission changed
+            since the last run of this course (or everyone, if the grader
+            code / feedback / template changed). False regrades everyone.
+        ingest (str): "extract" (default) unpacks the ZIP into the workspace
+            and copies each submission before grading. "stream" grades the
+            submissions straight out of the ZIP in memory; only the graded
+            sheets are written. Excel chart export needs files on disk, so
+            stream mode only gets charts with the headless backend.
+        chart_backend (str): "com" exports charts through Excel (Windows);
+            "headless" renders them from the chart XML with matplotlib, in
+            parallel with the same worker count as grading.
+        chart_insert (str): "embed" (default) anchors the chart at J4 in the
+            same write as the scores. "excel" keeps the old separate Excel
+            insertion pass (phase 3). "none" skips charts.
+        schedule (str): "phases" (default) runs each step over the whole
+            class before the next one starts. "lanes" runs every student
+            through ingest → grade → charts on their own (see
+            orchestrator/scheduler.py), so one slow workbook only delays
+            that student and failed grades never reach the chart steps.
+        engine (str): "sheet" (default) grades each workbook on its own.
+            "batch" extracts the whole class into one column table and
+            evaluates each rubric check once per distinct answer
+            (graders/batch_engine.py) — faster for large classes, and the
+            grade summary carries whole-class statistics. Phases schedule
+            only (lanes grade each student on their own by design).
+        master (str): How INSTRUCTOR_MASTER.xlsx gets the totals.
+            "links" (default) writes external-link formulas Excel resolves
+            on open (one per student per total). "values" writes the
+            numbers from this run's grading results — nothing to resolve,
+            and the master still works when the folder moves.
+            "cached_links" keeps the link formulas but saves them with the
+            numbers as cached values. Both stream the sheet (write-only).
+        timing (bool): Record how long each step / student / workbook load
+            and save / tab grader / row checker / feedback render takes and
+            write timing_report_<stamp>.json + .csv into the course's
+            graded_output folder (see utilities/timing.py). None (default)
+            follows the MA1_TIMING environment variable.
+        trace (bool): Also write trace_<stamp>.json (Chrome Trace Event
+            Format) next to the grading sheets: one track per process /
+            thread, spans tagged with the student. Open it in
+            chrome://tracing or ui.perfetto.dev to spot stragglers and
+            the serialized Excel steps.
+        progress (callable): Optional callback receiving one event dict per
+            run / phase start and end, finished student (with status and
+            auto-graded score) and student error — see
+            orchestrator/progress.py. Always called from this thread, also
+            when grading runs on worker processes.
+        cancel_token (CancelToken): Optional pause / cancel control
+            (orchestrator/cancellation.py), e.g. from the GUI's buttons.
+            Cancel stops new students from starting, lets the ones in
+            flight finish their save, records them in the course manifest
+            and raises PipelineCancelled. Running the course again
+            (incremental) picks up the students that are left.
+        resume (bool): Skip the whole-class steps (ZIP import, sheet
+            preparation) the course's run journal says an unfinished run
+            of this same ZIP already completed. Use resume_pipeline() to
+            re-run the last run with its own options.
+
+    Every run keeps a journal (orchestrator/run_journal.py) in the
+    workspace state/<course> folder: finished steps and students are
+    checkpointed there atomically as the run goes.
 
     Returns:
         str: Path to graded_output/<course_label> inside workspace
@@ -33,52 +157,354 @@ def run_pipeline(zip_path: str, course_label: str) -> str:
     if not course_label:
         raise ValueError("Course label cannot be blank.")
 
+    if ingest not in ("extract", "stream"):
+        raise ValueError(f"Unknown ingest mode: {ingest!r} (expected 'extract' or 'stream')")
+    if chart_insert not in ("embed", "excel", "none"):
+        raise ValueError(f"Unknown chart insert mode: {chart_insert!r} (expected 'embed', 'excel' or 'none')")
+    if schedule not in ("phases", "lanes"):
+        raise ValueError(f"Unknown schedule: {schedule!r} (expected 'phases' or 'lanes')")
+    if engine not in GRADING_ENGINES:
+        raise ValueError(f"Unknown grading engine: {engine!r} (expected one of {GRADING_ENGINES})")
+    if engine == "batch" and schedule == "lanes":
+        raise ValueError("The batch engine grades the whole class at once — use schedule='phases'.")
+    if master not in MASTER_MODES:
+        raise ValueError(f"Unknown master mode: {master!r} (expected one of {MASTER_MODES})")
+
+    # Set explicitly every run, so a failed timed run can't leave it switched on
+    timing = timing_enabled() if timing is None else timing
+    if timing or trace:
+        enable_timing()
+        reset_timing()
+    else:
+        disable_timing()
+
+    emit(progress, RUN_START, course_label=course_label, schedule=schedule, ingest=ingest, workers=workers)
+
     # -----------------------------
     # STEP 0 — Ensure workspace assets exist
     # (copies templates into Documents/MA1_Autograder/templates if missing)
     # -----------------------------
-    ensure_workspace_assets()
+    with timer("pipeline.workspace_assets"):
+        ensure_workspace_assets()
 
     # -----------------------------
     # STEP 1 — Create workspace course folders
     # -----------------------------
-    folder_safe, graded_path, submissions_path = generate_course_folders(course_label)
+    with timer("pipeline.course_folders"):
+        folder_safe, graded_path, submissions_path = generate_course_folders(course_label)
 
-    # -----------------------------
-    # STEP 2 — Import ZIP into workspace student_groups/<course>
-    # -----------------------------
-    import_zip_to_student_groups(zip_path, folder_safe)
+    # Manifest of what previous runs already finished (None = full regrade)
+    with timer("pipeline.manifest"):
+        manifest = (
+            load_manifest(folder_safe, rubric_fingerprint(), rubric_fingerprint(feedback=False))
+            if incremental else None
+        )
 
-    # -----------------------------
-    # STEP 3 — Create grading sheets + copy submissions
-    # -----------------------------
-    create_grading_sheets_from_folder(folder_safe)
+    # Journal of this run: steps + students checkpointed as they finish
+    options = {
+        "course_label": course_label,
+        "workers": workers,
+        "rates_snapshot_path": rates_snapshot_path,
+        "ingest": ingest,
+        "chart_backend": chart_backend,
+        "chart_insert": chart_insert,
+        "schedule": schedule,
+        "engine": engine,
+        "master": master,
+    }
+    journal = RunJournal(
+        folder_safe,
+        zip_path,
+        options,
+        manifest=manifest,
+        resume=resume,
+    )
+    progress = journal.track(progress)
 
-    # -----------------------------
-    # STEP 4 — Grade all students (formulas)
-    # -----------------------------
-    phase1_grade_all_students(submissions_path, graded_path)
+    # One FX snapshot for the whole run; a copy is kept next to the
+    # grading sheets so the run can be reproduced offline later.
+    with timer("pipeline.fx_snapshot"):
+        rates_snapshot = get_rates_snapshot(snapshot_path=rates_snapshot_path)
+    if not rates_snapshot.get("error"):
+        save_rates_snapshot(rates_snapshot, os.path.join(graded_path, "fx_rates_snapshot.json"))
+
+    # Charts go to a per-course folder, so two courses never share PNGs
+    temp_charts_dir = ensure_dir("temp_charts", folder_safe)
+
+    # What phase 1 embeds at J4: headless render, Excel-exported PNGs, or nothing
+    if chart_insert != "embed":
+        embed_charts = None
+    elif chart_backend == "headless":
+        embed_charts = "headless"
+    else:
+        embed_charts = temp_charts_dir
+
+    if schedule == "lanes":
+        # -----------------------------
+        # STEPS 2–6 — Per-student lanes (ingest → grade → charts)
+        # -----------------------------
+        lane_source = {"zip_path": zip_path}
+        if ingest == "extract":
+            if journal.can_skip("import"):
+                print("\n♻️ Resuming: ZIP already imported — skipping import.")
+                lane_source = {"student_groups_path": ensure_dir("student_groups", folder_safe)}
+            else:
+                step = PhaseProgress(progress, "import")
+                with timer("pipeline.import_zip"):
+                    lane_source = {"student_groups_path": import_zip_to_student_groups(zip_path, folder_safe)}
+                step.end()
+                journal.step_done("import")
+            _checkpoint(cancel_token, progress, "import", journal)
+
+        with timer("pipeline.lanes"):
+            grade_summary = run_student_dag(
+                graded_path,
+                submissions_path=submissions_path,
+                workers=workers,
+                rates_snapshot=rates_snapshot,
+                manifest=manifest,
+                chart_backend=chart_backend,
+                chart_insert=chart_insert,
+                temp_dir=temp_charts_dir,
+                progress=progress,
+                cancel_token=cancel_token,
+                **lane_source,
+            )
+    elif ingest == "stream":
+        # -----------------------------
+        # STEPS 2–4 — Grade straight from the ZIP (no extraction, no copies)
+        # -----------------------------
+        if embed_charts == temp_charts_dir:
+            print("\n⚠️ Streaming ingest: Excel chart export needs files on disk — grading without charts.")
+            embed_charts = None
+
+        with timer("pipeline.grade"):
+            grade_summary = phase1_grade_zip_submissions(
+                zip_path,
+                graded_path,
+                workers=workers,
+                rates_snapshot=rates_snapshot,
+                manifest=manifest,
+                embed_charts=embed_charts,
+                progress=progress,
+                cancel_token=cancel_token,
+                engine=engine,
+            )
+    else:
+        # -----------------------------
+        # STEP 2 — Import ZIP into workspace student_groups/<course>
+        # -----------------------------
+        if journal.can_skip("import"):
+            print("\n♻️ Resuming: ZIP already imported — skipping import.")
+        else:
+            step = PhaseProgress(progress, "import")
+            with timer("pipeline.import_zip"):
+                import_zip_to_student_groups(zip_path, folder_safe)
+            step.end()
+            journal.step_done("import")
+        _checkpoint(cancel_token, progress, "import", journal)
+
+        # -----------------------------
+        # STEP 3 — Create grading sheets + copy submissions
+        # -----------------------------
+        if journal.can_skip("prepare"):
+            print("♻️ Resuming: grading sheets already prepared — skipping preparation.")
+        else:
+            with timer("pipeline.create_grading_sheets"):
+                create_grading_sheets_from_folder(
+                    folder_safe, manifest=manifest, progress=progress, cancel_token=cancel_token,
+                )
+            _checkpoint(cancel_token, progress, "prepare", journal)
+            journal.step_done("prepare")
+
+        # -----------------------------
+        # STEP 3b — Excel chart export BEFORE grading, so phase 1 can embed
+        # the PNGs in the same write (only students about to be graded)
+        # -----------------------------
+        if embed_charts == temp_charts_dir:
+            to_grade = students_pending(manifest, PHASE_GRADE, requires=None) if manifest is not None else None
+            if to_grade != []:
+                with timer("pipeline.chart_export"):
+                    phase2_export_all_charts(
+                        submissions_path,
+                        students=to_grade,
+                        backend="com",
+                        temp_dir=temp_charts_dir,
+                        progress=progress,
+                        cancel_token=cancel_token,
+                    )
+                _checkpoint(cancel_token, progress, "chart export", journal)
+
+        # -----------------------------
+        # STEP 4 — Grade all students (formulas [+ charts])
+        # -----------------------------
+        with timer("pipeline.grade"):
+            grade_summary = phase1_grade_all_students(
+                submissions_path,
+                graded_path,
+                workers=workers,
+                rates_snapshot=rates_snapshot,
+                manifest=manifest,
+                embed_charts=embed_charts,
+                progress=progress,
+                cancel_token=cancel_token,
+                engine=engine,
+            )
 
     # -----------------------------
-    # STEP 5 — Export charts (to workspace temp_charts)
+    # STEP 4b — Per-check results into the workspace results store
+    # (also for a cancelled run: the students it finished are recorded)
     # -----------------------------
-    phase2_export_all_charts(submissions_path)
+    results_run_id = None
+    with timer("pipeline.results_store"):
+        try:
+            results_run_id = store_grade_summary(
+                folder_safe,
+                grade_summary or {},
+                options=options,
+                rubric_hash=manifest["rubric_hash"] if manifest is not None else rubric_fingerprint(),
+                template_path=default_template_path(),
+            )
+        except (sqlite3.Error, ValueError) as e:
+            print(f"⚠️ Results store not updated: {e}")
+
+    _checkpoint(cancel_token, progress, "grading", journal)
+    journal.step_done("grade")
 
     # -----------------------------
-    # STEP 6 — Insert charts into grading sheets
+    # STEPS 5–6 — Separate Excel insertion pass (chart_insert="excel" only)
+    # Incremental runs only touch sheets that don't have their chart yet.
     # -----------------------------
-    phase3_insert_all_charts(graded_path)
+    if chart_insert == "excel" and schedule == "phases":
+        chart_students = students_pending(manifest, PHASE_CHART_INSERT) if manifest is not None else None
+
+        if ingest == "stream":
+            print("\n⚠️ Streaming ingest: chart export/insert skipped (Excel needs the submission on disk).")
+        elif chart_students == []:
+            print("\n♻️ All charts already inserted — skipping chart export/insert.")
+        else:
+            with timer("pipeline.chart_export"):
+                exported = phase2_export_all_charts(
+                    submissions_path,
+                    students=chart_students,
+                    backend=chart_backend,
+                    workers=workers,
+                    temp_dir=temp_charts_dir,
+                    progress=progress,
+                    cancel_token=cancel_token,
+                )
+
+            if manifest is not None:
+                for student in exported:
+                    mark_phase(manifest, student, PHASE_CHART_EXPORT)
+                save_manifest(manifest)
+            _checkpoint(cancel_token, progress, "chart export", journal)
+
+            with timer("pipeline.chart_insert"):
+                inserted = phase3_insert_all_charts(
+                    graded_path, students=exported, temp_dir=temp_charts_dir, progress=progress,
+                )
+
+            if manifest is not None:
+                for student in inserted or []:
+                    mark_phase(manifest, student, PHASE_CHART_INSERT)
+                save_manifest(manifest)
+            journal.step_done("charts")
 
     # -----------------------------
-    # STEP 7 — Cleanup temp files (workspace temp_charts)
+    # STEP 7 — Cleanup this course's temp charts
     # -----------------------------
-    temp_charts_dir = ensure_dir("temp_charts")
-    phase4_cleanup_temp(temp_charts_dir)
+    with timer("pipeline.cleanup"):
+        phase4_cleanup_temp(temp_charts_dir)
 
     # -----------------------------
     # STEP 8 — Build Instructor Master
+    # (always rebuilt from every grading sheet, reused or not;
+    # "values" / "cached_links" totals and the item analysis sheet come
+    # from this run's results)
     # -----------------------------
-    build_instructor_master_workbook(graded_path)
+    step = PhaseProgress(progress, "master")
+    with timer("pipeline.master"):
+        build_instructor_master_workbook(graded_path, mode=master, results=grade_summary_results(grade_summary))
+    step.end()
+    journal.step_done("master")
+
+    run_info = {
+        "course_label": course_label,
+        "workers": workers,
+        "ingest": ingest,
+        "schedule": schedule,
+        "engine": engine,
+        "master": master,
+        "chart_backend": chart_backend,
+        "chart_insert": chart_insert,
+        "row_memo": (grade_summary or {}).get("memo"),
+        "results_run_id": results_run_id,
+    }
+    if timing:
+        report_path, _csv_path = write_timing_report(graded_path, run_info)
+        print(f"⏱️ Timing report saved: {report_path}")
+    if trace:
+        trace_path = write_chrome_trace(graded_path, run_info)
+        print(f"⏱️ Trace saved: {trace_path}")
+
+    journal.complete()
+    emit(progress, RUN_END, course_label=course_label, graded_path=graded_path)
 
     # ✅ IMPORTANT: return a string (no trailing comma)
     return graded_path
+
+
+def resume_pipeline(course_label: str, progress=None, cancel_token=None, **overrides) -> str:
+    """
+    Picks up the course's last unfinished run (crash, hung Excel, sleep,
+    cancel) from its run journal: same ZIP, same options, same FX rates.
+    Finished steps are skipped and only students the course manifest
+    doesn't have yet are graded, so recovery time follows what is left.
+
+    overrides: run_pipeline() keyword arguments to change (e.g. workers=4).
+
+    Returns:
+        str: Path to graded_output/<course_label> inside workspace
+    """
+    course_label = (course_label or "").strip()
+    if not course_label:
+        raise ValueError("Course label cannot be blank.")
+
+    journal = load_journal(folder_safe_label(course_label))
+    if journal is None:
+        raise FileNotFoundError(
+            f"No run journal found for course {course_label!r}.\n"
+            f"Start it with run_pipeline() first."
+        )
+    if journal.get("status") == STATUS_COMPLETED:
+        print(f"♻️ The last run of {course_label} already completed — running it again incrementally.")
+
+    zip_path = journal["zip_path"]
+    if not os.path.exists(zip_path):
+        raise FileNotFoundError(
+            f"The ZIP of the interrupted run is gone:\n{zip_path}\n"
+            f"Start a new run with run_pipeline() instead."
+        )
+
+    options = dict(journal.get("options") or {})
+    options.pop("course_label", None)
+
+    # Same rates as the students graded before the interruption
+    if not options.get("rates_snapshot_path"):
+        saved = os.path.join(ensure_dir("graded_output", folder_safe_label(course_label)), "fx_rates_snapshot.json")
+        if os.path.exists(saved):
+            options["rates_snapshot_path"] = saved
+
+    options.update(overrides)
+
+    print(f"\n♻️ Resuming {course_label} (run started {journal.get('started_at')})...")
+    return run_pipeline(
+        zip_path,
+        course_label,
+        incremental=True,
+        progress=progress,
+        cancel_token=cancel_token,
+        resume=True,
+        **options,
+    )
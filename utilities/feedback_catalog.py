@@ -0,0 +1,276 @@
+# utilities/feedback_catalog.py
+
+"""
+Feedback templates, compiled once and reloaded when their files change.
+
+A FeedbackCatalog keeps one TabFeedback per tab (income_analysis, ...):
+
+  - reload: every lookup stats the tab's workspace and packaged JSON
+    (utilities/json_loader.py); a changed mtime or size reloads that tab,
+    so an instructor's edit shows up on the next sheet without a restart.
+
+  - compile: each template is split once into literal text and fields
+    (string.Formatter.parse); rendering fills the fields in directly
+    instead of re-parsing the template for every feedback line.
+
+  - validate: placeholders are checked against the params the graders
+    emit for that code (graders/feedback_params.py) when the tab loads.
+    A workspace template that is broken or asks for a param the graders
+    never send falls back to the packaged text for that code (or is left
+    out when the packaged file has no such code) and is listed in
+    TabFeedback.problems; only a broken packaged template raises.
+
+  - memoize: identical (code, params) pairs render once per tab version —
+    most of a class gets the same lines.
+
+render_feedback (utilities/feedback_renderer.py) renders through the
+process-wide catalog: feedback_catalog().tab("currency_conversion").render(code, params)
+"""
+
+import os
+import string
+import threading
+from collections import OrderedDict
+
+from utilities.json_loader import feedback_paths, load_feedback_layers
+
+
+RENDER_MEMO_SIZE = 4096  # rendered lines kept per tab
+
+_FORMATTER = string.Formatter()
+_CONVERSIONS = {"r": repr, "s": str, "a": ascii}
+
+
+def _freeze(value):
+    """
+    Hashable stand-in for a params value (dicts / lists → tuples).
+    Every value carries its type: 1, 1.0 and True (or [1] and (1,)) are
+    one dict key but render differently.
+    """
+    if isinstance(value, dict):
+        return "dict", tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return type(value).__name__, tuple(_freeze(v) for v in value)
+    return type(value).__name__, value
+
+
+# ------------------------------
+# COMPILED TEMPLATES
+# ------------------------------
+class CompiledTemplate:
+    """
+    One feedback template, parsed once.
+
+    render(params) gives exactly what template.format(**params) gives.
+    Plain fields ({cell}, {rate:.3f}, {found!r}) are filled in directly;
+    templates using attribute / index access or nested specs are
+    formatted by str.format.
+    """
+
+    __slots__ = ("code", "text", "parts", "fields", "direct")
+
+    def __init__(self, code: str, text: str):
+        self.code = code
+        self.text = text
+        # ValueError for unbalanced braces, unknown conversions, ...
+        self.parts = list(_FORMATTER.parse(text))
+        self.fields = set()
+        self.direct = True
+        for _literal, field, spec, conversion in self.parts:
+            if field is None:
+                continue
+            if conversion is not None and conversion not in _CONVERSIONS:
+                raise ValueError(f"Unknown conversion '!{conversion}'")
+            if not field:
+                raise ValueError("Positional placeholder '{}' — feedback params are named")
+            if field.isdigit():
+                raise ValueError(f"Positional placeholder '{{{field}}}' — feedback params are named")
+            name = field.split(".", 1)[0].split("[", 1)[0]
+            self.fields.add(name)
+            if name != field or "{" in (spec or ""):
+                self.direct = False
+
+    def missing(self, names) -> list:
+        """Placeholders that aren't among `names`, sorted."""
+        return sorted(self.fields - set(names))
+
+    def render(self, params: dict) -> str:
+        if not self.direct:
+            return self.text.format(**params)
+        out = []
+        for literal, field, spec, conversion in self.parts:
+            out.append(literal)
+            if field is None:
+                continue
+            value = params[field]
+            if conversion is not None:
+                value = _CONVERSIONS[conversion](value)
+            out.append(format(value, spec))
+        return "".join(out)
+
+
+class TabFeedback:
+    """
+    The compiled templates of one tab at one version of its files.
+
+    Attributes:
+        tab (str): tab name (feedback/<tab>.json)
+        templates (dict): code → CompiledTemplate
+        problems (list): workspace templates replaced by the packaged text
+                         or ignored, as readable strings
+    """
+
+    def __init__(self, tab: str, workspace: dict, defaults: dict, expected: dict):
+        self.tab = tab
+        self.templates = {}
+        self.problems = []
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+
+        for code in {**defaults, **workspace}:
+            if code in workspace:
+                try:
+                    self.templates[code] = self._compile(code, workspace[code], expected)
+                    continue
+                except ValueError as e:
+                    if code not in defaults:
+                        # Workspace-only code (retired, scratch entry, ...): left out
+                        self.problems.append(f"feedback/{tab}.json: {code} — {e}. Template ignored.")
+                        continue
+                    self.problems.append(f"feedback/{tab}.json: {code} — {e}. Using the packaged text.")
+
+            try:
+                self.templates[code] = self._compile(code, defaults[code], expected)
+            except ValueError as e:
+                raise ValueError(
+                    f"Packaged feedback template can't be used.\n"
+                    f"- File: feedback/{tab}.json (packaged default)\n"
+                    f"- Code: {code}\n"
+                    f"- Problem: {e}"
+                ) from None
+
+    @staticmethod
+    def _compile(code: str, text, expected: dict) -> CompiledTemplate:
+        if not isinstance(text, str):
+            raise ValueError(f"template is {type(text).__name__}, not text")
+        template = CompiledTemplate(code, text)
+        names = expected.get(code)
+        if names is not None:
+            missing = template.missing(names)
+            if missing:
+                sent = ", ".join(sorted(names)) or "no params"
+                raise ValueError(
+                    f"uses {', '.join('{' + m + '}' for m in missing)} but the graders send {sent}"
+                )
+        return template
+
+    def render(self, code: str, params) -> str:
+        """
+        Text for one (code, params) feedback item.
+
+        Returns:
+            the rendered template; "[CODE] params" for an unknown code
+        """
+        template = self.templates.get(code)
+        if template is None:
+            # Safe fallback so grading never breaks
+            return f"[{code}] {params}"
+
+        try:
+            key = (code, _freeze(params))
+            hash(key)
+        except TypeError:
+            key = None
+
+        if key is not None:
+            with self._lock:
+                text = self._memo.get(key)
+                if text is not None:
+                    self._memo.move_to_end(key)
+                    return text
+
+        try:
+            text = template.render(params or {})
+        except Exception:
+            # Codes emitted with params the graders build at runtime aren't validated
+            text = f"[FORMAT ERROR] {code}: {params}"
+
+        if key is not None:
+            with self._lock:
+                self._memo[key] = text
+                if len(self._memo) > RENDER_MEMO_SIZE:
+                    self._memo.popitem(last=False)
+        return text
+
+
+# ------------------------------
+# CATALOG
+# ------------------------------
+def _file_signature(path: str):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _default_expected() -> dict:
+    # Imported here: the graders import this module's users (the writers)
+    from graders.feedback_params import emitted_params
+    return emitted_params()
+
+
+class FeedbackCatalog:
+    """
+    Per-tab compiled feedback, reloaded when a tab's files change.
+
+    Args:
+        expected (callable): returns {code: param names | None} used to
+                 validate placeholders (default: graders/feedback_params.py)
+    """
+
+    def __init__(self, expected=None):
+        self._expected = expected or _default_expected
+        self._tabs = {}  # tab → (signature, TabFeedback)
+        self._lock = threading.Lock()
+
+    def _signature(self, tab: str) -> tuple:
+        return tuple(_file_signature(path) for path in feedback_paths(tab))
+
+    def tab(self, tab: str) -> TabFeedback:
+        """
+        The tab's compiled templates, reloaded first if either of its files
+        changed (mtime or size) since the last load.
+
+        Returns:
+            TabFeedback
+        """
+        signature = self._signature(tab)
+        cached = self._tabs.get(tab)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        with self._lock:
+            cached = self._tabs.get(tab)
+            if cached is not None and cached[0] == signature:
+                return cached[1]
+            workspace, defaults = load_feedback_layers(tab)
+            feedback = TabFeedback(tab, workspace, defaults, self._expected())
+            # Re-stat: loading may just have created the workspace copy
+            self._tabs[tab] = (self._signature(tab), feedback)
+            return feedback
+
+    def problems(self, tabs) -> list:
+        """Template problems of the given tabs (each loaded if needed)."""
+        return [problem for tab in tabs for problem in self.tab(tab).problems]
+
+
+_catalog = None
+
+
+def feedback_catalog() -> FeedbackCatalog:
+    """The process-wide catalog (one per grading process)."""
+    global _catalog
+    if _catalog is None:
+        _catalog = FeedbackCatalog()
+    return _catalog
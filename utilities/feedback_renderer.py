@@ -1,12 +1,15 @@
 # utilities/feedback_renderer.py
 
-from utilities.json_loader import load_feedback
+from utilities.feedback_catalog import feedback_catalog
+from utilities.timing import timed
 
 
+@timed("render_feedback")
 def render_feedback(feedback_items, tab_name: str) -> str:
     """
     Convert feedback codes + params into final instructor-facing text
-    using feedback/<tab_name>.json.
+    using feedback/<tab_name>.json (compiled and cached by
+    utilities/feedback_catalog.py, reloaded when the file changes).
 
     feedback_items can be:
       - list of (code, params)
@@ -22,27 +25,17 @@ def render_feedback(feedback_items, tab_name: str) -> str:
     if isinstance(feedback_items, str):
         return feedback_items
 
-    feedback_map = load_feedback(tab_name)
-    lines = []
-
     # Legacy list of strings
     if isinstance(feedback_items, list) and isinstance(feedback_items[0], str):
         return "\n".join(feedback_items)
 
+    feedback = feedback_catalog().tab(tab_name)
+    lines = []
+
     for item in feedback_items:
         if isinstance(item, tuple) and len(item) == 2:
             code, params = item
-            template = feedback_map.get(code)
-
-            if template is None:
-                # Safe fallback so grading never breaks
-                lines.append(f"[{code}] {params}")
-                continue
-
-            try:
-                lines.append(template.format(**(params or {})))
-            except Exception:
-                lines.append(f"[FORMAT ERROR] {code}: {params}")
+            lines.append(feedback.render(code, params))
         else:
             lines.append(str(item))
 
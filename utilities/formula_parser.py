@@ -0,0 +1,360 @@
+# utilities/formula_parser.py
+
+"""
+Excel formula tokenizer, parser and canonicalizer.
+
+Checkers compare student formulas by canonical key instead of by string
+munging:
+
+    formula_key("=(5/9)*($A$40-32)") == formula_key("=(A40-32)/1.8")
+    formula_key("=B30*D19+B31")      != formula_key("=B30*(D19+B31)")
+
+The canonical form is an AST with
+  - `$`, spaces, case and redundant parentheses gone,
+  - subtraction folded into sums (a-b → a + -1*b), division into products
+    (a/b → a * 1/b) and unary minus into a -1 factor,
+  - operands of + and * flattened and sorted (commutative),
+  - numeric constants folded exactly (fractions, so 1.8 == 9/5 and x/1 == x),
+  - arguments of order-free functions (SUM, PRODUCT, MIN, MAX, ...) sorted.
+
+Nothing is distributed or expanded: 2*(A1+B1) and 2*A1+2*B1 stay different,
+which is what "did the student type the intended formula" needs.
+
+Keys are memoized in a bounded LRU — across a class most students type one
+of a handful of identical strings, so grading a formula cell is usually a
+dictionary hit.
+"""
+
+import re
+from fractions import Fraction
+from functools import lru_cache
+
+
+FORMULA_CACHE_SIZE = 4096
+
+# Functions whose result doesn't depend on argument order
+COMMUTATIVE_FUNCTIONS = frozenset({"SUM", "PRODUCT", "MIN", "MAX", "AVERAGE", "AND", "OR", "COUNT", "COUNTA"})
+
+
+class FormulaSyntaxError(ValueError):
+    """The text is not a formula this parser understands."""
+
+
+# ------------------------------
+# TOKENIZER
+# ------------------------------
+_SHEET = r"(?:'(?:[^']|'')+'|[A-Za-z_][\w.]*)!"
+_CELL = r"\$?[A-Za-z]{1,3}\$?\d+"
+
+_TOKEN_RE = re.compile(
+    rf"""
+    (?P<ws>\s+)
+  | (?P<string>"(?:[^"]|"")*")
+  | (?P<func>[A-Za-z_][\w.]*(?=\s*\())
+  | (?P<ref>(?:{_SHEET})?{_CELL}(?::{_CELL})?(?![\w(]))
+  | (?P<bool>(?:TRUE|FALSE)(?![\w(]))
+  | (?P<name>[A-Za-z_][\w.]*)
+  | (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<op><=|>=|<>|[-+*/^&=<>%(),;])
+    """,
+    re.VERBOSE | re.IGNORECASE,
+)
+
+
+def tokenize(text: str) -> list:
+    """
+    Splits a formula body (no leading "=") into tokens.
+
+    Returns:
+        list of (kind, value) — kind is string/func/ref/bool/name/number/op
+    """
+    tokens = []
+    pos = 0
+    while pos < len(text):
+        m = _TOKEN_RE.match(text, pos)
+        if not m:
+            raise FormulaSyntaxError(f"Unexpected character {text[pos]!r} at {pos} in {text!r}")
+        kind = m.lastgroup
+        value = m.group()
+        pos = m.end()
+        if kind == "ws":
+            continue
+        if kind == "string":
+            value = value[1:-1].replace('""', '"')
+        elif kind == "func":
+            value = value.upper()
+            if value.startswith("_XLFN."):
+                value = value[len("_XLFN."):]
+        elif kind in ("ref", "bool", "name"):
+            value = value.replace("$", "").upper()
+        elif kind == "op" and value == ";":
+            value = ","  # argument separator in some locales
+        tokens.append((kind, value))
+    return tokens
+
+
+# ------------------------------
+# PARSER (Excel precedence)
+# ------------------------------
+# Lowest to highest; unary minus binds tighter than ^ in Excel (-2^2 = 4)
+_BINARY_LEVELS = (
+    ("=", "<>", "<", ">", "<=", ">="),
+    ("&",),
+    ("+", "-"),
+    ("*", "/"),
+    ("^",),
+)
+
+
+class _Parser:
+    def __init__(self, tokens: list, text: str):
+        self.tokens = tokens
+        self.text = text
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def expect(self, value: str):
+        kind, found = self.take()
+        if kind != "op" or found != value:
+            raise FormulaSyntaxError(f"Expected {value!r} but found {found!r} in {self.text!r}")
+
+    def parse(self):
+        if not self.tokens:
+            raise FormulaSyntaxError("Empty formula.")
+        node = self.binary(0)
+        if self.pos != len(self.tokens):
+            raise FormulaSyntaxError(f"Unexpected {self.peek()[1]!r} in {self.text!r}")
+        return node
+
+    def binary(self, level: int):
+        if level == len(_BINARY_LEVELS):
+            return self.unary()
+        node = self.binary(level + 1)
+        while True:
+            kind, value = self.peek()
+            if kind != "op" or value not in _BINARY_LEVELS[level]:
+                return node
+            self.take()
+            node = ("bin", value, node, self.binary(level + 1))
+
+    def unary(self):
+        kind, value = self.peek()
+        if kind == "op" and value in ("+", "-"):
+            self.take()
+            operand = self.unary()
+            return ("neg", operand) if value == "-" else operand
+        return self.postfix()
+
+    def postfix(self):
+        node = self.primary()
+        while self.peek() == ("op", "%"):
+            self.take()
+            node = ("pct", node)
+        return node
+
+    def primary(self):
+        kind, value = self.take()
+        if kind == "number":
+            return ("num", Fraction(value))
+        if kind in ("ref", "name"):
+            return (kind, value)
+        if kind == "string":
+            return ("str", value)
+        if kind == "bool":
+            return ("bool", value)
+        if kind == "func":
+            self.expect("(")
+            args = []
+            if self.peek() != ("op", ")"):
+                while True:
+                    args.append(self.binary(0))
+                    if self.peek() != ("op", ","):
+                        break
+                    self.take()
+            self.expect(")")
+            return ("func", value, tuple(args))
+        if (kind, value) == ("op", "("):
+            node = self.binary(0)
+            self.expect(")")
+            return node
+        raise FormulaSyntaxError(f"Unexpected {value!r} in {self.text!r}")
+
+
+def parse_formula(text: str):
+    """
+    Parses a formula ("=..." or just the body) into a raw AST of tuples.
+
+    Returns:
+        nested tuples, e.g. ("bin", "*", ("num", Fraction(5)), ("ref", "A40"))
+    """
+    body = str(text).strip()
+    if body.startswith("="):
+        body = body[1:]
+    return _Parser(tokenize(body), body).parse()
+
+
+# ------------------------------
+# CANONICAL FORM
+# ------------------------------
+def _num(value) -> tuple:
+    return ("num", Fraction(value))
+
+
+def _product(factors) -> tuple:
+    constant = Fraction(1)
+    rest = []
+    for factor in factors:
+        for f in factor[1] if factor[0] == "*" else (factor,):
+            if f[0] == "num":
+                constant *= f[1]
+            else:
+                rest.append(f)
+    if constant != 1 or not rest:
+        rest.append(_num(constant))
+    if len(rest) == 1:
+        return rest[0]
+    return ("*", tuple(sorted(rest, key=render)))
+
+
+def _sum(terms) -> tuple:
+    constant = Fraction(0)
+    rest = []
+    for term in terms:
+        for t in term[1] if term[0] == "+" else (term,):
+            if t[0] == "num":
+                constant += t[1]
+            else:
+                rest.append(t)
+    if constant != 0 or not rest:
+        rest.append(_num(constant))
+    if len(rest) == 1:
+        return rest[0]
+    return ("+", tuple(sorted(rest, key=render)))
+
+
+def _negate(node) -> tuple:
+    if node[0] == "+":
+        return _sum(_negate(t) for t in node[1])
+    return _product((node, _num(-1)))
+
+
+def _invert(node) -> tuple:
+    if node[0] == "num" and node[1] != 0:
+        return _num(1 / node[1])
+    if node[0] == "*":
+        return _product(_invert(f) for f in node[1])
+    if node[0] == "inv":
+        return node[1]
+    return ("inv", node)
+
+
+def canonicalize(node) -> tuple:
+    """
+    Canonical AST for a raw parse_formula() AST (see module docstring).
+
+    Returns:
+        nested tuples; equal tuples mean equivalent formulas
+    """
+    kind = node[0]
+
+    if kind == "bin":
+        op, left, right = node[1], canonicalize(node[2]), canonicalize(node[3])
+        if op == "+":
+            return _sum((left, right))
+        if op == "-":
+            return _sum((left, _negate(right)))
+        if op == "*":
+            return _product((left, right))
+        if op == "/":
+            return _product((left, _invert(right)))
+        return (op, left, right)
+
+    if kind == "neg":
+        return _negate(canonicalize(node[1]))
+
+    if kind == "pct":
+        return _product((canonicalize(node[1]), _num(Fraction(1, 100))))
+
+    if kind == "func":
+        args = tuple(canonicalize(a) for a in node[2])
+        if node[1] in COMMUTATIVE_FUNCTIONS:
+            args = tuple(sorted(args, key=render))
+        return ("func", node[1], args)
+
+    return node
+
+
+def render(node) -> str:
+    """
+    Unambiguous text for a canonical AST (prefix form for operators).
+
+    Returns:
+        e.g. "*(+(-32,A40),5/9)" for =(5/9)*(A40-32)
+    """
+    kind = node[0]
+    if kind == "num":
+        return str(node[1])
+    if kind in ("ref", "name", "bool"):
+        return node[1]
+    if kind == "str":
+        return '"' + node[1].replace('"', '""') + '"'
+    if kind in ("+", "*"):
+        return f"{kind}({','.join(render(n) for n in node[1])})"
+    if kind == "inv":
+        return f"inv({render(node[1])})"
+    if kind == "func":
+        return f"{node[1]}({','.join(render(a) for a in node[2])})"
+    # comparison / concatenation / power: order matters
+    return f"{kind}({render(node[1])},{render(node[2])})"
+
+
+@lru_cache(maxsize=FORMULA_CACHE_SIZE)
+def _canonical_key(text: str) -> str | None:
+    try:
+        return "=" + render(canonicalize(parse_formula(text)))
+    except (FormulaSyntaxError, ZeroDivisionError, RecursionError):
+        return None
+
+
+def formula_key(val) -> str | None:
+    """
+    Canonical comparison key of a cell value.
+
+    Returns:
+        key string for a formula ("=..."); None for blanks, constants and
+        formulas that don't parse (never equal to an expected key)
+    """
+    if not isinstance(val, str):
+        return None
+    text = val.strip()
+    if not text.startswith("=") or len(text) == 1:
+        return None
+    return _canonical_key(text)
+
+
+def formula_keys(*formulas) -> frozenset:
+    """
+    Keys of several accepted formulas, for `formula_key(cell) in accepted`.
+
+    Returns:
+        frozenset of key strings
+    """
+    return frozenset(key for key in map(formula_key, formulas) if key is not None)
+
+
+def formula_matches(val, accepted: frozenset) -> bool:
+    """True when the cell's formula is equivalent to one of the accepted keys."""
+    key = formula_key(val)
+    return key is not None and key in accepted
+
+
+def formula_cache_info():
+    """Hit/miss counters of the canonical-key cache (functools CacheInfo)."""
+    return _canonical_key.cache_info()
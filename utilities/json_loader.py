@@ -2,35 +2,47 @@
 
 import json
 import os
-from functools import lru_cache
 
 from utilities.paths import ensure_dir, ws_path
 
 
-@lru_cache(maxsize=None)
-def load_feedback(tab_name: str) -> dict:
+def feedback_paths(tab_name: str) -> tuple:
     """
-    Load feedback JSON for a given tab.
+    Where a tab's feedback JSON lives.
 
-    Priority:
-      1) Workspace (Documents/MA1_Autograder/feedback/<tab>.json)  <-- instructor-editable
-      2) Packaged defaults (project_root/feedback/<tab>.json)
+    Returns:
+        (workspace_path, default_path) — the instructor-editable copy in
+        Documents/MA1_Autograder/feedback/ and the packaged default
+    """
+    ensure_dir("feedback")
+    workspace_path = ws_path("feedback", f"{tab_name}.json")
+
+    project_root = os.path.dirname(os.path.dirname(__file__))  # MA1_grader_beta/
+    default_path = os.path.join(project_root, "feedback", f"{tab_name}.json")
+    return workspace_path, default_path
+
+
+def load_feedback_layers(tab_name: str) -> tuple:
+    """
+    Load a tab's workspace and packaged feedback JSON separately.
 
     If workspace file doesn't exist but defaults do, we auto-copy defaults
     into workspace on first run so instructors can edit them later.
+
+    Returns:
+        (workspace: dict, defaults: dict) — either may be {} when its file
+        doesn't exist (never both)
     """
+    workspace_path, default_path = feedback_paths(tab_name)
 
-    # 1) Workspace path (instructor-editable)
-    ensure_dir("feedback")
-    workspace_path = ws_path("feedback", f"{tab_name}.json")
+    defaults = {}
+    if os.path.exists(default_path):
+        with open(default_path, "r", encoding="utf-8") as f:
+            defaults = json.load(f)
 
     if os.path.exists(workspace_path):
         with open(workspace_path, "r", encoding="utf-8") as f:
-            return json.load(f)
-
-    # 2) Default path (bundled with app / repo)
-    project_root = os.path.dirname(os.path.dirname(__file__))  # MA1_grader_beta/
-    default_path = os.path.join(project_root, "feedback", f"{tab_name}.json")
+            return json.load(f), defaults
 
     if not os.path.exists(default_path):
         raise FileNotFoundError(
@@ -42,15 +54,32 @@ def load_feedback(tab_name: str) -> dict:
 
     # Auto-copy defaults -> workspace so it's editable for instructors
     try:
-        with open(default_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        # Written beside the target then swapped in: parallel graders may
+        # read the workspace copy while another process is creating it
+        tmp_path = f"{workspace_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(defaults, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, workspace_path)
+    except Exception:
+        # If copy fails, still load defaults so the app runs
+        pass
 
-        with open(workspace_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+    return dict(defaults), defaults
 
-        return data
 
-    except Exception as e:
-        # If copy fails, still load defaults so the app runs
-        with open(default_path, "r", encoding="utf-8") as f:
-            return json.load(f)
+def load_feedback(tab_name: str) -> dict:
+    """
+    Load feedback JSON for a given tab.
+
+    Priority:
+      1) Workspace (Documents/MA1_Autograder/feedback/<tab>.json)  <-- instructor-editable
+      2) Packaged defaults (project_root/feedback/<tab>.json)
+
+    Codes added to the defaults after the workspace copy was made fall back
+    to the packaged text, so older workspaces never render raw codes.
+
+    Not cached: rendering goes through utilities/feedback_catalog.py, which
+    reloads a tab when one of its files changes.
+    """
+    workspace, defaults = load_feedback_layers(tab_name)
+    return {**defaults, **workspace}
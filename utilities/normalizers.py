@@ -116,3 +116,38 @@ def normalize_temp_formula(val):
         s = s[1:-1]
 
     return s
+
+
+# ------------------------------
+# CELL REFERENCE HELPERS
+# ------------------------------
+_CELL_REF_RE = re.compile(r"^([A-Z]{1,3})(\d+)$")
+
+
+def split_cell_ref(ref):
+    """
+    Splits an A1-style reference into (column letters, row number).
+    'F26' → ('F', 26), '$E$19' → ('E', 19)
+    """
+    m = _CELL_REF_RE.match(str(ref).replace("$", "").strip().upper())
+    if not m:
+        raise ValueError(f"Not a cell reference: {ref!r}")
+    return m.group(1), int(m.group(2))
+
+
+def column_index(letters):
+    """'A' → 1, 'Z' → 26, 'AA' → 27"""
+    idx = 0
+    for ch in str(letters).upper():
+        idx = idx * 26 + (ord(ch) - 64)
+    return idx
+
+
+def column_letter(idx):
+    """1 → 'A', 26 → 'Z', 27 → 'AA'"""
+    letters = ""
+    idx = int(idx)
+    while idx > 0:
+        idx, rem = divmod(idx - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
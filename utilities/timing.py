@@ -0,0 +1,303 @@
+# utilities/timing.py
+
+"""
+Opt-in timing instrumentation for the grading pipeline.
+
+Off by default: a disabled @timed function costs one flag check per call.
+Turn it on for a run with enable_timing() (run_pipeline(timing=True) does
+this). The switch is also stored in the MA1_TIMING environment variable so
+grading pool workers started afterwards record samples too; workers hand
+their samples back with the student's outcome (drain_samples / merge_samples).
+
+Every sample also keeps its start time, process and thread, and the
+student it belongs to (trace_context / set_trace_args), so a run can be
+exported as a Chrome trace (write_chrome_trace: chrome://tracing or
+ui.perfetto.dev) with one lane per process/thread.
+
+Sample names are dotted by layer, e.g.:
+    pipeline.grade   → one run_pipeline step
+    student          → one student in phase 1 (load → grade → save)
+    workbook.load / workbook.save
+    tab.income_analysis, tab.unit_conversions, tab.currency_conversion
+    row.grade_row_26_v2, row.grade_row19_exchange_rates_v2, ...
+    render_feedback
+    lane.ingest / lane.grade / ...  (orchestrator/scheduler.py stages)
+    fx.fetch, chart.export, chart.insert
+"""
+
+import csv
+import functools
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+TIMING_ENV_VAR = "MA1_TIMING"
+
+_enabled = os.environ.get(TIMING_ENV_VAR) == "1"
+_samples = []  # (name, seconds, start epoch seconds, pid, thread name, args dict | None)
+_context = threading.local()
+_lock = threading.Lock()  # drain must not lose a sample another thread appends mid-way
+
+REPORT_PERCENTILES = (50, 90, 99)
+
+
+def enable_timing():
+    """Starts recording samples in this process and in workers started from now on."""
+    global _enabled
+    _enabled = True
+    os.environ[TIMING_ENV_VAR] = "1"
+
+
+def disable_timing():
+    global _enabled
+    _enabled = False
+    os.environ.pop(TIMING_ENV_VAR, None)
+
+
+def timing_enabled() -> bool:
+    return _enabled
+
+
+def reset_timing():
+    _samples.clear()
+
+
+def set_trace_args(**args):
+    """Tags every sample recorded from now on in this thread (e.g. student=...). No args clears it."""
+    _context.args = args or None
+
+
+@contextmanager
+def trace_context(**args):
+    """set_trace_args() for the body of a `with` block (nests: inner args win)."""
+    previous = getattr(_context, "args", None)
+    _context.args = {**(previous or {}), **args}
+    try:
+        yield
+    finally:
+        _context.args = previous
+
+
+def _record(name: str, seconds: float, args: dict | None = None):
+    context = getattr(_context, "args", None)
+    if context:
+        args = {**context, **args} if args else context
+    # Start derived from "now - duration": one wall-clock read per sample
+    sample = (name, seconds, time.time() - seconds, os.getpid(), threading.current_thread().name, args)
+    with _lock:
+        _samples.append(sample)
+
+
+def record_timing(name: str, seconds: float, **args):
+    """Adds one sample that just ended (for spans that don't fit a decorator or `with` block)."""
+    if _enabled:
+        _record(name, seconds, args)
+
+
+def record_span(name: str, started_at: float, seconds: float, pid: int, thread: str, **args):
+    """Adds a sample measured elsewhere (start epoch seconds, process and thread given)."""
+    if _enabled:
+        with _lock:
+            _samples.append((name, seconds, started_at, pid, thread, args or None))
+
+
+@contextmanager
+def timer(name: str, **args):
+    """Times the body of a `with` block under `name` (no-op when timing is off)."""
+    if not _enabled:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(name, time.perf_counter() - started, args)
+
+
+def timed(name: str | None = None):
+    """
+    Decorator: times every call of the function under `name`
+    (default: the function's own name).
+    """
+    def decorate(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _record(label, time.perf_counter() - started)
+
+        return wrapper
+
+    return decorate
+
+
+def sample_mark() -> int:
+    """Position to pass to drain_samples() later: only newer samples are drained."""
+    return len(_samples)
+
+
+def drain_samples(since: int = 0) -> list:
+    """
+    Removes and returns the samples recorded after `since` (pool workers → parent).
+    Forked workers start with a copy of the parent's samples; draining from a
+    mark taken inside the worker keeps those from being sent back twice.
+    """
+    with _lock:
+        drained = _samples[since:]
+        del _samples[since:]
+    return drained
+
+
+def merge_samples(samples):
+    """Adds samples drained in another process (no-op when timing is off)."""
+    if _enabled and samples:
+        with _lock:
+            _samples.extend(tuple(sample) for sample in samples)
+
+
+def _percentile(sorted_values: list, pct: float) -> float:
+    # Nearest-rank: always an actually observed duration
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize_timings(samples=None) -> dict:
+    """
+    Aggregates samples per name.
+
+    Returns:
+        dict name → {count, total_seconds, mean_ms, p50_ms, p90_ms, p99_ms, max_ms},
+        ordered by total time (largest first)
+    """
+    by_name = {}
+    for sample in (_samples if samples is None else samples):
+        by_name.setdefault(sample[0], []).append(sample[1])
+
+    summary = {}
+    for name, values in by_name.items():
+        values.sort()
+        total = sum(values)
+        stats = {
+            "count": len(values),
+            "total_seconds": round(total, 4),
+            "mean_ms": round(total / len(values) * 1000, 3),
+        }
+        for pct in REPORT_PERCENTILES:
+            stats[f"p{pct}_ms"] = round(_percentile(values, pct) * 1000, 3)
+        stats["max_ms"] = round(values[-1] * 1000, 3)
+        summary[name] = stats
+
+    return dict(sorted(summary.items(), key=lambda kv: kv[1]["total_seconds"], reverse=True))
+
+
+def write_timing_report(output_dir: str, run_info: dict | None = None) -> tuple:
+    """
+    Writes the aggregated timings of this run as JSON + CSV into output_dir
+    (the pipeline uses graded_output/<course_label>).
+
+    Returns:
+        (json_path, csv_path)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    json_path = os.path.join(output_dir, f"timing_report_{stamp}.json")
+    csv_path = os.path.join(output_dir, f"timing_report_{stamp}.csv")
+
+    summary = summarize_timings()
+
+    report = {
+        "created_at": datetime.now(timezone.utc).replace(microsecond=0).isoformat(),
+        "run": run_info or {},
+        "samples": len(_samples),
+        "timings": summary,
+    }
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    columns = ["name", "count", "total_seconds", "mean_ms"] + [f"p{p}_ms" for p in REPORT_PERCENTILES] + ["max_ms"]
+    with open(csv_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        for name, stats in summary.items():
+            writer.writerow({"name": name, **stats})
+
+    return json_path, csv_path
+
+
+def chrome_trace_events(samples=None) -> list:
+    """
+    Samples as Trace Event Format "complete" events, one track per process
+    and thread, timestamps in microseconds from the first sample.
+
+    Returns:
+        list of event dicts (metadata events first)
+    """
+    samples = _samples if samples is None else samples
+    if not samples:
+        return []
+
+    origin = min(sample[2] for sample in samples)
+    main_pid = os.getpid()
+    thread_ids = {}
+    events = []
+
+    for name, seconds, started_at, pid, thread, args in samples:
+        tid = thread_ids.setdefault((pid, thread), len(thread_ids) + 1)
+        event = {
+            "name": name,
+            "cat": name.split(".", 1)[0],
+            "ph": "X",
+            "ts": round((started_at - origin) * 1e6, 1),
+            "dur": round(seconds * 1e6, 1),
+            "pid": pid,
+            "tid": tid,
+        }
+        if args:
+            event["args"] = {k: str(v) for k, v in args.items()}
+        events.append(event)
+
+    metadata = []
+    for pid in sorted({pid for pid, _thread in thread_ids}):
+        label = "MA1 pipeline" if pid == main_pid else f"grading worker {pid}"
+        metadata.append({"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": label}})
+        metadata.append({"name": "process_sort_index", "ph": "M", "pid": pid, "tid": 0,
+                         "args": {"sort_index": 0 if pid == main_pid else pid}})
+    for (pid, thread), tid in thread_ids.items():
+        metadata.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread}})
+
+    return metadata + sorted(events, key=lambda e: (e["ts"], -e["dur"]))
+
+
+def write_chrome_trace(output_dir: str, run_info: dict | None = None) -> str:
+    """
+    Writes this run's samples as a Chrome trace (trace_<stamp>.json) into
+    output_dir. Open it in chrome://tracing or https://ui.perfetto.dev to see
+    workers side by side, idle gaps and stragglers.
+
+    Returns:
+        path of the trace file
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f"trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+
+    trace = {
+        "traceEvents": chrome_trace_events(),
+        "displayTimeUnit": "ms",
+        "otherData": {k: str(v) for k, v in (run_info or {}).items()},
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(trace, f)
+
+    return path
@@ -0,0 +1,506 @@
+# utilities/xlsx_cell_reader.py
+
+"""
+Targeted cell reader for .xlsx submissions.
+
+The graders only read a fixed set of cells (see graders/cell_manifest.py),
+yet openpyxl.load_workbook parses every sheet, every style and every shared
+string of the workbook. This reader opens the .xlsx zip directly and:
+
+  - streams ONLY the sheet XML parts named in the manifest, and stops reading
+    each sheet as soon as it is past the last manifest row
+  - resolves shared strings lazily, only for the indices those cells use
+  - looks up number formats only for the style indices those cells use
+
+The result behaves like the small part of openpyxl the row checkers rely on:
+
+    wb = read_workbook_cells(path, manifest)
+    ws = wb["Unit Conversions"]
+    ws["F26"].value          # "=L14/I14", 3.5, "mcg/mg", datetime, None ...
+    ws["F26"].number_format  # "General", "0.000", '"$"#,##0' ...
+
+Values follow openpyxl's data_only=False conventions: formula cells return
+"=<formula>" (shared formulas are translated to the cell's position), numbers
+come back as int/float and date-formatted numbers as datetime.
+"""
+
+import posixpath
+import re
+import zipfile
+from datetime import datetime, timedelta
+from xml.etree.ElementTree import iterparse
+
+from utilities.normalizers import split_cell_ref, column_index, column_letter
+
+
+NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+REL_OFFICE_DOCUMENT = "/officeDocument"
+REL_SHARED_STRINGS = "/sharedStrings"
+REL_STYLES = "/styles"
+
+# Same table openpyxl uses for the built-in (id < 164) number formats
+BUILTIN_FORMATS = {
+    0: "General",
+    1: "0",
+    2: "0.00",
+    3: "#,##0",
+    4: "#,##0.00",
+    5: '"$"#,##0_);("$"#,##0)',
+    6: '"$"#,##0_);[Red]("$"#,##0)',
+    7: '"$"#,##0.00_);("$"#,##0.00)',
+    8: '"$"#,##0.00_);[Red]("$"#,##0.00)',
+    9: "0%",
+    10: "0.00%",
+    11: "0.00E+00",
+    12: "# ?/?",
+    13: "# ??/??",
+    14: "mm-dd-yy",
+    15: "d-mmm-yy",
+    16: "d-mmm",
+    17: "mmm-yy",
+    18: "h:mm AM/PM",
+    19: "h:mm:ss AM/PM",
+    20: "h:mm",
+    21: "h:mm:ss",
+    22: "m/d/yy h:mm",
+    37: "#,##0_);(#,##0)",
+    38: "#,##0_);[Red](#,##0)",
+    39: "#,##0.00_);(#,##0.00)",
+    40: "#,##0.00_);[Red](#,##0.00)",
+    41: r'_(* #,##0_);_(* \(#,##0\);_(* "-"_);_(@_)',
+    42: r'_("$"* #,##0_);_("$"* \(#,##0\);_("$"* "-"_);_(@_)',
+    43: r'_(* #,##0.00_);_(* \(#,##0.00\);_(* "-"??_);_(@_)',
+    44: r'_("$"* #,##0.00_)_("$"* \(#,##0.00\)_("$"* "-"??_)_(@_)',
+    45: "mm:ss",
+    46: "[h]:mm:ss",
+    47: "mmss.0",
+    48: "##0.0E+0",
+    49: "@",
+}
+
+WINDOWS_EPOCH = datetime(1899, 12, 30)
+MAC_EPOCH = datetime(1904, 1, 1)
+
+_DATE_STRIP_RE = re.compile(r'"[^"]*"|\\.|\[(?!(?:hh?|mm?|ss?)\])[^\]]*\]')
+_DATE_CHARS_RE = re.compile(r"(?<![_\\])[dmhysDMHYS]")
+_ELAPSED_RE = re.compile(r"\[(?:hh?|mm?|ss?)\]")
+
+# A1-style reference inside a formula (not a function name like LOG10( ...)
+_FORMULA_REF_RE = re.compile(r"(?<![\w.:!$])(\$?)([A-Z]{1,3})(\$?)(\d+)(?![\w(])")
+_FORMULA_REF_TAIL_RE = re.compile(r"(?<=[:!])(\$?)([A-Z]{1,3})(\$?)(\d+)(?![\w(])")
+
+
+# ------------------------------
+# SHEET-LIKE RESULT OBJECTS
+# ------------------------------
+class CellValue:
+    """The two cell attributes the graders use: .value and .number_format."""
+
+    __slots__ = ("coordinate", "value", "number_format")
+
+    def __init__(self, coordinate: str, value=None, number_format: str = "General"):
+        self.coordinate = coordinate
+        self.value = value
+        self.number_format = number_format
+
+    def __repr__(self):
+        return f"<CellValue {self.coordinate}={self.value!r} fmt={self.number_format!r}>"
+
+
+class CellSheet:
+    """
+    Read-only stand-in for an openpyxl Worksheet, limited to manifest cells.
+
+    Asking for a cell that is not in the manifest raises KeyError, so a checker
+    that starts reading new cells fails loudly instead of silently seeing None.
+    """
+
+    def __init__(self, title: str, cells: dict):
+        self.title = title
+        self._cells = cells
+
+    def __getitem__(self, coordinate: str) -> CellValue:
+        key = str(coordinate).replace("$", "").upper()
+        try:
+            return self._cells[key]
+        except KeyError:
+            raise KeyError(f"Cell {key} is not in the cell manifest for sheet '{self.title}'.") from None
+
+    def __contains__(self, coordinate) -> bool:
+        return str(coordinate).replace("$", "").upper() in self._cells
+
+    @property
+    def coordinates(self):
+        return list(self._cells)
+
+
+class CellWorkbook:
+    """Dict-like collection of CellSheets, indexed by sheet name like openpyxl."""
+
+    def __init__(self, sheets: dict, sheetnames: list):
+        self._sheets = sheets
+        self.sheetnames = sheetnames
+
+    def __getitem__(self, name: str) -> CellSheet:
+        try:
+            return self._sheets[name]
+        except KeyError:
+            raise KeyError(f"Worksheet {name} does not exist.") from None
+
+    def __contains__(self, name) -> bool:
+        return name in self._sheets
+
+
+# ------------------------------
+# MANIFEST HELPERS
+# ------------------------------
+def expand_cell_refs(refs) -> list:
+    """
+    Expands a list like ["B1", "E19:E35", "C15:F16"] into single coordinates,
+    in row-major order, without duplicates.
+    """
+    out = []
+    seen = set()
+
+    for ref in refs:
+        ref = str(ref).replace("$", "").upper()
+        if ":" in ref:
+            start, end = ref.split(":", 1)
+            c1, r1 = split_cell_ref(start)
+            c2, r2 = split_cell_ref(end)
+            i1, i2 = sorted((column_index(c1), column_index(c2)))
+            r1, r2 = sorted((r1, r2))
+            coords = [f"{column_letter(i)}{r}" for r in range(r1, r2 + 1) for i in range(i1, i2 + 1)]
+        else:
+            split_cell_ref(ref)  # validates
+            coords = [ref]
+
+        for coord in coords:
+            if coord not in seen:
+                seen.add(coord)
+                out.append(coord)
+
+    return out
+
+
+# ------------------------------
+# VALUE CONVERSION
+# ------------------------------
+def is_date_format(fmt: str) -> bool:
+    """True if an Excel number format displays a date/time (openpyxl's rule)."""
+    if not fmt:
+        return False
+    first_section = fmt.split(";")[0]
+    return _DATE_CHARS_RE.search(_DATE_STRIP_RE.sub("", first_section)) is not None
+
+
+def _from_excel(value, epoch: datetime, elapsed: bool):
+    if elapsed:
+        return timedelta(days=value)
+
+    day, fraction = divmod(value, 1)
+    diff = timedelta(milliseconds=round(fraction * 86400 * 1000))
+
+    if 0 <= value < 1 and diff.days == 0:
+        return (datetime.min + diff).time()
+
+    # Excel's fictional 1900-02-29: serials below 60 are one day off
+    if 0 < value < 60 and epoch == WINDOWS_EPOCH:
+        day += 1
+
+    return epoch + timedelta(days=day) + diff
+
+
+def _cast_number(text: str):
+    if "." in text or "E" in text or "e" in text:
+        return float(text)
+    return int(text)
+
+
+def _translate_formula(formula: str, row_delta: int, col_delta: int) -> str:
+    """
+    Shifts the relative A1 references in a shared formula by the offset between
+    the master cell and the dependent cell. $-anchored parts do not move and
+    text inside "string literals" is left alone.
+    """
+    def shift(match):
+        col_abs, col, row_abs, row = match.groups()
+        if not col_abs:
+            col = column_letter(column_index(col) + col_delta)
+        if not row_abs:
+            row = str(int(row) + row_delta)
+        return f"{col_abs}{col}{row_abs}{row}"
+
+    parts = formula.split('"')
+    for i in range(0, len(parts), 2):  # even chunks are outside string literals
+        chunk = _FORMULA_REF_RE.sub(shift, parts[i])
+        parts[i] = _FORMULA_REF_TAIL_RE.sub(shift, chunk)
+    return '"'.join(parts)
+
+
+# ------------------------------
+# PACKAGE PARTS
+# ------------------------------
+def _resolve_target(base_dir: str, target: str) -> str:
+    if target.startswith("/"):
+        return target.lstrip("/")
+    return posixpath.normpath(posixpath.join(base_dir, target))
+
+
+def _read_rels(zf: zipfile.ZipFile, rels_path: str, base_dir: str) -> dict:
+    """Returns {rel_id: (type, part_path)} for a .rels part (empty if missing)."""
+    rels = {}
+    try:
+        data = zf.open(rels_path)
+    except KeyError:
+        return rels
+
+    with data:
+        for _event, elem in iterparse(data):
+            if elem.tag == f"{NS_PKG_REL}Relationship":
+                rels[elem.get("Id")] = (elem.get("Type", ""), _resolve_target(base_dir, elem.get("Target", "")))
+    return rels
+
+
+def _read_workbook_index(zf: zipfile.ZipFile):
+    """Returns (sheet_name → part path, shared strings path, styles path, epoch)."""
+    workbook_path = "xl/workbook.xml"
+    for rel_type, path in _read_rels(zf, "_rels/.rels", "").values():
+        if rel_type.endswith(REL_OFFICE_DOCUMENT):
+            workbook_path = path
+            break
+
+    wb_dir = posixpath.dirname(workbook_path)
+    wb_rels = _read_rels(zf, posixpath.join(wb_dir, "_rels", posixpath.basename(workbook_path) + ".rels"), wb_dir)
+
+    sheet_parts = {}
+    epoch = WINDOWS_EPOCH
+
+    with zf.open(workbook_path) as data:
+        for _event, elem in iterparse(data):
+            if elem.tag == f"{NS_MAIN}sheet":
+                rel = wb_rels.get(elem.get(f"{NS_REL}id"))
+                if rel:
+                    sheet_parts[elem.get("name")] = rel[1]
+            elif elem.tag == f"{NS_MAIN}workbookPr":
+                if elem.get("date1904") in ("1", "true"):
+                    epoch = MAC_EPOCH
+
+    shared_strings_path = None
+    styles_path = None
+    for rel_type, path in wb_rels.values():
+        if rel_type.endswith(REL_SHARED_STRINGS):
+            shared_strings_path = path
+        elif rel_type.endswith(REL_STYLES):
+            styles_path = path
+
+    return sheet_parts, shared_strings_path, styles_path, epoch
+
+
+def _read_shared_strings(zf: zipfile.ZipFile, path: str, wanted: set) -> dict:
+    """Resolves only the wanted shared-string indices; stops after the last one."""
+    found = {}
+    if not wanted or not path:
+        return found
+
+    last = max(wanted)
+    index = 0
+
+    with zf.open(path) as data:
+        for _event, elem in iterparse(data):
+            if elem.tag != f"{NS_MAIN}si":
+                continue
+
+            if index in wanted:
+                # Plain <t> or rich-text runs <r><t>; phonetic <rPh> is skipped
+                texts = []
+                for child in elem:
+                    if child.tag == f"{NS_MAIN}t":
+                        texts.append(child.text or "")
+                    elif child.tag == f"{NS_MAIN}r":
+                        texts.extend(t.text or "" for t in child.iter(f"{NS_MAIN}t"))
+                found[index] = "".join(texts)
+
+            elem.clear()
+            index += 1
+            if index > last:
+                break
+
+    return found
+
+
+def _read_number_formats(zf: zipfile.ZipFile, path: str, wanted: set) -> dict:
+    """Maps only the wanted cellXfs style indices to their number format string."""
+    formats = {}
+    if not wanted or not path:
+        return formats
+
+    custom = {}
+    last = max(wanted)
+    in_cell_xfs = False
+    index = 0
+
+    with zf.open(path) as data:
+        for event, elem in iterparse(data, events=("start", "end")):
+            tag = elem.tag
+
+            if event == "start":
+                if tag == f"{NS_MAIN}cellXfs":
+                    in_cell_xfs = True
+                continue
+
+            if tag == f"{NS_MAIN}numFmt":
+                custom[int(elem.get("numFmtId"))] = elem.get("formatCode")
+            elif tag == f"{NS_MAIN}xf" and in_cell_xfs:
+                if index in wanted:
+                    fmt_id = int(elem.get("numFmtId", 0))
+                    formats[index] = custom.get(fmt_id) or BUILTIN_FORMATS.get(fmt_id, "General")
+                index += 1
+                if index > last:
+                    break
+            elif tag == f"{NS_MAIN}cellXfs":
+                break
+
+    return formats
+
+
+def _stream_sheet_cells(zf: zipfile.ZipFile, path: str, wanted: set) -> dict:
+    """
+    Streams one sheet part and returns raw cell records for the wanted
+    coordinates: {coord: (type, style_index, raw_value, formula)}.
+    Stops at the first row past the last wanted row.
+    """
+    raw = {}
+    last_row = max(split_cell_ref(c)[1] for c in wanted)
+    shared_masters = {}  # si → (formula, master row, master col index)
+
+    row_num = 0
+    col_num = 0
+
+    with zf.open(path) as data:
+        for event, elem in iterparse(data, events=("start", "end")):
+            tag = elem.tag
+
+            if event == "start":
+                if tag == f"{NS_MAIN}row":
+                    row_num = int(elem.get("r") or row_num + 1)
+                    col_num = 0
+                    if row_num > last_row:
+                        break
+                continue
+
+            if tag == f"{NS_MAIN}c":
+                coord = elem.get("r")
+                if coord:
+                    col_num = column_index(split_cell_ref(coord)[0])
+                else:
+                    col_num += 1
+                    coord = f"{column_letter(col_num)}{row_num}"
+
+                f_elem = elem.find(f"{NS_MAIN}f")
+                formula = None
+
+                if f_elem is not None:
+                    formula = f_elem.text
+                    if f_elem.get("t") == "shared":
+                        si = f_elem.get("si")
+                        if formula and f_elem.get("ref"):
+                            shared_masters[si] = (formula, row_num, col_num)
+                        elif not formula and si in shared_masters:
+                            base, m_row, m_col = shared_masters[si]
+                            formula = _translate_formula(base, row_num - m_row, col_num - m_col)
+
+                if coord in wanted:
+                    cell_type = elem.get("t", "n")
+                    v_elem = elem.find(f"{NS_MAIN}v")
+                    value = v_elem.text if v_elem is not None else None
+
+                    if cell_type == "inlineStr":
+                        is_elem = elem.find(f"{NS_MAIN}is")
+                        value = "".join(t.text or "" for t in is_elem.iter(f"{NS_MAIN}t")) if is_elem is not None else None
+
+                    raw[coord] = (cell_type, int(elem.get("s", 0)), value, formula)
+
+            elif tag == f"{NS_MAIN}row":
+                elem.clear()
+
+    return raw
+
+
+# ------------------------------
+# PUBLIC API
+# ------------------------------
+def read_workbook_cells(source, manifest: dict, data_only: bool = False) -> CellWorkbook:
+    """
+    Reads only the manifest cells from an .xlsx file.
+
+    Args:
+        source: path to the .xlsx, or a binary file-like object (e.g. BytesIO)
+        manifest (dict): {sheet_name: ["B1", "E19:E35", ...]}
+        data_only (bool): like openpyxl — formula cells return the value Excel
+            cached at last save instead of "=<formula>"
+
+    Returns:
+        CellWorkbook — wb["Sheet"]["A1"].value / .number_format
+        Sheets named in the manifest but missing from the workbook are simply
+        absent (wb["Missing"] raises KeyError, like openpyxl).
+    """
+    with zipfile.ZipFile(source) as zf:
+        sheet_parts, shared_strings_path, styles_path, epoch = _read_workbook_index(zf)
+
+        wanted_by_sheet = {name: expand_cell_refs(refs) for name, refs in manifest.items()}
+
+        raw_by_sheet = {}
+        for name, coords in wanted_by_sheet.items():
+            if name in sheet_parts and coords:
+                raw_by_sheet[name] = _stream_sheet_cells(zf, sheet_parts[name], set(coords))
+
+        # Only the shared strings / styles the kept cells actually reference
+        wanted_strings = set()
+        wanted_styles = set()
+        for raw in raw_by_sheet.values():
+            for cell_type, style, value, formula in raw.values():
+                wanted_styles.add(style)
+                if cell_type == "s" and (data_only or formula is None) and value is not None:
+                    wanted_strings.add(int(value))
+
+        strings = _read_shared_strings(zf, shared_strings_path, wanted_strings)
+        formats = _read_number_formats(zf, styles_path, wanted_styles)
+
+    sheets = {}
+    for name, raw in raw_by_sheet.items():
+        cells = {}
+        for coord in wanted_by_sheet[name]:
+            record = raw.get(coord)
+            if record is None:
+                cells[coord] = CellValue(coord)
+                continue
+
+            cell_type, style, value, formula = record
+            number_format = formats.get(style, "General")
+
+            if formula is not None and not data_only:
+                value = f"={formula}"
+            elif value is None:
+                pass
+            elif cell_type == "s":
+                value = strings.get(int(value))
+            elif cell_type == "b":
+                value = value in ("1", "true")
+            elif cell_type == "d":
+                value = datetime.fromisoformat(value)
+            elif cell_type in ("str", "inlineStr", "e"):
+                pass
+            else:
+                value = _cast_number(value)
+                if is_date_format(number_format):
+                    value = _from_excel(value, epoch, _ELAPSED_RE.search(number_format) is not None)
+
+            cells[coord] = CellValue(coord, value, number_format)
+
+        sheets[name] = CellSheet(name, cells)
+
+    return CellWorkbook(sheets, [n for n in sheet_parts if n in sheets])
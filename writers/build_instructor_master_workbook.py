@@ -1,12 +1,20 @@
 # writers/build_instructor_master_workbook.py
 
 import os
+import re
+import zipfile
+from copy import copy
 from typing import List
 
-from openpyxl import load_workbook
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.worksheet.worksheet import Worksheet
 
+from orchestrator.results_store import sheet_row_scores, template_max_points
+from orchestrator.run_manifest import load_student_results
 from utilities.paths import ws_path  # ✅ workspace-aware template path
+from utilities.xlsx_cell_reader import read_workbook_cells
+from writers.item_analysis import ITEM_ANALYSIS_SHEET_NAME, ItemAnalysis, write_item_analysis_sheet
 
 
 SUMMARY_SHEET_NAME = "Summary_Template"
@@ -29,6 +37,34 @@ ANCHOR_UNIT = "$F$14"
 ANCHOR_CURRENCY = "$F$23"
 ANCHOR_OVERALL = "$F$24"
 
+# How the totals get into the master:
+# "links"        → external-link formulas only; Excel resolves every link on open
+# "values"       → the numbers themselves, from the grading results (no links)
+# "cached_links" → the same link formulas, saved with the numbers as cached values
+#                  (shown at once; links only refresh when Excel is asked to)
+# "values" / "cached_links" stream the sheet with openpyxl's write-only mode
+# (the template's other sheets are copied across as they are).
+MASTER_MODES = ("links", "values", "cached_links")
+DEFAULT_MASTER_MODE = "links"
+
+GRADING_SHEET_NAME = "Grading Sheet"
+
+# Score rows (column F) behind each section total of the grading sheet
+SECTION_ROWS = {
+    COL_INCOME_TOTAL: range(3, 8),
+    COL_UNIT_TOTAL: range(9, 14),
+    COL_CURRENCY_TOTAL: range(15, 23),
+}
+SECTION_ANCHORS = {
+    COL_INCOME_TOTAL: ANCHOR_INCOME,
+    COL_UNIT_TOTAL: ANCHOR_UNIT,
+    COL_CURRENCY_TOTAL: ANCHOR_CURRENCY,
+}
+
+# Streamed workbooks write the summary first, as sheet1
+SUMMARY_SHEET_PART = "xl/worksheets/sheet1.xml"
+_EMPTY_FORMULA_CELL_RE = re.compile(r'<c r="([A-Z]+[0-9]+)"([^>]*)><f>([^<]*)</f><v\s*/></c>')
+
 
 def _grade_files_in_folder(graded_path: str) -> List[str]:
     graded_path = os.path.abspath(graded_path)
@@ -72,23 +108,229 @@ def _ensure_summary_headers(ws: Worksheet) -> None:
             ws[cell].value = label
 
 
+def _number(value) -> float:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    return 0
+
+
+def _read_sheet_scores(grade_path: str) -> dict:
+    """{row: F value} of a grading sheet, for students without in-memory results."""
+    cells = [f"F{row}" for rows in SECTION_ROWS.values() for row in rows]
+    try:
+        ws = read_workbook_cells(grade_path, {GRADING_SHEET_NAME: cells})[GRADING_SHEET_NAME]
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile) as e:
+        print(f"⚠️ Scores not readable, totals left blank: {os.path.basename(grade_path)} ({e})")
+        return {}
+    return {int(coord[1:]): ws[coord].value for coord in cells}
+
+
+def _student_scores(student: str, grade_path: str, results: dict | None, course: str) -> tuple:
+    """
+    One student's (grading results | None, {row: F score}).
+
+    results given (pipeline): the student's in-memory results; students
+    not in it (failed) get their sheet's scores. No results given
+    (standalone build): the results stored by the last run
+    (state/<course>/results), else the sheet's scores.
+    """
+    if results is not None:
+        student_results = results.get(student) or None
+    else:
+        student_results = load_student_results(course, student)
+
+    if student_results:
+        return student_results, sheet_row_scores(student_results)
+    return None, _read_sheet_scores(grade_path)
+
+
+def _section_totals(row_scores: dict) -> dict:
+    """
+    Section totals + overall total, as the grading sheet's SUM formulas give them.
+
+    Returns:
+        {COL_INCOME_TOTAL: .., COL_UNIT_TOTAL: .., COL_CURRENCY_TOTAL: .., COL_AUTO_TOTAL: ..}
+    """
+    totals = {
+        col: round(sum(_number(row_scores.get(row)) for row in rows), 2)
+        for col, rows in SECTION_ROWS.items()
+    }
+    totals[COL_AUTO_TOTAL] = round(sum(totals.values()), 2)
+    return totals
+
+
+def _copy_style(target: WriteOnlyCell, source) -> WriteOnlyCell:
+    # Unstyled cells too: their font is the template's default, not the new workbook's
+    target.font = copy(source.font)
+    if source.has_style:
+        target.fill = copy(source.fill)
+        target.border = copy(source.border)
+        target.alignment = copy(source.alignment)
+        target.number_format = source.number_format
+        target.protection = copy(source.protection)
+    return target
+
+
+def _stream_template_sheet(wb: Workbook, source: Worksheet):
+    """
+    Copies one template sheet into a write-only workbook: values, styles,
+    column widths, row heights, merged cells, frozen panes, conditional
+    formatting and data validation.
+    """
+    ws = wb.create_sheet(source.title)
+    for key, dim in source.column_dimensions.items():
+        if dim.width:
+            ws.column_dimensions[key].width = dim.width
+    for key, dim in source.row_dimensions.items():
+        if dim.height:
+            ws.row_dimensions[key].height = dim.height
+    for merged in source.merged_cells.ranges:
+        ws.merged_cells.add(merged.coord)
+    ws.freeze_panes = source.freeze_panes
+    ws.conditional_formatting = source.conditional_formatting
+    ws.data_validations = source.data_validations
+
+    for row in source.iter_rows(min_row=1, max_row=source.max_row):
+        ws.append([_copy_style(WriteOnlyCell(ws, cell.value), cell) for cell in row])
+
+
+def _fill_cached_values(path: str, cached: dict):
+    """
+    Gives the summary sheet's formula cells their cached values.
+
+    openpyxl always saves formulas with an empty <v/>; this rewrites the
+    sheet part once, copying every other part of the file as is.
+    """
+    def _patch(m):
+        value = cached.get(m.group(1))
+        if value is None:
+            return m.group(0)
+        return f'<c r="{m.group(1)}"{m.group(2)}><f>{m.group(3)}</f><v>{value}</v></c>'
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with zipfile.ZipFile(path) as src, zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as dst:
+        for info in src.infolist():
+            data = src.read(info.filename)
+            if info.filename == SUMMARY_SHEET_PART:
+                data = _EMPTY_FORMULA_CELL_RE.sub(_patch, data.decode("utf-8")).encode("utf-8")
+            dst.writestr(info, data)
+    os.replace(tmp_path, path)
+
+
+def _build_streamed(
+    grade_files: List[str],
+    template_path: str,
+    out_path: str,
+    mode: str,
+    results: dict | None,
+    analysis: ItemAnalysis | None,
+) -> str:
+    """
+    "values" / "cached_links": the summary sheet streamed row by row
+    (openpyxl write-only), headers, styles and column widths copied from
+    the template's Summary_Template sheet; the template's other sheets
+    (Student_Template, ...) follow it, copied as they are.
+    """
+    template_wb = load_workbook(template_path)
+    if SUMMARY_SHEET_NAME not in template_wb.sheetnames:
+        raise KeyError(f"Template missing sheet: {SUMMARY_SHEET_NAME}")
+    template_ws = template_wb[SUMMARY_SHEET_NAME]
+    _ensure_summary_headers(template_ws)
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(SUMMARY_SHEET_NAME)
+    for key, dim in template_ws.column_dimensions.items():
+        if dim.width:
+            ws.column_dimensions[key].width = dim.width
+
+    last_col = max(template_ws.max_column, 7)
+    for row in template_ws.iter_rows(min_row=1, max_row=SUMMARY_HEADER_ROW, max_col=last_col):
+        ws.append([_copy_style(WriteOnlyCell(ws, cell.value), cell) for cell in row])
+
+    # Cached values of the formula cells (cached_links: the links too)
+    cached = {}
+    course = os.path.basename(os.path.dirname(out_path))
+
+    for row, full_grade_path in enumerate(grade_files, start=SUMMARY_START_ROW):
+        grade_filename = os.path.basename(full_grade_path)
+        student_base = grade_filename.replace("_MA1_Grade.xlsx", "")
+
+        student_results, row_scores = _student_scores(student_base, full_grade_path, results, course)
+        totals = _section_totals(row_scores)
+        if analysis is not None:
+            analysis.add(student_results, row_scores)
+
+        name = WriteOnlyCell(ws, student_base)
+        name.hyperlink = _xl_escape_path(full_grade_path)
+
+        final_formula = f"={COL_AUTO_TOTAL}{row}+{COL_MANUAL_ADJ}{row}"
+        cached[f"{COL_FINAL_TOTAL}{row}"] = totals[COL_AUTO_TOTAL]
+
+        if mode == "cached_links":
+            auto = _external_link_formula_local(grade_filename, ANCHOR_OVERALL)
+            sections = [
+                _external_link_formula_local(grade_filename, SECTION_ANCHORS[col])
+                for col in (COL_INCOME_TOTAL, COL_UNIT_TOTAL, COL_CURRENCY_TOTAL)
+            ]
+            cached[f"{COL_AUTO_TOTAL}{row}"] = totals[COL_AUTO_TOTAL]
+            for col in (COL_INCOME_TOTAL, COL_UNIT_TOTAL, COL_CURRENCY_TOTAL):
+                cached[f"{col}{row}"] = totals[col]
+        else:
+            auto = totals[COL_AUTO_TOTAL]
+            sections = [totals[col] for col in (COL_INCOME_TOTAL, COL_UNIT_TOTAL, COL_CURRENCY_TOTAL)]
+
+        # A..G: name, auto, manual adj, final, income, unit, currency
+        ws.append([name, auto, 0, final_formula, *sections])
+
+    for source in template_wb.worksheets:
+        if source.title != SUMMARY_SHEET_NAME and source.title != ITEM_ANALYSIS_SHEET_NAME:
+            _stream_template_sheet(wb, source)
+
+    if analysis is not None:
+        write_item_analysis_sheet(wb.create_sheet(ITEM_ANALYSIS_SHEET_NAME), analysis)
+
+    # Values are current already; links (cached_links) refresh only on request
+    wb.calculation.calcMode = "auto"
+    wb.calculation.fullCalcOnLoad = False
+
+    wb.save(out_path)
+    _fill_cached_values(out_path, cached)
+    return out_path
+
+
 def build_instructor_master_workbook(
     graded_path: str,
     template_path: str | None = None,
     output_filename: str = "INSTRUCTOR_MASTER.xlsx",
+    mode: str = DEFAULT_MASTER_MODE,
+    results: dict | None = None,
+    item_analysis: bool = True,
 ) -> str:
     """
-    Builds a summary-only instructor master workbook.
+    Builds the instructor master workbook.
 
-    - Uses Template_Master.xlsx -> Summary_Template sheet only
+    - Uses Template_Master.xlsx: rows go into its Summary_Template sheet,
+      its other sheets are kept as they are (every mode)
     - Writes one row per student grade file
-    - Links to each student's grading sheet totals & section totals
+    - mode "links": links to each student's grading sheet totals & section totals
+    - mode "values": writes the totals as numbers (no external links)
+    - mode "cached_links": the links, saved with the totals as cached values
+
+    results: {student: grading results} — the run's in-memory results.
+    Without it, the results the last run stored are used; a student with
+    neither has the scores read from their grading sheet.
+
+    item_analysis: also add the "Item_Analysis" sheet (writers/item_analysis.py),
+    built in the same pass as the summary rows.
 
     Saves into:
       graded_output/<course>/INSTRUCTOR_MASTER.xlsx
 
     Returns: absolute path to created workbook
     """
+    if mode not in MASTER_MODES:
+        raise ValueError(f"Unknown master mode: {mode!r} (expected one of {MASTER_MODES})")
+
     graded_path = os.path.abspath(graded_path)
 
     if not os.path.isdir(graded_path):
@@ -110,6 +352,15 @@ def build_instructor_master_workbook(
     if not grade_files:
         raise FileNotFoundError(f"No *_MA1_Grade.xlsx files found in: {graded_path}")
 
+    analysis = None
+    if item_analysis:
+        analysis = ItemAnalysis(template_max_points(ws_path("templates", "Grading_Sheet_Template.xlsx")))
+
+    if mode != "links":
+        return _build_streamed(
+            grade_files, template_path, os.path.join(graded_path, output_filename), mode, results, analysis,
+        )
+
     wb = load_workbook(template_path)
 
     if SUMMARY_SHEET_NAME not in wb.sheetnames:
@@ -127,10 +378,15 @@ def build_instructor_master_workbook(
 
     row = SUMMARY_START_ROW
 
+    course = os.path.basename(graded_path)
+
     for full_grade_path in grade_files:
         grade_filename = os.path.basename(full_grade_path)
         student_base = grade_filename.replace("_MA1_Grade.xlsx", "")
 
+        if analysis is not None:
+            analysis.add(*_student_scores(student_base, full_grade_path, results, course))
+
         # Name + hyperlink to the grade file
         name_cell = f"{COL_NAME}{row}"
         ws_summary[name_cell].value = student_base
@@ -162,6 +418,11 @@ def build_instructor_master_workbook(
 
         row += 1
 
+    if analysis is not None:
+        if ITEM_ANALYSIS_SHEET_NAME in wb.sheetnames:
+            del wb[ITEM_ANALYSIS_SHEET_NAME]
+        write_item_analysis_sheet(wb.create_sheet(ITEM_ANALYSIS_SHEET_NAME), analysis)
+
     out_path = os.path.join(graded_path, output_filename)
     wb.save(out_path)
     return out_path
@@ -5,6 +5,9 @@ import re
 import shutil
 
 from utilities.paths import ensure_dir, ws_path
+from orchestrator.run_manifest import file_sha256, refresh_student, phase_done, mark_phase, PHASE_GRADE
+from orchestrator.progress import PhaseProgress
+from orchestrator.cancellation import keep_going
 
 
 def _clean_name_parts_from_folder(folder_name: str):
@@ -53,7 +56,51 @@ def _clean_name_parts_from_folder(folder_name: str):
     return first, last
 
 
-def create_grading_sheets_from_folder(course_label: str):
+def find_student_submissions(student_groups_path: str) -> list:
+    """
+    Lists the submission of every student folder in student_groups/<course_label>
+    (the first .xlsx inside each folder), without copying anything.
+
+    Returns:
+        list of dicts (sorted by student name):
+          student → "First_Last"
+          folder  → raw LMS folder name
+          path    → full path of the submitted .xlsx
+    """
+    submissions = {}
+
+    for folder_name in sorted(os.listdir(student_groups_path)):
+        folder_path = os.path.join(student_groups_path, folder_name)
+        if not os.path.isdir(folder_path):
+            continue
+
+        first_name, last_name = _clean_name_parts_from_folder(folder_name)
+        readable_name = f"{first_name}_{last_name}"
+
+        excel_files = sorted(f for f in os.listdir(folder_path) if f.endswith(".xlsx"))
+        if not excel_files:
+            print(f"⚠️ No Excel file found inside: {folder_name}")
+            continue
+
+        if readable_name in submissions:
+            print(f"⚠️ Duplicate student name {readable_name} (folder '{folder_name}') — keeping the first.")
+            continue
+
+        submissions[readable_name] = {
+            "student": readable_name,
+            "folder": folder_name,
+            "path": os.path.join(folder_path, excel_files[0]),
+        }
+
+    return [submissions[name] for name in sorted(submissions)]
+
+
+def create_grading_sheets_from_folder(
+    course_label: str,
+    manifest: dict | None = None,
+    progress=None,
+    cancel_token=None,
+):
     """
     Creates (INSIDE WORKSPACE):
         - A clean copy of each student's submission inside:
@@ -64,6 +111,16 @@ def create_grading_sheets_from_folder(course_label: str):
     Source of raw folders (INSIDE WORKSPACE):
         student_groups/<course_label>/<student_folder>/
 
+    If a course manifest (orchestrator/run_manifest.py) is passed, students whose
+    submission is byte-identical to the last run AND who were already graded
+    keep their existing grading sheet (no template overwrite). Everyone else
+    gets a fresh template and has their phases reset in the manifest.
+
+    progress (callable): optional event callback (orchestrator/progress.py),
+    "prepare" phase, one event per student folder.
+    cancel_token (CancelToken): optional (orchestrator/cancellation.py);
+    stops preparing further students once cancelled.
+
     Returns:
         (graded_output_path, submissions_path)
         OR None if the course has no students.
@@ -99,8 +156,12 @@ def create_grading_sheets_from_folder(course_label: str):
         print(f"📭 No student folders found inside: {student_groups_path}")
         return None
 
+    tracker = PhaseProgress(progress, "prepare", total=len(student_folders))
+
     # ---- Process each student ----
     for folder_name in student_folders:
+        if not keep_going(cancel_token):
+            break
         try:
             first_name, last_name = _clean_name_parts_from_folder(folder_name)
             readable_name = f"{first_name}_{last_name}"
@@ -113,21 +174,40 @@ def create_grading_sheets_from_folder(course_label: str):
             excel_files = [f for f in os.listdir(folder_path) if f.endswith(".xlsx")]
             if not excel_files:
                 print(f"⚠️ No Excel file found inside: {folder_name}")
+                tracker.student_done(readable_name, "no_submission")
                 continue
 
             original_submission = os.path.join(folder_path, excel_files[0])
             submission_dest = os.path.join(submissions_path, submission_filename)
+            grading_dest = os.path.join(graded_output_path, grading_filename)
+
+            # ---- Unchanged since last run? Keep the existing grading sheet ----
+            if manifest is not None:
+                unchanged = refresh_student(manifest, readable_name, file_sha256(original_submission))
+                if (
+                    unchanged
+                    and phase_done(manifest, readable_name, PHASE_GRADE)
+                    and os.path.exists(submission_dest)
+                    and os.path.exists(grading_dest)
+                ):
+                    print(f"♻️ Unchanged: {readable_name}")
+                    tracker.student_done(readable_name, "unchanged")
+                    continue
+                mark_phase(manifest, readable_name, PHASE_GRADE, status="pending")
 
             # ---- Copy submission ----
             shutil.copyfile(original_submission, submission_dest)
 
             # ---- Copy grading template ----
-            grading_dest = os.path.join(graded_output_path, grading_filename)
             shutil.copyfile(template_path, grading_dest)
 
             print(f"✅ Prepared: {readable_name}")
+            tracker.student_done(readable_name, "prepared")
 
         except Exception as e:
             print(f"❌ Error processing folder '{folder_name}': {e}")
+            tracker.student_done(folder_name, "failed", error=str(e))
+
+    tracker.end()
 
     return graded_output_path, submissions_path
@@ -3,6 +3,11 @@
 from utilities.paths import ensure_dir
 
 
+def folder_safe_label(course_label: str) -> str:
+    """Course label as used for its workspace folders (e.g. "MAT 144/501" → "MAT_144_501")."""
+    return course_label.replace(" ", "_").replace("/", "_")
+
+
 def generate_course_folders(course_label: str):
     """
     Creates/ensures the course-specific folders exist INSIDE the user's workspace:
@@ -16,16 +21,16 @@ def generate_course_folders(course_label: str):
         (folder_safe_label, graded_path, submissions_path)
     """
 
-    folder_safe_label = course_label.replace(" ", "_").replace("/", "_")
+    folder_safe = folder_safe_label(course_label)
 
     # Ensure all 3 course folders exist in the workspace
-    groups_path = ensure_dir("student_groups", folder_safe_label)
-    graded_path = ensure_dir("graded_output", folder_safe_label)
-    submissions_path = ensure_dir("student_submissions", folder_safe_label)
+    groups_path = ensure_dir("student_groups", folder_safe)
+    graded_path = ensure_dir("graded_output", folder_safe)
+    submissions_path = ensure_dir("student_submissions", folder_safe)
 
     print(f"✅ Workspace folders ready for: {course_label}")
     print(f"   - Student groups:   {groups_path}")
     print(f"   - Student files:    {submissions_path}")
     print(f"   - Graded output:    {graded_path}")
 
-    return folder_safe_label, graded_path, submissions_path
+    return folder_safe, graded_path, submissions_path
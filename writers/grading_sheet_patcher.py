@@ -0,0 +1,577 @@
+# writers/grading_sheet_patcher.py
+
+"""
+Template-patching writer for grading sheets.
+
+openpyxl re-parses Grading_Sheet_Template.xlsx (styles, theme, every cell) for
+each student and then re-serializes the whole workbook, just to fill in the
+score / feedback cells F3:G22. This writer parses the template ONCE:
+
+  - every zip part is kept in memory as-is
+  - the "Grading Sheet" XML is split around the target cells F3:G22, so a
+    student's sheet is the static chunks joined with ~40 freshly rendered cells
+  - new feedback text is appended to the template's shared strings
+    (existing strings are reused, count/uniqueCount are updated); strings
+    only the replaced cells used are dropped, so patching an already
+    graded file (orchestrator/rerender_feedback.py) doesn't grow it
+  - formula cells lose their stale cached <v> and the workbook is flagged
+    fullCalcOnLoad, so Excel recalculates the totals on open (same result as
+    an openpyxl save, which writes formulas without cached values)
+
+The existing score writers stay unchanged: they write into a PatchedSheet,
+which accepts both ws["F3"] = x and ws["F3"].value = x.
+
+    template = load_grading_template(template_path)
+    ws = template.new_sheet()
+    write_income_analysis_scores(ws, ia_results)
+    template.save(ws, grading_file)
+"""
+
+import math
+import os
+import posixpath
+import re
+import struct
+import zipfile
+from xml.etree.ElementTree import fromstring
+from xml.sax.saxutils import escape
+
+from utilities.xlsx_cell_reader import expand_cell_refs, _read_rels, _read_workbook_index
+
+
+GRADING_SHEET_NAME = "Grading Sheet"
+PATCH_CELLS = expand_cell_refs(["F3:G22"])
+
+# Student chart picture: top-left corner of J4 (0-based column 9, row 3)
+CHART_ANCHOR_COL = 9
+CHART_ANCHOR_ROW = 3
+EMU_PER_PIXEL = 9525  # at Excel's 96 DPI
+
+REL_OFFICE_DOCUMENT = "/officeDocument"
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+CT_DRAWING = "application/vnd.openxmlformats-officedocument.drawing+xml"
+
+# <drawing> must come before these in a worksheet (schema order)
+_AFTER_DRAWING_RE = re.compile(
+    r"<(?:legacyDrawing|legacyDrawingHF|drawingHF|picture|oleObjects|controls|webPublishItems|tableParts|extLst)\b|</worksheet>"
+)
+_REL_ID_RE = re.compile(r'\bId="rId(\d+)"')
+
+_CELL_RE = re.compile(r"<c\b([^>]*?)(?:/>|>(.*?)</c>)", re.DOTALL)
+_ATTR_R_RE = re.compile(r'\br="([A-Z]+\d+)"')
+_ATTR_S_RE = re.compile(r'\bs="(\d+)"')
+_ATTR_T_RE = re.compile(r'\s+t="[^"]*"')
+_CACHED_VALUE_RE = re.compile(r"<v>.*?</v>|<v/>", re.DOTALL)
+_SST_COUNTS_RE = re.compile(r'\s+(?:count|uniqueCount)="\d+"')
+_SST_ITEM_RE = re.compile(r"<si\b.*?</si>|<si\s*/>", re.DOTALL)
+# A shared-string cell's index: <c r="A1" t="s"><v>12</v></c>
+_SHARED_REF_RE = re.compile(r'(<c\b[^>]*?\bt="s"[^>]*>\s*<v>)(\d+)(</v>)')
+_CALC_PR_RE = re.compile(r"<calcPr\b([^>]*?)(/?)>")
+
+# XML 1.0 forbids most control characters (openpyxl refuses them too)
+_ILLEGAL_XML_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+# ------------------------------
+# RECORDER SHEET (what the score writers write into)
+# ------------------------------
+_UNSET = object()  # cell never written → template XML is kept as-is
+
+
+class PatchedCell:
+    __slots__ = ("coordinate", "value")
+
+    def __init__(self, coordinate: str, value=_UNSET):
+        self.coordinate = coordinate
+        self.value = value
+
+
+class PatchedSheet:
+    """
+    Write-only stand-in for the openpyxl "Grading Sheet" worksheet.
+
+    Only the patchable cells (F3:G22) exist; writing anywhere else raises
+    KeyError so a writer change can't silently lose output.
+    """
+
+    def __init__(self, coordinates):
+        self.title = GRADING_SHEET_NAME
+        self._cells = {c: PatchedCell(c) for c in coordinates}
+
+    def __getitem__(self, coordinate: str) -> PatchedCell:
+        key = str(coordinate).replace("$", "").upper()
+        try:
+            return self._cells[key]
+        except KeyError:
+            raise KeyError(f"Cell {key} is not patchable in the grading sheet template (allowed: F3:G22).") from None
+
+    def __setitem__(self, coordinate: str, value):
+        self[coordinate].value = value
+
+    def values(self) -> dict:
+        """Only the cells a writer actually assigned."""
+        return {c: cell.value for c, cell in self._cells.items() if cell.value is not _UNSET}
+
+
+# ------------------------------
+# TEMPLATE
+# ------------------------------
+def _xml_text(value: str) -> str:
+    return escape(_ILLEGAL_XML_RE.sub("", value))
+
+
+def png_size(png: bytes) -> tuple:
+    """(width, height) in pixels from a PNG's IHDR chunk."""
+    if png[:8] != b"\x89PNG\r\n\x1a\n" or png[12:16] != b"IHDR":
+        raise ValueError("Chart image is not a PNG.")
+    return struct.unpack(">II", png[16:24])
+
+
+def _drawing_xml(rel_id: str, width_px: int, height_px: int) -> str:
+    cx, cy = width_px * EMU_PER_PIXEL, height_px * EMU_PER_PIXEL
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<xdr:wsDr xmlns:xdr="http://schemas.openxmlformats.org/drawingml/2006/spreadsheetDrawing" '
+        'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main">'
+        "<xdr:oneCellAnchor>"
+        f"<xdr:from><xdr:col>{CHART_ANCHOR_COL}</xdr:col><xdr:colOff>0</xdr:colOff>"
+        f"<xdr:row>{CHART_ANCHOR_ROW}</xdr:row><xdr:rowOff>0</xdr:rowOff></xdr:from>"
+        f'<xdr:ext cx="{cx}" cy="{cy}"/>'
+        "<xdr:pic>"
+        '<xdr:nvPicPr><xdr:cNvPr id="2" name="Student Chart"/>'
+        '<xdr:cNvPicPr><a:picLocks noChangeAspect="1"/></xdr:cNvPicPr></xdr:nvPicPr>'
+        f'<xdr:blipFill><a:blip xmlns:r="{REL_NS}" r:embed="{rel_id}"/>'
+        "<a:stretch><a:fillRect/></a:stretch></xdr:blipFill>"
+        f'<xdr:spPr><a:xfrm><a:off x="0" y="0"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>'
+        '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom></xdr:spPr>'
+        "</xdr:pic>"
+        "<xdr:clientData/>"
+        "</xdr:oneCellAnchor>"
+        "</xdr:wsDr>"
+    )
+
+
+def _number_text(value) -> str | None:
+    if isinstance(value, int):
+        return str(value)
+    value = float(value)
+    if math.isnan(value) or math.isinf(value):
+        return None
+    if value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class GradingSheetTemplate:
+    """The grading template, parsed once and split into reusable chunks."""
+
+    def __init__(self, template_path: str, coordinates=PATCH_CELLS):
+        self.template_path = os.path.abspath(template_path)
+        if not os.path.exists(self.template_path):
+            raise FileNotFoundError(
+                f"Grading sheet template not found:\n{self.template_path}\n"
+                f"Run ensure_workspace_assets() first."
+            )
+
+        self.coordinates = list(coordinates)
+
+        with zipfile.ZipFile(self.template_path, "r") as zf:
+            self._infos = zf.infolist()
+            self._parts = {info.filename: zf.read(info.filename) for info in self._infos}
+
+            sheet_parts, self._sst_path, _styles_path, _epoch = _read_workbook_index(zf)
+
+            self._workbook_path = "xl/workbook.xml"
+            for rel_type, path in _read_rels(zf, "_rels/.rels", "").values():
+                if rel_type.endswith(REL_OFFICE_DOCUMENT):
+                    self._workbook_path = path
+                    break
+
+        self._sheet_parts = sheet_parts
+        self._sheet_path = sheet_parts.get(GRADING_SHEET_NAME)
+        if not self._sheet_path or self._sheet_path not in self._parts:
+            raise ValueError(
+                f"Template has no '{GRADING_SHEET_NAME}' sheet:\n{self.template_path}"
+            )
+        if not self._sst_path or self._sst_path not in self._parts:
+            raise ValueError(
+                f"Template has no shared strings part (expected at least the header text):\n"
+                f"{self.template_path}"
+            )
+
+        self._split_sheet()
+        self._split_shared_strings()
+        self._count_shared_refs()
+        self._flag_full_calc_on_load()
+        self._picture = None  # prepared on first embedded chart
+
+    # ---- sheet XML → static chunks + target cell slots ----
+    def _split_sheet(self):
+        xml = self._parts[self._sheet_path].decode("utf-8")
+        wanted = set(self.coordinates)
+
+        chunks = []
+        slots = []
+        styles = {}
+        originals = {}
+        pos = 0
+        static = []
+
+        for m in _CELL_RE.finditer(xml):
+            attrs, body = m.group(1), m.group(2) or ""
+            ref = _ATTR_R_RE.search(attrs)
+            coord = ref.group(1) if ref else None
+
+            cell_xml = m.group(0)
+            if "<f" in body:
+                # Formula: drop the stale cached value (and its type) — Excel recalculates on load
+                cell_xml = f"<c{_ATTR_T_RE.sub('', attrs)}>{_CACHED_VALUE_RE.sub('', body)}</c>"
+
+            if coord in wanted:
+                static.append(xml[pos:m.start()])
+                chunks.append("".join(static))
+                static = []
+                slots.append(coord)
+                style = _ATTR_S_RE.search(attrs)
+                styles[coord] = style.group(1) if style else None
+                originals[coord] = cell_xml
+                pos = m.end()
+            elif cell_xml is not m.group(0):
+                static.append(xml[pos:m.start()])
+                static.append(cell_xml)
+                pos = m.end()
+
+        static.append(xml[pos:])
+        chunks.append("".join(static))
+
+        missing = [c for c in self.coordinates if c not in styles]
+        if missing:
+            raise ValueError(
+                f"Template '{GRADING_SHEET_NAME}' is missing cells the writers fill in:\n"
+                f"{', '.join(missing)}"
+            )
+
+        self._sheet_chunks = chunks
+        self._slots = slots
+        self._styles = styles
+        self._originals = originals
+
+    # ---- shared strings → header + existing <si> + footer ----
+    def _split_shared_strings(self):
+        xml = self._parts[self._sst_path].decode("utf-8")
+
+        open_start = xml.index("<sst")
+        open_end = xml.index(">", open_start) + 1
+        open_tag = xml[open_start:open_end]
+
+        if open_tag.endswith("/>"):
+            # Empty <sst .../>: re-open it so new strings have somewhere to go
+            self._sst_head = xml[:open_start] + _SST_COUNTS_RE.sub("", open_tag[:-2])
+            self._sst_body = ""
+            self._sst_tail = "</sst>" + xml[open_end:]
+        else:
+            close = xml.rindex("</sst>")
+            self._sst_head = xml[:open_start] + _SST_COUNTS_RE.sub("", open_tag[:-1])
+            self._sst_body = xml[open_end:close]
+            self._sst_tail = xml[close:]
+
+        root = fromstring(self._parts[self._sst_path])
+        ns = root.tag[: root.tag.index("}") + 1] if root.tag.startswith("{") else ""
+
+        # Plain-text strings only; rich-text entries are never reused for feedback
+        self._sst_index = {}
+        self._sst_unique = 0
+        for si in root.findall(f"{ns}si"):
+            t = si.find(f"{ns}t")
+            if t is not None and len(si) == 1:
+                self._sst_index.setdefault(t.text or "", self._sst_unique)
+            self._sst_unique += 1
+
+        # Raw <si> entries for rebuilding the table; None if they can't be split
+        # reliably (prefixed namespace), in which case old strings are kept as-is
+        items = _SST_ITEM_RE.findall(self._sst_body)
+        self._sst_items = items if len(items) == self._sst_unique else None
+
+    # ---- which shared strings the parts we don't replace still use ----
+    def _count_shared_refs(self):
+        self._static_refs = set()
+        self._static_ref_count = 0
+        for chunk in self._sheet_chunks:
+            for m in _SHARED_REF_RE.finditer(chunk):
+                self._static_refs.add(int(m.group(2)))
+                self._static_ref_count += 1
+
+        # Other worksheets share the table; they are only rewritten if indices move
+        self._other_sheets = {}
+        for path in self._sheet_parts.values():
+            if path == self._sheet_path or path not in self._parts:
+                continue
+            refs = [int(m.group(2)) for m in _SHARED_REF_RE.finditer(self._parts[path].decode("utf-8"))]
+            if refs:
+                self._other_sheets[path] = refs
+                self._static_refs.update(refs)
+                self._static_ref_count += len(refs)
+
+        self._original_refs = {}
+        for coord, cell_xml in self._originals.items():
+            m = _SHARED_REF_RE.search(cell_xml)
+            self._original_refs[coord] = int(m.group(2)) if m else None
+
+        # Template: every string is a header or label → nothing can be dropped
+        self._all_strings_static = (
+            self._sst_items is None or len(self._static_refs) >= self._sst_unique
+        )
+
+    # ---- workbook.xml: recalculate formulas on open ----
+    def _flag_full_calc_on_load(self):
+        xml = self._parts[self._workbook_path].decode("utf-8")
+
+        def _patch(m):
+            attrs = re.sub(r'\s+fullCalcOnLoad="[^"]*"', "", m.group(1))
+            return f'<calcPr{attrs} fullCalcOnLoad="1"{m.group(2)}>'
+
+        if _CALC_PR_RE.search(xml):
+            xml = _CALC_PR_RE.sub(_patch, xml, count=1)
+        else:
+            xml = xml.replace("</workbook>", '<calcPr fullCalcOnLoad="1"/></workbook>')
+
+        self._parts[self._workbook_path] = xml.encode("utf-8")
+
+    # ---- chart picture at J4: fixed parts, prepared once ----
+    def _unused_part(self, directory: str, stem: str, ext: str) -> str:
+        n = 1
+        while f"{directory}/{stem}{n}.{ext}" in self._parts:
+            n += 1
+        return f"{directory}/{stem}{n}.{ext}"
+
+    def _prepare_picture(self) -> dict:
+        if self._picture is not None:
+            return self._picture
+
+        last_chunk = self._sheet_chunks[-1]
+        if "<drawing " in last_chunk or "<drawing>" in last_chunk:
+            raise ValueError(
+                f"Template '{GRADING_SHEET_NAME}' already has a drawing; "
+                f"embedding the chart would replace it:\n{self.template_path}"
+            )
+
+        sheet_dir = posixpath.dirname(self._sheet_path)
+        sheet_rels_path = posixpath.join(sheet_dir, "_rels", posixpath.basename(self._sheet_path) + ".rels")
+        drawing_path = self._unused_part("xl/drawings", "drawing", "xml")
+        media_path = self._unused_part("xl/media", "image", "png")
+
+        # Sheet → drawing relationship (next free rId)
+        sheet_rels = self._parts.get(sheet_rels_path, b"").decode("utf-8")
+        if not sheet_rels:
+            sheet_rels = (
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                f'<Relationships xmlns="{PKG_REL_NS}"></Relationships>'
+            )
+        rel_id = f"rId{max([int(n) for n in _REL_ID_RE.findall(sheet_rels)] or [0]) + 1}"
+        drawing_target = posixpath.relpath(drawing_path, sheet_dir)
+        sheet_rels = sheet_rels.replace(
+            "</Relationships>",
+            f'<Relationship Id="{rel_id}" Type="{REL_NS}/drawing" Target="{drawing_target}"/></Relationships>',
+        )
+
+        # <drawing r:id> in schema position (after pageSetup & co.)
+        m = _AFTER_DRAWING_RE.search(last_chunk)
+        drawing_tag = f'<drawing xmlns:r="{REL_NS}" r:id="{rel_id}"/>'
+        sheet_tail = last_chunk[:m.start()] + drawing_tag + last_chunk[m.start():]
+
+        # Drawing → image relationship
+        drawing_rels = (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<Relationships xmlns="{PKG_REL_NS}">'
+            f'<Relationship Id="rId1" Type="{REL_NS}/image" '
+            f'Target="{posixpath.relpath(media_path, posixpath.dirname(drawing_path))}"/>'
+            "</Relationships>"
+        )
+
+        # Content types: png default + drawing override
+        content_types = self._parts["[Content_Types].xml"].decode("utf-8")
+        if 'Extension="png"' not in content_types:
+            content_types = content_types.replace(
+                "</Types>", '<Default Extension="png" ContentType="image/png"/></Types>'
+            )
+        content_types = content_types.replace(
+            "</Types>", f'<Override PartName="/{drawing_path}" ContentType="{CT_DRAWING}"/></Types>'
+        )
+
+        self._picture = {
+            "sheet_tail": sheet_tail,
+            "drawing_path": drawing_path,
+            "media_path": media_path,
+            "parts": {
+                sheet_rels_path: sheet_rels.encode("utf-8"),
+                posixpath.join("xl/drawings/_rels", posixpath.basename(drawing_path) + ".rels"): drawing_rels.encode("utf-8"),
+                "[Content_Types].xml": content_types.encode("utf-8"),
+            },
+        }
+        return self._picture
+
+    # ---- per student ----
+    def new_sheet(self) -> PatchedSheet:
+        return PatchedSheet(self.coordinates)
+
+    def _render_cell(self, coord: str, value, strings: dict) -> tuple:
+        """Returns (cell XML, True if it references a shared string)."""
+        style = self._styles[coord]
+        attrs = f'r="{coord}"' + (f' s="{style}"' if style is not None else "")
+
+        if value is None or value == "":
+            return f"<c {attrs}/>", False
+
+        if isinstance(value, bool):
+            return f'<c {attrs} t="b"><v>{int(value)}</v></c>', False
+
+        if isinstance(value, (int, float)):
+            text = _number_text(value)
+            return (f"<c {attrs}/>" if text is None else f"<c {attrs}><v>{text}</v></c>"), False
+
+        # Everything else is written as text (feedback strings)
+        value = str(value)
+        idx = self._sst_index.get(value)
+        if idx is None:
+            idx = strings.get(value)
+            if idx is None:
+                idx = self._sst_unique + len(strings)
+                strings[value] = idx
+        return f'<c {attrs} t="s"><v>{idx}</v></c>', True
+
+    def render(self, sheet: PatchedSheet, chart_png: bytes | None = None) -> dict:
+        """
+        Returns {part_name: bytes} for the parts that differ from the template
+        (the grading sheet XML and the shared strings, plus the drawing,
+        image and relationship parts when a chart PNG is embedded at J4).
+        """
+        values = sheet.values()
+        strings = {}
+        string_cells = 0
+
+        picture = self._prepare_picture() if chart_png else None
+        chunks = self._sheet_chunks[1:]
+        if picture:
+            chunks = chunks[:-1] + [picture["sheet_tail"]]
+
+        out = [self._sheet_chunks[0]]
+        for coord, chunk in zip(self._slots, chunks):
+            if coord in values:
+                cell, is_string = self._render_cell(coord, values[coord], strings)
+                string_cells += is_string
+            else:
+                cell = self._originals[coord]
+            out.append(cell)
+            out.append(chunk)
+
+        kept_originals = [self._original_refs[c] for c in self._slots if c not in values]
+        kept_originals = [idx for idx in kept_originals if idx is not None]
+        count = self._static_ref_count + len(kept_originals) + string_cells
+
+        sheet_xml = "".join(out)
+        parts = {}
+        body = self._sst_body
+        unique = self._sst_unique + len(strings)
+
+        if not self._all_strings_static:
+            used = set(self._static_refs)
+            used.update(kept_originals)
+            used.update(int(m.group(2)) for m in _SHARED_REF_RE.finditer(sheet_xml) if int(m.group(2)) < self._sst_unique)
+            if len(used) < self._sst_unique:
+                # Drop the strings nothing references any more and renumber the rest
+                kept = sorted(used)
+                mapping = {old: new for new, old in enumerate(kept)}
+                for k in range(len(strings)):
+                    mapping[self._sst_unique + k] = len(kept) + k
+
+                def _renumber(m):
+                    return f"{m.group(1)}{mapping[int(m.group(2))]}{m.group(3)}"
+
+                sheet_xml = _SHARED_REF_RE.sub(_renumber, sheet_xml)
+                for path in self._other_sheets:
+                    parts[path] = _SHARED_REF_RE.sub(_renumber, self._parts[path].decode("utf-8")).encode("utf-8")
+                body = "".join(self._sst_items[old] for old in kept)
+                unique = len(kept) + len(strings)
+
+        new_si = "".join(
+            f'<si><t xml:space="preserve">{_xml_text(text)}</t></si>' for text in strings
+        )
+        sst = (
+            f'{self._sst_head} count="{count}" uniqueCount="{unique}">'
+            f"{body}{new_si}{self._sst_tail}"
+        )
+
+        parts[self._sheet_path] = sheet_xml.encode("utf-8")
+        parts[self._sst_path] = sst.encode("utf-8")
+
+        if picture:
+            width, height = png_size(chart_png)
+            parts.update(picture["parts"])
+            parts[picture["drawing_path"]] = _drawing_xml("rId1", width, height).encode("utf-8")
+            parts[picture["media_path"]] = chart_png
+
+        return parts
+
+    def save(
+        self,
+        sheet: PatchedSheet,
+        dest_path: str,
+        chart_png: bytes | None = None,
+        extra_parts: dict | None = None,
+    ) -> str:
+        """
+        Writes the student's grading workbook: the template's zip with only the
+        sheet XML and shared strings replaced (and, if chart_png is given, the
+        student's chart anchored at J4). Written to a temp file first and
+        renamed, so a crash never leaves half a workbook behind.
+        """
+        patched = self.render(sheet, chart_png=chart_png)
+        if extra_parts:
+            patched.update(extra_parts)
+
+        dest_path = os.path.abspath(dest_path)
+        tmp_path = f"{dest_path}.tmp"
+
+        with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as out:
+            written = set()
+            for info in self._infos:
+                data = patched.get(info.filename, self._parts[info.filename])
+                out.writestr(_copy_info(info), data)
+                written.add(info.filename)
+            for name, data in patched.items():
+                if name not in written:
+                    out.writestr(_copy_info(zipfile.ZipInfo(name)), data)
+
+        os.replace(tmp_path, dest_path)
+        return dest_path
+
+
+def _copy_info(info: zipfile.ZipInfo) -> zipfile.ZipInfo:
+    new = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+    new.compress_type = zipfile.ZIP_DEFLATED
+    new.external_attr = info.external_attr
+    return new
+
+
+# ------------------------------
+# PER-PROCESS TEMPLATE CACHE
+# ------------------------------
+_TEMPLATES = {}
+
+
+def load_grading_template(template_path: str) -> GradingSheetTemplate:
+    """
+    Parsed template, cached per process (pool workers parse it once each).
+    Editing the template file on disk invalidates the cache.
+    """
+    template_path = os.path.abspath(template_path)
+    stat = os.stat(template_path)
+    key = (template_path, stat.st_mtime_ns, stat.st_size)
+
+    template = _TEMPLATES.get(key)
+    if template is None:
+        _TEMPLATES.clear()
+        template = GradingSheetTemplate(template_path)
+        _TEMPLATES[key] = template
+    return template
@@ -1,23 +1,33 @@
 # writers/insert_saved_images_into_grading_sheets.py
 
 import os
+import time
 import pythoncom
 import win32com.client as win32
 from pathlib import Path
 
 from utilities.paths import ensure_dir
+from utilities.timing import record_timing
 
 
-def insert_images_into_grading_sheets(temp_chart_dir: str = None, graded_output_dir: str = None):
+def insert_images_into_grading_sheets(temp_chart_dir: str = None, graded_output_dir: str = None, students=None) -> list:
     """
     Inserts each PNG chart into the corresponding student's grading sheet.
     Only scans THIS graded_output_dir (per-course).
     Anchors images at cell J4.
+
+    If students is given, only those students' PNGs are inserted.
+
+    Returns:
+        list of student names whose chart was inserted
     """
 
     if not graded_output_dir:
         raise ValueError("graded_output_dir is required (should be the course folder).")
 
+    wanted = set(students) if students is not None else None
+    inserted = []
+
     pythoncom.CoInitialize()
 
     try:
@@ -27,7 +37,7 @@ def insert_images_into_grading_sheets(temp_chart_dir: str = None, graded_output_
 
         if not os.path.isdir(temp_chart_dir):
             print(f"⚠️ temp_chart_dir not found: {temp_chart_dir}")
-            return
+            return inserted
 
         excel = None
 
@@ -37,9 +47,11 @@ def insert_images_into_grading_sheets(temp_chart_dir: str = None, graded_output_
             excel.DisplayAlerts = False
 
             pngs = [f for f in os.listdir(temp_chart_dir) if f.lower().endswith(".png")]
+            if wanted is not None:
+                pngs = [f for f in pngs if Path(f).stem in wanted]
             if not pngs:
                 print("⚠️ No PNG charts found to insert.")
-                return
+                return inserted
 
             for image_file in pngs:
                 student_name = Path(image_file).stem
@@ -52,6 +64,7 @@ def insert_images_into_grading_sheets(temp_chart_dir: str = None, graded_output_
                 image_path = os.path.join(temp_chart_dir, image_file)
 
                 wb = None
+                started = time.perf_counter()
                 try:
                     wb = excel.Workbooks.Open(grading_file)
                     ws = wb.Sheets("Grading Sheet")
@@ -70,6 +83,8 @@ def insert_images_into_grading_sheets(temp_chart_dir: str = None, graded_output_
                     wb.Save()
                     wb.Close()
                     wb = None
+                    inserted.append(student_name)
+                    record_timing("chart.insert", time.perf_counter() - started, student=student_name)
                     print(f"🖼️ Inserted chart for {student_name}")
 
                 except Exception as e:
@@ -89,3 +104,5 @@ def insert_images_into_grading_sheets(temp_chart_dir: str = None, graded_output_
 
     finally:
         pythoncom.CoUninitialize()
+
+    return inserted
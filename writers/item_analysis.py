@@ -0,0 +1,323 @@
+# writers/item_analysis.py
+
+"""
+Class-level item analysis for the instructor master (sheet "Item_Analysis").
+
+Built in ONE pass over the students' grading results (as the master's
+summary rows are written), keeping a fixed amount of state per check:
+
+  - per check: students, full-marks count, and a count per distinct
+    score (scores come in half points, so the counts stay small and the
+    mean and median are exact);
+  - per feedback code: students who got it, and how many of them still
+    had full marks on the check;
+  - per section: count per distinct section total (mean + median);
+  - overall: a fixed 10%-bin histogram of the auto-graded total;
+  - most common wrong answers per check: a bounded top-k counter
+    (Space-Saving, TOP_K_TRACKED entries), so a class of thousands never
+    keeps more than that per check. Only codes carrying the student's
+    entry count (the graders pass it as "found"); blank / missing cells
+    are left to the feedback code counts.
+
+    analysis = ItemAnalysis(max_points)
+    for student, results in ...:
+        analysis.add(results)
+    write_item_analysis_sheet(ws, analysis)   # ws: normal or write-only sheet
+"""
+
+import re
+from functools import lru_cache
+
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+
+from orchestrator.results_store import CHECKS, check_rows
+
+
+ITEM_ANALYSIS_SHEET_NAME = "Item_Analysis"
+
+TOP_K_TRACKED = 64       # wrong answers counted per check
+WRONG_ANSWERS_SHOWN = 5  # listed per check on the sheet
+HISTOGRAM_BINS = 10      # of the overall percentage (0–10%, ..., 90–100%)
+
+# Sections as the grading sheet subtotals them: (label, rows)
+SECTIONS = (
+    ("Income Analysis", range(3, 8)),
+    ("Unit Conversions", range(9, 14)),
+    ("Currency Conversions", range(15, 23)),
+)
+
+# Codes that report a wrong / missing answer (not summaries or "correct" codes)
+WRONG_ANSWER_CODE_RE = re.compile(
+    r"_(INCORRECT|INVALID|MISSING|BLANK|BAD|UNKNOWN|WRONG|REVERSED|OUTSIDE|TOO_OLD|"
+    r"NOT_APPROVED|NOT_NUMERIC|PARSE_ERROR)(_|$)"
+)
+# Wrong-answer codes for an empty cell: nothing to list as an answer
+NO_ANSWER_CODE_RE = re.compile(r"_(MISSING|BLANK)(_|$)")
+BLANK_ANSWERS = ("", "[blank]")
+# Params holding the student's own entry, in order of preference
+ANSWER_PARAMS = ("found", "student_rate", "code", "country", "date", "formula")
+CELL_PARAMS = ("cell", "code_cell", "rate_cell", "range")
+
+PERCENT_FORMAT = "0.0%"
+POINTS_FORMAT = "0.00"
+
+
+# ------------------------------
+# BOUNDED COUNTERS
+# ------------------------------
+class TopK:
+    """
+    Space-Saving top-k counter: at most `k` keys are kept. A new key
+    replaces the smallest one and inherits its count, so counts can be
+    over-estimated by at most that inherited amount (kept per key as
+    `error`); keys that are truly frequent are never dropped.
+    """
+
+    __slots__ = ("k", "counts", "errors")
+
+    def __init__(self, k: int = TOP_K_TRACKED):
+        self.k = k
+        self.counts = {}
+        self.errors = {}
+
+    def add(self, key):
+        if key in self.counts:
+            self.counts[key] += 1
+        elif len(self.counts) < self.k:
+            self.counts[key] = 1
+            self.errors[key] = 0
+        else:
+            smallest = min(self.counts, key=self.counts.get)
+            floor = self.counts.pop(smallest)
+            self.errors.pop(smallest)
+            self.counts[key] = floor + 1
+            self.errors[key] = floor
+
+    def most_common(self, n: int) -> list:
+        """[(key, count, error)] — the n largest counts, largest first."""
+        ranked = sorted(self.counts.items(), key=lambda kv: (-kv[1], str(kv[0])))
+        return [(key, count, self.errors[key]) for key, count in ranked[:n]]
+
+
+def _median(value_counts: dict):
+    """Exact median from {value: count}."""
+    total = sum(value_counts.values())
+    if not total:
+        return None
+    ordered = sorted(value_counts.items())
+    wanted = ((total - 1) // 2, total // 2)
+    found = []
+    seen = 0
+    for value, count in ordered:
+        while len(found) < 2 and wanted[len(found)] < seen + count:
+            found.append(value)
+        seen += count
+    return (found[0] + found[1]) / 2
+
+
+def _mean(value_counts: dict):
+    total = sum(value_counts.values())
+    if not total:
+        return None
+    return sum(value * count for value, count in value_counts.items()) / total
+
+
+@lru_cache(maxsize=None)
+def _is_wrong_answer_code(code: str) -> bool:
+    # Codes come from a fixed catalog: classified once each
+    return WRONG_ANSWER_CODE_RE.search(code) is not None and NO_ANSWER_CODE_RE.search(code) is None
+
+
+def _wrong_answer(code: str, params) -> tuple | None:
+    """(code, cell, answer) for a wrong-answer feedback item with the student's entry, else None."""
+    if not _is_wrong_answer_code(code) or not isinstance(params, dict):
+        return None
+    answer = next((str(params[p]).strip() for p in ANSWER_PARAMS if params.get(p) is not None), "")
+    if answer in BLANK_ANSWERS:
+        return None
+    cell = next((str(params[p]) for p in CELL_PARAMS if params.get(p) not in (None, "")), "")
+    return code, cell, answer
+
+
+# ------------------------------
+# ACCUMULATOR
+# ------------------------------
+class _CheckStats:
+    __slots__ = ("tab", "check_id", "sheet_row", "max_points", "students", "full_marks", "scores", "codes", "wrong")
+
+    def __init__(self, tab: str, check_id: str, sheet_row: int, max_points):
+        self.tab = tab
+        self.check_id = check_id
+        self.sheet_row = sheet_row
+        self.max_points = max_points
+        self.students = 0
+        self.full_marks = 0
+        self.scores = {}  # score → students
+        self.codes = {}   # code → [students with it, of which full marks]
+        self.wrong = TopK()
+
+
+class ItemAnalysis:
+    """
+    Streaming item analysis of one class.
+
+    Args:
+        max_points (dict): {grading sheet row: points possible}
+            (orchestrator/results_store.template_max_points)
+    """
+
+    def __init__(self, max_points: dict | None = None):
+        self.max_points = max_points or {}
+        self.students = 0
+        self.checks = {}
+        for _key, tab, check_id, _score, _feedback, sheet_row in CHECKS:
+            self.checks[(tab, check_id)] = _CheckStats(tab, check_id, sheet_row, self.max_points.get(sheet_row))
+        self.sections = {label: {} for label, _rows in SECTIONS}
+        self.histogram = [0] * HISTOGRAM_BINS
+        self.possible = sum(p for p in self.max_points.values() if p) or None
+
+    def add(self, results: dict | None = None, row_scores: dict | None = None):
+        """
+        Adds one student: their grading results, or (no results available)
+        just their sheet scores {row: score} — then only the score columns count.
+        """
+        self.students += 1
+        if results:
+            rows = check_rows(results, self.max_points)
+            row_scores = {sheet_row: score for _t, _c, sheet_row, score, _p, _f in rows}
+        else:
+            rows = []
+            row_scores = row_scores or {}
+            for stats in self.checks.values():
+                if stats.sheet_row in row_scores:
+                    rows.append((stats.tab, stats.check_id, stats.sheet_row, row_scores[stats.sheet_row],
+                                 stats.max_points, None))
+
+        for tab, check_id, _sheet_row, score, points, feedback in rows:
+            stats = self.checks[(tab, check_id)]
+            score = score if isinstance(score, (int, float)) else 0
+            passed = points is not None and score >= points
+
+            stats.students += 1
+            stats.full_marks += passed
+            stats.scores[score] = stats.scores.get(score, 0) + 1
+
+            seen = set()
+            for item in feedback or []:
+                if not (isinstance(item, (tuple, list)) and len(item) == 2):
+                    continue
+                code, params = item
+                if code not in seen:
+                    seen.add(code)
+                    counts = stats.codes.setdefault(code, [0, 0])
+                    counts[0] += 1
+                    counts[1] += passed
+                wrong = _wrong_answer(code, params)
+                if wrong is not None:
+                    stats.wrong.add(wrong)
+
+        def number(value):
+            return value if isinstance(value, (int, float)) and not isinstance(value, bool) else 0
+
+        total = 0
+        for label, sheet_rows in SECTIONS:
+            section_total = round(sum(number(row_scores.get(row)) for row in sheet_rows), 2)
+            self.sections[label][section_total] = self.sections[label].get(section_total, 0) + 1
+            total += section_total
+
+        if self.possible:
+            share = max(0.0, min(1.0, total / self.possible))
+            self.histogram[min(int(share * HISTOGRAM_BINS), HISTOGRAM_BINS - 1)] += 1
+
+    def section_max(self, sheet_rows) -> float | None:
+        points = [self.max_points.get(row) for row in sheet_rows]
+        if not any(points):
+            return None
+        return sum(p for p in points if p)
+
+
+# ------------------------------
+# SHEET
+# ------------------------------
+def _cell(ws, value, number_format: str | None = None, bold: bool = False):
+    cell = WriteOnlyCell(ws, value)
+    if number_format and value is not None:
+        cell.number_format = number_format
+    if bold:
+        cell.font = Font(bold=True)
+    return cell
+
+
+def _round(value, digits: int = 3):
+    return round(value, digits) if value is not None else None
+
+
+def write_item_analysis_sheet(ws, analysis: ItemAnalysis):
+    """
+    Writes the analysis into `ws` row by row (ws.append only, so normal and
+    write-only sheets both work).
+    """
+    def heading(text: str):
+        ws.append([])
+        ws.append([_cell(ws, text, bold=True)])
+
+    def header(*labels):
+        ws.append([_cell(ws, label, bold=True) for label in labels])
+
+    ws.append([_cell(ws, f"Item analysis — {analysis.students} student(s)", bold=True)])
+
+    # ---- Checks ----
+    heading("Checks (grading sheet rows)")
+    header("Tab", "Check", "Sheet row", "Max points", "Students", "Mean", "Median", "Pass rate (full marks)")
+    for stats in analysis.checks.values():
+        if not stats.students:
+            continue
+        pass_rate = stats.full_marks / stats.students if stats.max_points is not None else None
+        ws.append([
+            stats.tab, stats.check_id, stats.sheet_row, stats.max_points, stats.students,
+            _cell(ws, _round(_mean(stats.scores)), POINTS_FORMAT),
+            _cell(ws, _median(stats.scores), POINTS_FORMAT),
+            _cell(ws, _round(pass_rate, 4), PERCENT_FORMAT),
+        ])
+
+    # ---- Feedback codes ----
+    heading("Feedback codes")
+    header("Tab", "Check", "Code", "Students", "Share of class", "Pass rate (full marks on the check)")
+    for stats in analysis.checks.values():
+        for code, (students, passed) in sorted(stats.codes.items(), key=lambda kv: (-kv[1][0], kv[0])):
+            pass_rate = passed / students if stats.max_points is not None else None
+            ws.append([
+                stats.tab, stats.check_id, code, students,
+                _cell(ws, _round(students / analysis.students, 4), PERCENT_FORMAT),
+                _cell(ws, _round(pass_rate, 4), PERCENT_FORMAT),
+            ])
+
+    # ---- Sections ----
+    heading("Sections")
+    header("Section", "Max points", "Mean", "Median")
+    for label, sheet_rows in SECTIONS:
+        totals = analysis.sections[label]
+        ws.append([
+            label, analysis.section_max(sheet_rows),
+            _cell(ws, _round(_mean(totals)), POINTS_FORMAT),
+            _cell(ws, _median(totals), POINTS_FORMAT),
+        ])
+
+    # ---- Histogram ----
+    heading("Auto-graded total (share of points possible)")
+    header("Range", "Students")
+    if analysis.possible:
+        step = 100 // HISTOGRAM_BINS
+        for i, count in enumerate(analysis.histogram):
+            ws.append([f"{i * step}–{(i + 1) * step}%", count])
+    else:
+        ws.append(["Points possible unknown (grading template not readable)"])
+
+    # ---- Wrong answers ----
+    heading(f"Most common wrong answers (top {WRONG_ANSWERS_SHOWN} per check)")
+    header("Tab", "Check", "Code", "Cell", "Answer", "Count")
+    for stats in analysis.checks.values():
+        for (code, cell, answer), count, error in stats.wrong.most_common(WRONG_ANSWERS_SHOWN):
+            # Space-Saving may over-count a key that replaced another one
+            ws.append([stats.tab, stats.check_id, code, cell, answer, count if not error else f"≤{count}"])
@@ -0,0 +1,449 @@
+# writers/render_chart_headless.py
+
+"""
+Headless (no Excel) export of the student's XY scatter chart.
+
+The COM exporter (export_chart_to_image.py) starts a whole Excel instance per
+student, only runs on Windows and can't be parallelized. This backend reads the
+chart straight out of the .xlsx package instead:
+
+    Income Analysis sheet XML  →  <drawing r:id>
+    drawing XML                →  <c:chart r:id>  (first XY scatter wins)
+    chart XML                  →  series xVal / yVal references, series name,
+                                  trendline, chart + axis titles
+
+The referenced cells are read from the "Income Analysis" sheet with the
+targeted cell reader (cached values, like Excel shows them). If the cells
+can't be resolved, the chart's own numCache is used. The PNG is drawn with
+matplotlib, an OPTIONAL dependency imported only when a chart is rendered.
+"""
+
+import io
+import os
+import re
+import posixpath
+import zipfile
+from pathlib import Path
+from xml.etree.ElementTree import fromstring, iterparse
+
+from utilities.paths import ensure_dir
+from utilities.xlsx_cell_reader import (
+    NS_MAIN,
+    NS_REL,
+    _read_rels,
+    _read_workbook_index,
+    expand_cell_refs,
+    read_workbook_cells,
+)
+
+
+CHART_SHEET_NAME = "Income Analysis"
+
+NS_C = "{http://schemas.openxmlformats.org/drawingml/2006/chart}"
+NS_A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+
+# Excel's default chart size (5" x 3") at 96 DPI
+DEFAULT_SIZE_INCHES = (5.0, 3.0)
+EMU_PER_INCH = 914400
+DPI = 96
+
+# 'Income Analysis'!$A$20:$A$35   or   Sheet1!$B$2:$B$9
+_RANGE_REF_RE = re.compile(r"^(?:'((?:[^']|'')+)'|([^'!]+))!(\$?[A-Z]{1,3}\$?\d+(?::\$?[A-Z]{1,3}\$?\d+)?)$")
+
+
+# ------------------------------
+# CHART XML → PLAIN DICT
+# ------------------------------
+def _rel_part(zf: zipfile.ZipFile, part_path: str, rel_id: str) -> str | None:
+    part_dir = posixpath.dirname(part_path)
+    rels_path = posixpath.join(part_dir, "_rels", posixpath.basename(part_path) + ".rels")
+    rel = _read_rels(zf, rels_path, part_dir).get(rel_id)
+    return rel[1] if rel else None
+
+
+def _sheet_drawing_part(zf: zipfile.ZipFile, sheet_path: str) -> str | None:
+    with zf.open(sheet_path) as data:
+        for _event, elem in iterparse(data):
+            if elem.tag == f"{NS_MAIN}drawing":
+                return _rel_part(zf, sheet_path, elem.get(f"{NS_REL}id"))
+            if elem.tag == f"{NS_MAIN}row":
+                elem.clear()
+    return None
+
+
+def _rich_text(elem) -> str | None:
+    """Text of a <c:title>/<c:tx>: rich runs, a cached string ref or a literal."""
+    if elem is None:
+        return None
+
+    runs = [t.text or "" for t in elem.iter(f"{NS_A}t")]
+    if runs:
+        return "".join(runs)
+
+    cached = [v.text or "" for v in elem.iter(f"{NS_C}v")]
+    if cached:
+        return "".join(cached)
+
+    return None
+
+
+def _num_cache(ref_elem) -> list:
+    """numCache/strCache points as a list (None for gaps)."""
+    if ref_elem is None:
+        return []
+
+    cache = ref_elem.find(f".//{NS_C}numCache")
+    if cache is None:
+        cache = ref_elem.find(f".//{NS_C}numLit")
+    if cache is None:
+        return []
+
+    count_elem = cache.find(f"{NS_C}ptCount")
+    count = int(count_elem.get("val")) if count_elem is not None else 0
+
+    points = {}
+    for pt in cache.findall(f"{NS_C}pt"):
+        v = pt.find(f"{NS_C}v")
+        try:
+            points[int(pt.get("idx"))] = float(v.text)
+        except (TypeError, ValueError, AttributeError):
+            continue
+
+    count = max(count, max(points) + 1 if points else 0)
+    return [points.get(i) for i in range(count)]
+
+
+def _ref_formula(ref_elem) -> str | None:
+    if ref_elem is None:
+        return None
+    f = ref_elem.find(f".//{NS_C}f")
+    return f.text.strip() if f is not None and f.text else None
+
+
+def _parse_scatter_chart(chart_xml: bytes) -> dict | None:
+    root = fromstring(chart_xml)
+    chart = root.find(f"{NS_C}chart")
+    if chart is None:
+        return None
+
+    plot = chart.find(f"{NS_C}plotArea")
+    scatter = plot.find(f"{NS_C}scatterChart") if plot is not None else None
+    if scatter is None:
+        return None
+
+    series = []
+    for ser in scatter.findall(f"{NS_C}ser"):
+        x_ref = ser.find(f"{NS_C}xVal")
+        y_ref = ser.find(f"{NS_C}yVal")
+
+        trendline = None
+        tl = ser.find(f"{NS_C}trendline")
+        if tl is not None:
+            tl_type = tl.find(f"{NS_C}trendlineType")
+            disp_eq = tl.find(f"{NS_C}dispEq")
+            disp_r2 = tl.find(f"{NS_C}dispRSqr")
+            trendline = {
+                "type": tl_type.get("val") if tl_type is not None else "linear",
+                "display_equation": disp_eq is not None and disp_eq.get("val") in ("1", "true"),
+                "display_r_squared": disp_r2 is not None and disp_r2.get("val") in ("1", "true"),
+            }
+
+        series.append({
+            "name": _rich_text(ser.find(f"{NS_C}tx")),
+            "x_ref": _ref_formula(x_ref),
+            "y_ref": _ref_formula(y_ref),
+            "x_cache": _num_cache(x_ref),
+            "y_cache": _num_cache(y_ref),
+            "trendline": trendline,
+        })
+
+    # Which value axis is horizontal: scatterChart lists the X axis id first
+    ax_ids = [a.get("val") for a in scatter.findall(f"{NS_C}axId")]
+    axis_titles = {}
+    for ax in plot.findall(f"{NS_C}valAx"):
+        ax_id = ax.find(f"{NS_C}axId")
+        pos = ax.find(f"{NS_C}axPos")
+        title = _rich_text(ax.find(f"{NS_C}title"))
+
+        if ax_ids and ax_id is not None and ax_id.get("val") == ax_ids[0]:
+            axis_titles["x"] = title
+        elif ax_ids and ax_id is not None and ax_id.get("val") in ax_ids[1:]:
+            axis_titles["y"] = title
+        elif pos is not None and pos.get("val") in ("b", "t"):
+            axis_titles["x"] = title
+        else:
+            axis_titles["y"] = title
+
+    title = _rich_text(chart.find(f"{NS_C}title"))
+    auto_deleted = chart.find(f"{NS_C}autoTitleDeleted")
+    if title is None and len(series) == 1 and (auto_deleted is None or auto_deleted.get("val") in ("0", "false")):
+        title = series[0]["name"]  # Excel's automatic title for a single series
+
+    return {
+        "title": title,
+        "x_title": axis_titles.get("x"),
+        "y_title": axis_titles.get("y"),
+        "series": series,
+    }
+
+
+def _drawing_charts(zf: zipfile.ZipFile, drawing_path: str) -> list:
+    """[(chart part path, (width_in, height_in) or None)] in drawing order."""
+    root = fromstring(zf.read(drawing_path))
+    charts = []
+
+    for anchor in root:
+        for chart_ref in anchor.iter(f"{NS_C}chart"):
+            part = _rel_part(zf, drawing_path, chart_ref.get(f"{NS_REL}id"))
+            if not part:
+                continue
+
+            size = None
+            for ext in anchor.iter():
+                if ext.tag.endswith("}ext") and ext.get("cx") and ext.get("cy"):
+                    cx, cy = int(ext.get("cx")), int(ext.get("cy"))
+                    if cx > 0 and cy > 0:
+                        size = (cx / EMU_PER_INCH, cy / EMU_PER_INCH)
+                        break
+
+            charts.append((part, size))
+
+    return charts
+
+
+def read_scatter_chart(source, sheet_name: str = CHART_SHEET_NAME) -> dict | None:
+    """
+    Finds the first XY scatter chart drawn on `sheet_name`.
+
+    Args:
+        source: .xlsx path or binary file-like object
+
+    Returns:
+        dict with title, x_title, y_title, size_inches and
+        series: [{name, x_ref, y_ref, x_cache, y_cache, trendline}]
+        or None if the sheet has no scatter chart.
+    """
+    with zipfile.ZipFile(source) as zf:
+        sheet_parts, _sst, _styles, _epoch = _read_workbook_index(zf)
+
+        sheet_path = sheet_parts.get(sheet_name)
+        if not sheet_path:
+            raise KeyError(f"Worksheet {sheet_name} does not exist.")
+
+        drawing_path = _sheet_drawing_part(zf, sheet_path)
+        if not drawing_path:
+            return None
+
+        for chart_path, size in _drawing_charts(zf, drawing_path):
+            chart = _parse_scatter_chart(zf.read(chart_path))
+            if chart and chart["series"]:
+                chart["size_inches"] = size or DEFAULT_SIZE_INCHES
+                return chart
+
+    return None
+
+
+# ------------------------------
+# SERIES VALUES
+# ------------------------------
+def _split_range_ref(ref: str | None):
+    """'Income Analysis'!$A$20:$A$35 → ("Income Analysis", "A20:A35"); None if not a plain range."""
+    if not ref:
+        return None
+    m = _RANGE_REF_RE.match(ref.strip())
+    if not m:
+        return None
+    sheet = (m.group(1) or "").replace("''", "'") or m.group(2)
+    return sheet, m.group(3).replace("$", "")
+
+
+def _as_number(value):
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    return None
+
+
+def resolve_series_points(source, chart: dict) -> list:
+    """
+    Returns [(series dict, [(x, y), ...])] with the plotted points.
+
+    Cell values come from the workbook (cached results of formulas);
+    any reference that can't be read falls back to the chart's numCache.
+    Points where x or y is blank / non-numeric are skipped, as Excel does.
+    """
+    manifest = {}
+    for ser in chart["series"]:
+        for key in ("x_ref", "y_ref"):
+            split = _split_range_ref(ser[key])
+            if split:
+                manifest.setdefault(split[0], []).append(split[1])
+
+    wb = read_workbook_cells(source, manifest, data_only=True) if manifest else None
+
+    def _values(ref, cache):
+        split = _split_range_ref(ref)
+        if wb is not None and split and split[0] in wb:
+            ws = wb[split[0]]
+            return [_as_number(ws[c].value) for c in expand_cell_refs([split[1]])]
+        return list(cache)
+
+    resolved = []
+    for ser in chart["series"]:
+        ys = _values(ser["y_ref"], ser["y_cache"])
+        if ser["x_ref"] or ser["x_cache"]:
+            xs = _values(ser["x_ref"], ser["x_cache"])
+        else:
+            xs = [float(i + 1) for i in range(len(ys))]  # no X values → 1, 2, 3, ...
+
+        points = [(x, y) for x, y in zip(xs, ys) if x is not None and y is not None]
+        resolved.append((ser, points))
+
+    return resolved
+
+
+def linear_fit(points: list):
+    """Least-squares line through points → (slope, intercept, r_squared) or None."""
+    n = len(points)
+    if n < 2:
+        return None
+
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    sxx = sum((x - mean_x) ** 2 for x, _ in points)
+    if sxx == 0:
+        return None
+
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    slope = sxy / sxx
+    intercept = mean_y - slope * mean_x
+
+    ss_tot = sum((y - mean_y) ** 2 for _, y in points)
+    ss_res = sum((y - (slope * x + intercept)) ** 2 for x, y in points)
+    r_squared = 1.0 - ss_res / ss_tot if ss_tot else 1.0
+
+    return slope, intercept, r_squared
+
+
+# ------------------------------
+# RENDERING
+# ------------------------------
+def _import_matplotlib():
+    try:
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+    except ImportError as e:
+        raise ImportError(
+            "Headless chart export needs matplotlib.\n"
+            "Install it with: pip install matplotlib\n"
+            "(or use the Excel chart backend on Windows)."
+        ) from e
+    return Figure, FigureCanvasAgg
+
+
+def render_scatter_png(chart: dict, series_points: list, image_path):
+    """
+    Draws the scatter chart (points, linear trendline, titles) to a PNG.
+    image_path may be a file path or a binary file-like object.
+    """
+    Figure, FigureCanvasAgg = _import_matplotlib()
+
+    fig = Figure(figsize=chart.get("size_inches") or DEFAULT_SIZE_INCHES, dpi=DPI)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(1, 1, 1)
+
+    for ser, points in series_points:
+        if not points:
+            continue
+
+        xs = [x for x, _ in points]
+        ys = [y for _, y in points]
+        ax.scatter(xs, ys, s=18, label=ser["name"] or None, zorder=3)
+
+        trendline = ser.get("trendline")
+        fit = linear_fit(points) if trendline else None
+        if fit:
+            slope, intercept, r_squared = fit
+            lo, hi = min(xs), max(xs)
+            ax.plot([lo, hi], [slope * lo + intercept, slope * hi + intercept], linestyle=":", linewidth=1.5, zorder=2)
+
+            label = []
+            if trendline["display_equation"]:
+                sign = "+" if intercept >= 0 else "-"
+                label.append(f"y = {slope:.4g}x {sign} {abs(intercept):.4g}")
+            if trendline["display_r_squared"]:
+                label.append(f"R² = {r_squared:.4f}")
+            if label:
+                ax.text(0.98, 0.04, "\n".join(label), transform=ax.transAxes, ha="right", va="bottom", fontsize=8)
+
+    if chart.get("title"):
+        ax.set_title(chart["title"], fontsize=11)
+    if chart.get("x_title"):
+        ax.set_xlabel(chart["x_title"], fontsize=9)
+    if chart.get("y_title"):
+        ax.set_ylabel(chart["y_title"], fontsize=9)
+
+    ax.grid(True, linewidth=0.5, alpha=0.4)
+    ax.tick_params(labelsize=8)
+    fig.tight_layout()
+
+    fig.savefig(image_path, dpi=DPI, format="png")
+    return image_path
+
+
+def render_chart_png_bytes(source) -> bytes | None:
+    """
+    Renders the student's scatter chart straight to PNG bytes (no temp file),
+    for embedding into the grading sheet in the same write as the scores.
+
+    Returns None if the Income Analysis sheet has no XY scatter chart.
+    """
+    chart = read_scatter_chart(source)
+    if chart is None:
+        return None
+
+    buf = io.BytesIO()
+    render_scatter_png(chart, resolve_series_points(source, chart), buf)
+    return buf.getvalue()
+
+
+# ------------------------------
+# SAME CONTRACT AS export_chart_to_image()
+# ------------------------------
+def export_chart_headless(student_path, image_output_dir: str = None, student_name: str | None = None) -> str | None:
+    """
+    Export the XY scatter chart from the student's 'Income Analysis' tab
+    without Excel. Safe to call from pool workers.
+
+    Args:
+        student_path: submission path, or a binary file-like object
+                      (then student_name is required for the PNG name)
+
+    Returns the saved image path if exported, else None.
+    """
+    if not image_output_dir:
+        image_output_dir = ensure_dir("temp_charts")
+    else:
+        image_output_dir = os.path.abspath(image_output_dir)
+        Path(image_output_dir).mkdir(parents=True, exist_ok=True)
+
+    if student_name is None:
+        student_name = Path(student_path).stem.replace("_MA1", "")
+    image_path = os.path.join(image_output_dir, f"{student_name}.png")
+
+    try:
+        chart = read_scatter_chart(student_path)
+        if chart is None:
+            print(f"⚠️ No XY Scatter chart found for {student_name}")
+            return None
+
+        render_scatter_png(chart, resolve_series_points(student_path, chart), image_path)
+        print(f"📤 Exported chart → {image_path}")
+        return image_path
+
+    except ImportError:
+        raise
+    except Exception as e:
+        print(f"❌ Chart export failed for {student_name}: {e}")
+        return None
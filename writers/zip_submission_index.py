@@ -0,0 +1,112 @@
+# writers/zip_submission_index.py
+
+import hashlib
+import io
+import os
+import zipfile
+
+
+def _is_submission_member(info: zipfile.ZipInfo) -> bool:
+    if info.is_dir():
+        return False
+
+    parts = info.filename.replace("\\", "/").split("/")
+    name = parts[-1]
+
+    # macOS resource forks and Excel lock files ride along in LMS downloads
+    if parts[0] == "__MACOSX" or name.startswith("~$") or name.startswith("._"):
+        return False
+
+    return name.lower().endswith(".xlsx")
+
+
+def index_zip_submissions(zip_path: str) -> list:
+    """
+    Lists the student submissions inside an LMS ZIP WITHOUT extracting it.
+
+    Mirrors import_zip_to_student_groups + create_grading_sheets_from_folder:
+      - if the ZIP wraps everything in one top-level folder, that folder is ignored
+      - each student folder is the first path component below that
+      - the first .xlsx directly inside the student folder is their submission
+      - student names come from _clean_name_parts_from_folder
+
+    Returns:
+        list of dicts (sorted by student name):
+          student   → "First_Last"
+          folder    → raw LMS folder name
+          member    → ZIP member name of the .xlsx
+          size      → uncompressed size in bytes
+          crc       → CRC-32 stored in the ZIP
+    """
+    # Imported here: create_grading_sheet imports the orchestrator package,
+    # which imports phase 1, which imports this module.
+    from writers.create_grading_sheet import _clean_name_parts_from_folder
+
+    zip_path = os.path.abspath(zip_path)
+    if not os.path.exists(zip_path):
+        raise FileNotFoundError(f"Zip not found: {zip_path}")
+    if not zipfile.is_zipfile(zip_path):
+        raise ValueError(f"Not a valid zip file: {zip_path}")
+
+    with zipfile.ZipFile(zip_path, "r") as z:
+        infos = z.infolist()
+
+    all_paths = [i.filename.replace("\\", "/").strip("/") for i in infos]
+    top_level = {p.split("/")[0] for p in all_paths if p and not p.startswith("__MACOSX")}
+
+    # One wrapping folder (and no loose files next to it) → skip it, like the extractor does
+    strip = 0
+    if len(top_level) == 1:
+        only = next(iter(top_level))
+        if any(p.startswith(only + "/") for p in all_paths):
+            strip = 1
+
+    by_folder = {}
+    for info in infos:
+        if not _is_submission_member(info):
+            continue
+
+        parts = info.filename.replace("\\", "/").strip("/").split("/")[strip:]
+
+        # Must be <student_folder>/<file>.xlsx — deeper files were never graded
+        if len(parts) != 2:
+            continue
+
+        by_folder.setdefault(parts[0], []).append(info)
+
+    submissions = {}
+    for folder_name in sorted(by_folder):
+        first_name, last_name = _clean_name_parts_from_folder(folder_name)
+        readable_name = f"{first_name}_{last_name}"
+
+        info = sorted(by_folder[folder_name], key=lambda i: i.filename)[0]
+
+        if readable_name in submissions:
+            print(f"⚠️ Duplicate student name {readable_name} (folder '{folder_name}') — keeping the first.")
+            continue
+
+        submissions[readable_name] = {
+            "student": readable_name,
+            "folder": folder_name,
+            "member": info.filename,
+            "size": info.file_size,
+            "crc": info.CRC,
+        }
+
+    return [submissions[name] for name in sorted(submissions)]
+
+
+def read_zip_member(zip_path: str, member: str) -> io.BytesIO:
+    """Reads one ZIP member into memory (the bytes never touch disk)."""
+    with zipfile.ZipFile(zip_path, "r") as z:
+        return io.BytesIO(z.read(member))
+
+
+def zip_member_sha256(zip_path: str, member: str) -> str:
+    """Same digest as run_manifest.file_sha256() would give for the extracted file."""
+    h = hashlib.sha256()
+    with zipfile.ZipFile(zip_path, "r") as z:
+        with z.open(member) as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+    return h.hexdigest()